@@ -2,17 +2,24 @@
 import pandas as pd
 import numpy as np
 import os
-from datetime import timedelta
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from simulacao_mobilidade import fato_mobilidade_incidentes
 
 # Define o diretório de saída
 OUTPUT_DIR = "mineirao_2024_2025_star_schema"
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
-print(f"Iniciando a geração do Star Schema para a temporada 2024-2025 no diretório: '{OUTPUT_DIR}'...\n")
 
 # Configuração de Seed para reprodutibilidade
-np.random.seed(42)
+# Cada bloco (temporada) recebe um gerador próprio, derivado desta seed por
+# SeedSequence.spawn: o resultado não depende da ordem nem do número de
+# processos que simulam os blocos.
+SEMENTE = 42
+
+# Dias da semana por Timestamp.dayofweek (0 = segunda): nomes fixos, sem
+# depender do locale pt_BR estar instalado na máquina
+DIAS_SEMANA = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira',
+               'Sexta-feira', 'Sábado', 'Domingo']
 
 # ==============================================================================
 # 1. Definição das Dimensões (Contexto Estático)
@@ -56,22 +63,16 @@ DIM_PERFIL_TORCEDOR = pd.DataFrame({
 # ==============================================================================
 
 # Definição do Período e Jogos
-START_DATE = pd.to_datetime('2024-03-01')
-END_DATE = pd.to_datetime('2025-11-30')
-NUM_JOGOS = 25 # Simulação de 25 jogos no Mineirão no período
-
-# 2.1. Criação dos IDs de Jogo e Datas
-dates = pd.to_datetime(np.random.uniform(START_DATE.value, END_DATE.value, NUM_JOGOS).astype(np.int64))
-dates = np.sort(dates)
-
-df_base = pd.DataFrame({
-    'jogo_id': range(1, NUM_JOGOS + 1),
-    'data': dates,
-    'adversario_id': np.random.choice(DIM_ADVERSARIO['adversario_id'], NUM_JOGOS)
-})
+# Uma temporada por bloco: (início, fim, número de jogos no Mineirão)
+TEMPORADAS = [
+    ('2024-03-01', '2024-12-31', 13),
+    ('2025-01-01', '2025-11-30', 12),
+]
+NUM_JOGOS = sum(num_jogos for _, _, num_jogos in TEMPORADAS) # 25 jogos no período
+CANAIS = [1, 2, 3] # 1 = Site, 2 = Bilheteria, 3 = App
 
 # 2.2. Geração de Fatos com Veracidade
-def gerar_fato_jogo(row):
+def gerar_fato_jogo(row, rng):
     # Merge com dados do Adversário
     adv = DIM_ADVERSARIO[DIM_ADVERSARIO['adversario_id'] == row['adversario_id']].iloc[0]
     
@@ -84,18 +85,18 @@ def gerar_fato_jogo(row):
     publico_medio = 45000 if is_classico else (35000 if is_grande else 20000)
     publico_medio = publico_medio * 1.1 if is_fim_de_semana else publico_medio
     
-    publico_pago = np.random.normal(publico_medio, publico_medio * 0.1)
+    publico_pago = rng.normal(publico_medio, publico_medio * 0.1)
     publico_pago = max(10000, min(61846, int(publico_pago))) # Mineirão capacidade max
 
     # Receita (Mais sensível ao público e ticket)
-    ticket_medio_base = np.random.uniform(70, 150)
+    ticket_medio_base = rng.uniform(70, 150)
     if is_classico: ticket_medio_base *= 1.5
     if adv['competicao'] == 'Libertadores': ticket_medio_base *= 1.2
     
     receita_ingresso_rs = publico_pago * ticket_medio_base / 1000.0
     
     # Simula consumo (Tema 1: Consumo Médio)
-    ticket_medio_consumo_rs = np.random.normal(55, 10)
+    ticket_medio_consumo_rs = rng.normal(55, 10)
     
     return {
         'publico_pago': publico_pago,
@@ -103,255 +104,278 @@ def gerar_fato_jogo(row):
         'ticket_medio_ingresso_rs': round(receita_ingresso_rs * 1000 / publico_pago, 2),
         'ticket_medio_consumo_rs': round(ticket_medio_consumo_rs, 2), # Usado em FATO_CONSUMO
         'taxa_ocupacao': round(publico_pago / 61846 * 100, 2),
-        'horario_jogo': np.random.choice(['21:30', '19:00', '16:00'])
+        'horario_jogo': rng.choice(['21:30', '19:00', '16:00'])
     }
 
-fato_data = df_base.apply(gerar_fato_jogo, axis=1, result_type='expand')
-DF_FATO_JOGOS = pd.concat([df_base, fato_data], axis=1)
-DF_FATO_JOGOS = DF_FATO_JOGOS.sort_values(by='data').reset_index(drop=True)
 
-# 2.3. Criação da DIM_DATA
-DF_DIM_DATA = DF_FATO_JOGOS[['data']].drop_duplicates().reset_index(drop=True)
-DF_DIM_DATA.index.name = 'data_id'
-DF_DIM_DATA = DF_DIM_DATA.reset_index()
-DF_DIM_DATA['data_id'] = DF_DIM_DATA['data_id'] + 1
-
-DF_DIM_DATA['ano'] = DF_DIM_DATA['data'].dt.year
-DF_DIM_DATA['mes'] = DF_DIM_DATA['data'].dt.month
-DF_DIM_DATA['dia_semana'] = DF_DIM_DATA['data'].dt.day_name(locale='pt_BR')
-DF_DIM_DATA['feriado'] = DF_DIM_DATA['dia_semana'].apply(lambda x: True if x in ['Domingo'] else False) # Simula Feriado/Final de Semana
-
-# 2.4. Finalização da FATO_JOGOS (Adiciona data_id e chaves)
-DF_FATO_JOGOS = pd.merge(DF_FATO_JOGOS, DF_DIM_DATA[['data', 'data_id']], on='data', how='left')
-DF_FATO_JOGOS.drop(columns=['data', 'adversario_id'], inplace=True)
-DF_FATO_JOGOS.rename(columns={'ticket_medio_consumo_rs': 'ticket_medio_consumo_base_rs'}, inplace=True)
+def simular_temporada(inicio, fim, num_jogos, primeiro_jogo_id, semente):
+    """
+    Simula todos os sorteios de uma temporada com um gerador independente
+    
+    Roda em um processo do pool; só depende dos argumentos, então o mesmo
+    bloco gera sempre as mesmas linhas.
+    
+    Returns:
+        dict com 'jogos' (base + fatos por jogo), 'mobilidade', 'mercado'
+        (sorteios por jogo × canal) e 'projecao' (sorteios por jogo)
+    """
+    rng = np.random.default_rng(semente)
+    inicio, fim = pd.to_datetime(inicio), pd.to_datetime(fim)
+    
+    # 2.1. Criação dos IDs de Jogo e Datas
+    dates = pd.to_datetime(rng.uniform(inicio.value, fim.value, num_jogos).astype(np.int64))
+    dates = np.sort(dates)
+    
+    df_base = pd.DataFrame({
+        'jogo_id': range(primeiro_jogo_id, primeiro_jogo_id + num_jogos),
+        'data': dates,
+        'adversario_id': rng.choice(DIM_ADVERSARIO['adversario_id'], num_jogos)
+    })
+    
+    fato_data = pd.DataFrame([gerar_fato_jogo(row, rng) for _, row in df_base.iterrows()])
+    jogos = pd.concat([df_base, fato_data], axis=1)
+    
+    # 3.2. FATO_MOBILIDADE_INCIDENTES (ver simulacao_mobilidade.py)
+    mobilidade = fato_mobilidade_incidentes(jogos, DIM_SETOR, rng)
+    
+    # 3.3. Sorteios de FATO_MERCADO_INGRESSOS: adesões por jogo e variação de venda por canal
+    mercado = pd.DataFrame({
+        'jogo_id': np.repeat(df_base['jogo_id'].to_numpy(), len(CANAIS)),
+        'canal_id': np.tile(CANAIS, num_jogos),
+        'novas_adesoes': np.repeat(rng.integers(50, 300, num_jogos), len(CANAIS)),
+        'variacao_venda': rng.uniform(0.9, 1.1, num_jogos * len(CANAIS)),
+    })
+    
+    # 3.4. Sorteios de FATO_PROJECAO: margens de público e receita
+    projecao = pd.DataFrame({
+        'jogo_id': df_base['jogo_id'],
+        'variacao_publico': rng.uniform(0.95, 1.05, num_jogos),
+        'variacao_receita': rng.uniform(0.95, 1.05, num_jogos),
+    })
+    
+    return {'jogos': jogos, 'mobilidade': mobilidade, 'mercado': mercado, 'projecao': projecao}
 
-# Define as colunas finais da FATO_JOGOS
-colunas_fato_jogos = ['jogo_id', 'data_id', 'publico_pago', 'receita_ingresso_mil_rs', 
-                      'ticket_medio_ingresso_rs', 'ticket_medio_consumo_base_rs', 'taxa_ocupacao']
-DF_FATO_JOGOS = DF_FATO_JOGOS[colunas_fato_jogos]
 
+def simular_temporadas(processos=None, semente=SEMENTE):
+    """
+    Simula as TEMPORADAS em um pool de processos e junta os blocos em ordem
+    
+    Args:
+        processos: Número de processos (1 = sem pool, no processo atual)
+        semente: Seed raiz; cada temporada recebe um filho de SeedSequence(semente)
+    """
+    sementes = np.random.SeedSequence(semente).spawn(len(TEMPORADAS))
+    primeiros_ids = np.cumsum([1] + [num_jogos for _, _, num_jogos in TEMPORADAS[:-1]])
+    argumentos = [
+        (inicio, fim, num_jogos, int(primeiro_id), semente_bloco)
+        for (inicio, fim, num_jogos), primeiro_id, semente_bloco in zip(TEMPORADAS, primeiros_ids, sementes)
+    ]
+    
+    if processos == 1:
+        blocos = [simular_temporada(*args) for args in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            blocos = list(pool.map(simular_temporada, *zip(*argumentos)))
+    
+    return {chave: pd.concat([bloco[chave] for bloco in blocos], ignore_index=True) for chave in blocos[0]}
 
-# ==============================================================================
-# 3. Geração das Tabelas Fato Filhas/Agregadas
-# ==============================================================================
 
-# 3.1. FATO_CONSUMO (Detalhe de Vendas e Receita - Tema 1, 8)
-# Relaciona: FATO_JOGOS, DIM_PRODUTO
-consumo_data = []
-for index, jogo in df_base.iterrows():
-    publico_pago = fato_data.iloc[index]['publico_pago']
-    ticket_medio_consumo = fato_data.iloc[index]['ticket_medio_consumo_rs']
-    
-    # Distribuição de Consumo por Jogo
+def gerar_star_schema(processos=None, semente=SEMENTE):
+    """Gera todas as tabelas do Star Schema; devolve {nome_tabela: DataFrame}"""
+    simulacao = simular_temporadas(processos, semente)
+    DF_FATO_JOGOS = simulacao['jogos'].sort_values(by='data').reset_index(drop=True)
+    df_base = DF_FATO_JOGOS[['jogo_id', 'data', 'adversario_id']]
+    
+    # 2.3. Criação da DIM_DATA
+    DF_DIM_DATA = DF_FATO_JOGOS[['data']].drop_duplicates().reset_index(drop=True)
+    DF_DIM_DATA.index.name = 'data_id'
+    DF_DIM_DATA = DF_DIM_DATA.reset_index()
+    DF_DIM_DATA['data_id'] = DF_DIM_DATA['data_id'] + 1
+    
+    DF_DIM_DATA['ano'] = DF_DIM_DATA['data'].dt.year
+    DF_DIM_DATA['mes'] = DF_DIM_DATA['data'].dt.month
+    DF_DIM_DATA['dia_semana'] = DF_DIM_DATA['data'].dt.dayofweek.map(dict(enumerate(DIAS_SEMANA)))
+    DF_DIM_DATA['feriado'] = DF_DIM_DATA['dia_semana'].apply(lambda x: True if x in ['Domingo'] else False) # Simula Feriado/Final de Semana
+    
+    # 2.4. Finalização da FATO_JOGOS (Adiciona data_id e chaves)
+    DF_FATO_JOGOS = pd.merge(DF_FATO_JOGOS, DF_DIM_DATA[['data', 'data_id']], on='data', how='left')
+    DF_FATO_JOGOS.drop(columns=['data', 'adversario_id'], inplace=True)
+    DF_FATO_JOGOS.rename(columns={'ticket_medio_consumo_rs': 'ticket_medio_consumo_base_rs'}, inplace=True)
+    
+    # Define as colunas finais da FATO_JOGOS
+    colunas_fato_jogos = ['jogo_id', 'data_id', 'publico_pago', 'receita_ingresso_mil_rs', 
+                          'ticket_medio_ingresso_rs', 'ticket_medio_consumo_base_rs', 'taxa_ocupacao']
+    DF_FATO_JOGOS = DF_FATO_JOGOS[colunas_fato_jogos]
+    
+    
+    # ==============================================================================
+    # 3. Geração das Tabelas Fato Filhas/Agregadas
+    # ==============================================================================
+    
+    # 3.1. FATO_CONSUMO (Detalhe de Vendas e Receita - Tema 1, 8)
+    # Relaciona: FATO_JOGOS, DIM_PRODUTO
+    # Sem sorteios: calculado de uma vez como matriz jogos × produtos
     # Produtos mais baratos (1, 2, 5) são vendidos em maior volume
     venda_volumes = np.array([0.4, 0.15, 0.15, 0.05, 0.2, 0.05]) # Peso de venda simulado
     venda_volumes = venda_volumes / venda_volumes.sum() # Normaliza
     
-    for prod_id, volume in enumerate(venda_volumes, 1):
-        item_data = DIM_PRODUTO[DIM_PRODUTO['produto_id'] == prod_id].iloc[0]
-        
-        # Simula que ~60% do público compra
-        fator_publico_consumidor = 0.6 
-        
-        # Quantidade vendida (Estimativa)
-        qtd_vendida = int(publico_pago * fator_publico_consumidor * volume)
-        
-        # Receita
-        receita_produto_rs = qtd_vendida * item_data['preco_medio_rs']
-        
-        # Consumo por pessoa é apenas para produtos internos (não merchandising)
-        consumo_por_pessoa_rs = receita_produto_rs / publico_pago if item_data['categoria'] != 'Merchandising' else 0
-
-        consumo_data.append({
-            'jogo_id': jogo['jogo_id'],
-            'produto_id': prod_id,
-            'qtd_vendida': qtd_vendida,
-            'receita_produto_rs': round(receita_produto_rs, 2),
-            'consumo_por_pessoa_rs': round(consumo_por_pessoa_rs, 2)
-        })
-
-DF_FATO_CONSUMO = pd.DataFrame(consumo_data)
-
-
-# 3.2. FATO_MOBILIDADE_INCIDENTES (Tema 5: Mobilidade, Tema 10: Incidentes)
-# Relaciona: FATO_JOGOS, DIM_SETOR
-mobilidade_incidente_data = []
-for index, jogo in DF_FATO_JOGOS.iterrows():
-    publico_pago = jogo['publico_pago']
-    
-    for index_setor, setor in DIM_SETOR.iterrows():
-        # Simulação de Público por Setor (Tema 2: Mapa de Calor)
-        # Setores Roxo e Vermelho (maior capacidade) tendem a ter mais público
-        capacidade_setor = setor['capacidade_mil'] * 1000
-        
-        # Fator de Ocupação (mais alto para jogos de maior público)
-        fator_ocupacao = jogo['taxa_ocupacao'] / 100 * (np.random.uniform(0.9, 1.1))
-        
-        publico_setor = int(capacidade_setor * fator_ocupacao)
-        
-        if publico_setor > 1000: # Ignora setores quase vazios
-            
-            # Tema 5: Mobilidade (Tempo médio)
-            # Portões populares/maior movimento (Amarelo, Laranja) têm tempo maior
-            tempo_entrada_base = 15 if setor['nome_setor'] in ['Amarelo Inferior', 'Laranja Superior'] else 10
-            tempo_saida_base = 25 if setor['nome_setor'] in ['Amarelo Inferior', 'Laranja Superior'] else 20
-            
-            tempo_entrada = np.random.normal(tempo_entrada_base, 3)
-            tempo_saida = np.random.normal(tempo_saida_base, 5)
-            
-            # Tema 10: Incidentes
-            # Setores de maior densidade/popular (Amarelo, Vermelho) tendem a ter mais incidentes
-            fator_incidente = 0.00015 if setor['nome_setor'] in ['Amarelo Inferior', 'Vermelho Inferior'] else 0.00005
-            incidente_contagem = int(publico_setor * fator_incidente * np.random.uniform(0.8, 1.5))
-            
-            # Tempo de Resposta (inversamente proporcional ao incidente)
-            tempo_resposta_min = np.random.normal(7, 2)
-
-            mobilidade_incidente_data.append({
-                'jogo_id': jogo['jogo_id'],
-                'setor_id': setor['setor_id'],
-                'publico_setor': publico_setor,
-                'tempo_entrada_medio_min': round(max(5, tempo_entrada), 1),
-                'tempo_saida_medio_min': round(max(10, tempo_saida), 1),
-                'incidente_contagem': max(0, incidente_contagem),
-                'tempo_resposta_min': round(max(3, tempo_resposta_min), 1)
-            })
-
-DF_FATO_MOBILIDADE_INCIDENTES = pd.DataFrame(mobilidade_incidente_data)
-
-
-# 3.3. FATO_MERCADO_INGRESSOS (Tema 3: Sócios, Tema 7: Canais de Venda)
-# Relaciona: DIM_DATA
-mercado_data = []
-socio_base = 45000 # Base inicial de sócios
-
-for index, data in DF_DIM_DATA.iterrows():
-    is_classico = DF_FATO_JOGOS[DF_FATO_JOGOS['data_id'] == data['data_id']].merge(df_base, on='jogo_id', how='left').merge(DIM_ADVERSARIO, on='adversario_id', how='left')['classico_local'].iloc[0]
+    # Simula que ~60% do público compra
+    fator_publico_consumidor = 0.6
+    
+    publico_jogo = DF_FATO_JOGOS['publico_pago'].to_numpy(dtype=np.int64)
+    precos_produto = DIM_PRODUTO['preco_medio_rs'].to_numpy(dtype=np.float64)
+    eh_merchandising = (DIM_PRODUTO['categoria'] == 'Merchandising').to_numpy()
+    
+    # Quantidade vendida (Estimativa) e Receita
+    qtd_vendida = (publico_jogo[:, None] * fator_publico_consumidor * venda_volumes[None, :]).astype(np.int64)
+    receita_produto_rs = qtd_vendida * precos_produto[None, :]
     
-    # Tema 3: Evolução de Sócios-Torcedores (Simulação Mensal/Anual)
-    # A base de sócios cresce a cada mês (ou a cada jogo)
-    novas_adesoes = np.random.randint(50, 300)
-    socio_base += novas_adesoes
+    # Consumo por pessoa é apenas para produtos internos (não merchandising)
+    consumo_por_pessoa_rs = np.where(eh_merchandising[None, :], 0.0, receita_produto_rs / publico_jogo[:, None])
+    
+    DF_FATO_CONSUMO = pd.DataFrame({
+        'jogo_id': np.repeat(DF_FATO_JOGOS['jogo_id'].to_numpy(dtype=np.int32), len(DIM_PRODUTO)),
+        'produto_id': np.tile(DIM_PRODUTO['produto_id'].to_numpy(dtype=np.int16), len(DF_FATO_JOGOS)),
+        'qtd_vendida': qtd_vendida.ravel(),
+        'receita_produto_rs': np.round(receita_produto_rs.ravel(), 2),
+        'consumo_por_pessoa_rs': np.round(consumo_por_pessoa_rs.ravel(), 2)
+    })
+    
+    
+    # 3.2. FATO_MOBILIDADE_INCIDENTES (Tema 5: Mobilidade, Tema 10: Incidentes)
+    # Relaciona: FATO_JOGOS, DIM_SETOR
+    # Simulada por temporada em simular_temporada (chegada, filas, saída e incidentes)
+    DF_FATO_MOBILIDADE_INCIDENTES = simulacao['mobilidade']
+    
+    
+    # 3.3. FATO_MERCADO_INGRESSOS (Tema 3: Sócios, Tema 7: Canais de Venda)
+    # Relaciona: DIM_DATA, DIM_CANAL
+    # Formato longo: uma linha por data × canal (1 = Site, 2 = Bilheteria, 3 = App)
+    socio_base = 45000 # Base inicial de sócios
+    
+    # Jogo de cada data (primeiro jogo da data), com público e se é clássico
+    jogo_por_data = (
+        DF_FATO_JOGOS[['data_id', 'jogo_id', 'publico_pago']]
+        .drop_duplicates('data_id')
+        .merge(df_base[['jogo_id', 'adversario_id']], on='jogo_id', how='left')
+        .merge(DIM_ADVERSARIO[['adversario_id', 'classico_local']], on='adversario_id', how='left')
+    )
+    mercado = jogo_por_data.merge(simulacao['mercado'], on='jogo_id', how='left')
+    
+    # Tema 3: Evolução de Sócios-Torcedores - a base de sócios cresce a cada jogo
+    # (soma acumulada feita aqui, depois de juntar as temporadas em ordem)
+    adesoes_por_data = mercado.drop_duplicates('data_id').set_index('data_id')['novas_adesoes']
+    mercado['socios_ativos'] = mercado['data_id'].map(socio_base + adesoes_por_data.cumsum())
     
     # Tema 7: Venda de Ingressos por Canal (Simulação)
     # Classicos/Grandes priorizam Site/App (Canais 1 e 3)
-    venda_total_jogo = DF_FATO_JOGOS[DF_FATO_JOGOS['data_id'] == data['data_id']]['publico_pago'].iloc[0]
+    proporcoes = np.where(
+        mercado['classico_local'].to_numpy(dtype=bool)[:, None],
+        [0.55, 0.10, 0.35], # Site, Bilheteria, App
+        [0.40, 0.25, 0.35]  # Site, Bilheteria, App
+    )[np.arange(len(mercado)), mercado['canal_id'].to_numpy() - 1]
+    mercado['vendas_canal'] = (mercado['publico_pago'] * proporcoes * mercado['variacao_venda']).astype(np.int32)
     
-    if is_classico:
-        proporcoes = [0.55, 0.10, 0.35] # Site, Bilheteria, App
-    else:
-        proporcoes = [0.40, 0.25, 0.35] # Site, Bilheteria, App
-        
-    vendas_site = int(venda_total_jogo * proporcoes[0] * np.random.uniform(0.9, 1.1))
-    vendas_bilheteria = int(venda_total_jogo * proporcoes[1] * np.random.uniform(0.9, 1.1))
-    vendas_app = int(venda_total_jogo * proporcoes[2] * np.random.uniform(0.9, 1.1))
-    
-    mercado_data.append({
-        'data_id': data['data_id'],
-        'socios_ativos': socio_base,
-        'novas_adesoes': novas_adesoes,
-        'vendas_site': vendas_site,
-        'vendas_bilheteria': vendas_bilheteria,
-        'vendas_app': vendas_app,
-        'canal_id': 1 # Site
-    })
-    mercado_data.append({
-        'data_id': data['data_id'],
-        'socios_ativos': socio_base,
-        'novas_adesoes': novas_adesoes,
-        'vendas_site': 0, # Já contabilizado no item acima
-        'vendas_bilheteria': vendas_bilheteria,
-        'vendas_app': 0, # Já contabilizado no item acima
-        'canal_id': 2 # Bilheteria
-    })
-    mercado_data.append({
-        'data_id': data['data_id'],
-        'socios_ativos': socio_base,
-        'novas_adesoes': novas_adesoes,
-        'vendas_site': 0,
-        'vendas_bilheteria': 0,
-        'vendas_app': vendas_app,
-        'canal_id': 3 # App
+    DF_FATO_MERCADO_INGRESSOS = mercado[['data_id', 'socios_ativos', 'novas_adesoes', 'vendas_canal', 'canal_id']].astype({
+        'data_id': np.int32, 'socios_ativos': np.int32, 'novas_adesoes': np.int32,
+        'vendas_canal': np.int32, 'canal_id': np.int8
     })
-
-DF_FATO_MERCADO_INGRESSOS = pd.DataFrame(mercado_data)
-
-# 3.4. FATO_PROJECAO (Tema 9: Projeção de Público)
-# Usa os dados simulados para criar uma projeção futura simplificada
-projecao_data = []
-for index, jogo in df_base.iterrows():
-    adv = DIM_ADVERSARIO[DIM_ADVERSARIO['adversario_id'] == jogo['adversario_id']].iloc[0]
-    data_jogo = jogo['data']
+    
+    # 3.4. FATO_PROJECAO (Tema 9: Projeção de Público)
+    # Usa os dados simulados para criar uma projeção futura simplificada
+    # Sem laço por jogo: cada coluna é calculada de uma vez sobre df_base
+    adv = DIM_ADVERSARIO.set_index('adversario_id').loc[df_base['adversario_id']].reset_index(drop=True)
+    variacoes = simulacao['projecao'].set_index('jogo_id').loc[df_base['jogo_id']].reset_index(drop=True)
+    receita_por_jogo = DF_FATO_JOGOS.set_index('jogo_id')['receita_ingresso_mil_rs'].loc[df_base['jogo_id']].to_numpy()
+    fatores_adversario = {'Classico': 1.0, 'Grande': 0.8, 'Medio': 0.6, 'Pequeno': 0.4}
+    dia_semana = df_base['data'].dt.dayofweek.reset_index(drop=True)
     
     # Fatores da Projeção
-    fator_adversario = {'Classico': 1.0, 'Grande': 0.8, 'Medio': 0.6, 'Pequeno': 0.4}[adv['nivel_confronto']]
-    fator_dia = 1.1 if data_jogo.dayofweek in [5, 6] else 0.9 # Fim de semana
+    fator_adversario = adv['nivel_confronto'].map(fatores_adversario).to_numpy()
+    fator_dia = np.where(dia_semana.isin([5, 6]), 1.1, 0.9) # Fim de semana
     
     # Simula projeção baseada em 40.000
-    publico_projetado = int(40000 * fator_adversario * fator_dia * np.random.uniform(0.95, 1.05))
-    publico_projetado = max(15000, min(61846, publico_projetado))
+    publico_projetado = (40000 * fator_adversario * fator_dia * variacoes['variacao_publico'].to_numpy()).astype(np.int64)
+    publico_projetado = np.clip(publico_projetado, 15000, 61846).astype(np.int32)
     
     # Simula a Projeção de Receita (com 5% de margem)
-    receita_projetada = DF_FATO_JOGOS[DF_FATO_JOGOS['jogo_id'] == jogo['jogo_id']]['receita_ingresso_mil_rs'].iloc[0] * np.random.uniform(0.95, 1.05)
+    receita_projetada = receita_por_jogo * variacoes['variacao_receita'].to_numpy()
     
-    projecao_data.append({
-        'jogo_id': jogo['jogo_id'],
-        'adversario': adv['nome_adversario'],
+    DF_FATO_PROJECAO = pd.DataFrame({
+        'jogo_id': df_base['jogo_id'].to_numpy(dtype=np.int32),
+        'adversario': adv['nome_adversario'].to_numpy(),
         'publico_projetado': publico_projetado,
-        'receita_projetada_mil_rs': round(receita_projetada, 3),
-        'base_analise': f"Dia: {data_jogo.day_name(locale='pt_BR')}, Adversário: {adv['nivel_confronto']}"
+        'receita_projetada_mil_rs': [round(valor, 3) for valor in receita_projetada],
+        'base_analise': ('Dia: ' + dia_semana.map(dict(enumerate(DIAS_SEMANA)))
+                         + ', Adversário: ' + adv['nivel_confronto']).to_numpy(),
     })
     
-DF_FATO_PROJECAO = pd.DataFrame(projecao_data)
-
-
-# 3.5. FATO_RECEITA_AGREGADA (Tema 8: Comparativo Receita Ingresso vs. Produtos Internos)
-# Dados consolidados para o período 2024-2025
-receita_total_ingresso = DF_FATO_JOGOS['receita_ingresso_mil_rs'].sum()
-receita_total_produto = DF_FATO_CONSUMO['receita_produto_rs'].sum() / 1000 # Converter para mil R$
-
-DF_FATO_RECEITA_AGREGADA = pd.DataFrame({
-    'categoria_receita': ['Ingressos', 'Produtos Internos'],
-    'receita_total_mil_rs': [round(receita_total_ingresso, 3), round(receita_total_produto, 3)],
-    'percentual_total': [
-        round(receita_total_ingresso / (receita_total_ingresso + receita_total_produto) * 100, 2),
-        round(receita_total_produto / (receita_total_ingresso + receita_total_produto) * 100, 2)
-    ]
-})
+    
+    # 3.5. FATO_RECEITA_AGREGADA (Tema 8: Comparativo Receita Ingresso vs. Produtos Internos)
+    # Dados consolidados para o período 2024-2025
+    receita_total_ingresso = DF_FATO_JOGOS['receita_ingresso_mil_rs'].sum()
+    receita_total_produto = DF_FATO_CONSUMO['receita_produto_rs'].sum() / 1000 # Converter para mil R$
+    
+    DF_FATO_RECEITA_AGREGADA = pd.DataFrame({
+        'categoria_receita': ['Ingressos', 'Produtos Internos'],
+        'receita_total_mil_rs': [round(receita_total_ingresso, 3), round(receita_total_produto, 3)],
+        'percentual_total': [
+            round(receita_total_ingresso / (receita_total_ingresso + receita_total_produto) * 100, 2),
+            round(receita_total_produto / (receita_total_ingresso + receita_total_produto) * 100, 2)
+        ]
+    })
+    
+    return {
+        # 4 Dimensões
+        "DIM_DATA": DF_DIM_DATA,
+        "DIM_ADVERSARIO": DIM_ADVERSARIO,
+        "DIM_SETOR": DIM_SETOR,
+        "DIM_PRODUTO": DIM_PRODUTO,
+        "DIM_PERFIL_TORCEDOR": DIM_PERFIL_TORCEDOR,
+        
+        # 5 Fatos
+        "FATO_JOGOS": DF_FATO_JOGOS,
+        "FATO_CONSUMO": DF_FATO_CONSUMO,
+        "FATO_MOBILIDADE_INCIDENTES": DF_FATO_MOBILIDADE_INCIDENTES,
+        "FATO_MERCADO_INGRESSOS": DF_FATO_MERCADO_INGRESSOS,
+        "FATO_PROJECAO": DF_FATO_PROJECAO,
+        "FATO_RECEITA_AGREGADA": DF_FATO_RECEITA_AGREGADA
+    }
 
 # ==============================================================================
 # 4. Exportação para CSV
 # ==============================================================================
 
-# Cria o dicionário de DataFrames para exportação
-dataframes_to_export = {
-    # 4 Dimensões
-    "DIM_DATA": DF_DIM_DATA,
-    "DIM_ADVERSARIO": DIM_ADVERSARIO,
-    "DIM_SETOR": DIM_SETOR,
-    "DIM_PRODUTO": DIM_PRODUTO,
-    "DIM_PERFIL_TORCEDOR": DIM_PERFIL_TORCEDOR,
-    
-    # 5 Fatos
-    "FATO_JOGOS": DF_FATO_JOGOS,
-    "FATO_CONSUMO": DF_FATO_CONSUMO,
-    "FATO_MOBILIDADE_INCIDENTES": DF_FATO_MOBILIDADE_INCIDENTES,
-    "FATO_MERCADO_INGRESSOS": DF_FATO_MERCADO_INGRESSOS,
-    "FATO_PROJECAO": DF_FATO_PROJECAO,
-    "FATO_RECEITA_AGREGADA": DF_FATO_RECEITA_AGREGADA
-}
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o Star Schema simulado do Mineirão (2024-2025)")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="Processos para simular as temporadas (padrão: núcleos da máquina; 1 = sem pool)")
+    parser.add_argument('--semente', type=int, default=SEMENTE, help=f"Seed raiz da simulação (padrão: {SEMENTE})")
+    parser.add_argument('--saida', default=OUTPUT_DIR, help=f"Diretório de saída (padrão: {OUTPUT_DIR})")
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.saida):
+        os.makedirs(args.saida)
+    
+    print(f"Iniciando a geração do Star Schema para a temporada 2024-2025 no diretório: '{args.saida}'...\n")
+    
+    # Cria o dicionário de DataFrames para exportação
+    dataframes_to_export = gerar_star_schema(args.processos, args.semente)
+    
+    arquivos_gerados = []
+    for nome_tabela, df in dataframes_to_export.items():
+        filename = f"{nome_tabela.lower()}.csv"
+        filepath = os.path.join(args.saida, filename)
+        
+        # Exporta para CSV (separador=ponto-e-vírgula, decimal=vírgula)
+        df.to_csv(filepath, sep=';', decimal=',', index=False, encoding='utf-8')
+        arquivos_gerados.append(filename)
+        print(f"✅ Gerado: {filename} (Tamanho: {df.shape[0]} linhas)")
+    
+    print("\n---")
+    print("Processo concluído! O banco de dados simulado com 10 temas foi gerado com sucesso no modelo Star Schema.")
+    print(f"Total de {len(arquivos_gerados)} arquivos CSV gerados.")
 
-arquivos_gerados = []
-for nome_tabela, df in dataframes_to_export.items():
-    filename = f"{nome_tabela.lower()}.csv"
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    
-    # Exporta para CSV (separador=ponto-e-vírgula, decimal=vírgula)
-    df.to_csv(filepath, sep=';', decimal=',', index=False, encoding='utf-8')
-    arquivos_gerados.append(filename)
-    print(f"✅ Gerado: {filename} (Tamanho: {df.shape[0]} linhas)")
 
-print("\n---")
-print("Processo concluído! O banco de dados simulado com 10 temas foi gerado com sucesso no modelo Star Schema.")
-print("Total de 11 arquivos CSV gerados.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -1,113 +1,346 @@
-import graphviz
+"""
+Diagrama do Star Schema gerado a partir dos arquivos exportados
+
+Em vez de manter o esquema à mão, as tabelas, colunas e tipos são lidos dos
+CSVs gerados por create_data.py (só o cabeçalho e uma amostra das primeiras
+linhas, então arquivos de fatos grandes não são lidos inteiros) e as chaves
+são inferidas:
+
+- PK: coluna <nome>_id com valores únicos na tabela cujo nome corresponde à
+  chave (jogo_id -> FATO_JOGOS, setor_id -> DIM_SETOR) ou, na falta dela, na
+  dimensão em que a coluna é única;
+- FK: coluna <nome>_id de outra tabela cujos valores amostrados aparecem
+  no conjunto de chaves da PK (sobreposição acima de LIMIAR_SOBREPOSICAO).
+
+Uso:
+    python generate_diagram_star_schema.py                      # gera o PNG
+    python generate_diagram_star_schema.py --verificar          # checagem para CI
+    python generate_diagram_star_schema.py --gravar-esquema esquema.json
+    python generate_diagram_star_schema.py --verificar --esperado esquema.json
+
+No modo --verificar o graphviz não é necessário; o código de saída é 1 se
+houver chaves órfãs, colunas _id sem tabela de origem, dimensões sem PK ou
+diferença em relação ao esquema esperado.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+PASTA_PADRAO = "mineirao_2024_2025_star_schema"
+SAIDA_PADRAO = "diagrama_star_schema"
+
+# Linhas lidas de cada tabela para tipos e sobreposição de chaves
+AMOSTRA_LINHAS = 10_000
+
+# Fração mínima dos valores amostrados presentes na PK para aceitar a FK
+LIMIAR_SOBREPOSICAO = 0.5
+
 
 # ==============================================================================
-# 1. Definição do Modelo Star Schema
+# 1. Introspecção dos Arquivos
 # ==============================================================================
 
-# Definição das tabelas e suas chaves
-schema = {
-    "FATOS": {
-        "FATO_JOGOS": ["jogo_id (PK)", "data_id (FK)", "adversario_id (FK)", "publico_pago", "receita_ingresso_mil_rs", "taxa_ocupacao"],
-        "FATO_CONSUMO": ["jogo_id (FK)", "produto_id (FK)", "qtd_vendida", "receita_produto_rs"],
-        "FATO_MOBILIDADE_INCIDENTES": ["jogo_id (FK)", "setor_id (FK)", "publico_setor", "tempo_entrada_medio_min", "incidente_contagem"],
-        "FATO_MERCADO_INGRESSOS": ["data_id (FK)", "canal_id (FK)", "socios_ativos", "vendas_canal"],
-        "FATO_PROJECAO": ["jogo_id (FK)", "publico_projetado", "receita_projetada_mil_rs"],
-        "FATO_RECEITA_AGREGADA": ["categoria_receita", "receita_total_mil_rs"] # Tabela agregada - sem chaves FK
-    },
-    "DIMENSOES": {
-        "DIM_DATA": ["data_id (PK)", "ano", "mes", "dia_semana"],
-        "DIM_ADVERSARIO": ["adversario_id (PK)", "nome_adversario", "competicao", "nivel_confronto"],
-        "DIM_SETOR": ["setor_id (PK)", "nome_setor", "capacidade_mil"],
-        "DIM_PRODUTO": ["produto_id (PK)", "item_vendido", "categoria", "preco_medio_rs"],
-        "DIM_CANAL": ["canal_id (PK)", "nome_canal", "tipo_operacao"],
-        "DIM_PERFIL_TORCEDOR": ["perfil_id (PK)", "faixa_etaria", "genero"] # Não possui FK nos fatos, mas é parte da dimensão conceitual
-    }
-}
+def _formato_csv(caminho):
+    """(sep, decimal) do CSV a partir do cabeçalho"""
+    with open(caminho, encoding='utf-8') as f:
+        cabecalho = f.readline()
+    return (';', ',') if ';' in cabecalho else (',', '.')
+
+
+def ler_amostra(caminho, linhas=AMOSTRA_LINHAS, colunas=None):
+    """Lê só as primeiras linhas (ou só algumas colunas) de um CSV exportado"""
+    import pandas as pd  # só quando há CSV a ler: --help não paga a importação
+    sep, decimal = _formato_csv(caminho)
+    return pd.read_csv(caminho, sep=sep, decimal=decimal, nrows=linhas, usecols=colunas)
+
+
+def tipo_coluna(nome, serie):
+    """Tipo exibido no diagrama"""
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(serie):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(serie):
+        return 'int'
+    if pd.api.types.is_float_dtype(serie):
+        return 'float'
+    if nome.startswith('data') and pd.to_datetime(serie.dropna().head(100), errors='coerce').notna().all():
+        return 'data'
+    return 'texto'
+
+
+def introspectar(pasta, linhas=AMOSTRA_LINHAS):
+    """
+    Lê o esquema de todos os CSVs da pasta
+
+    Returns:
+        {tabela: {'arquivo', 'grupo' ('FATOS'|'DIMENSOES'), 'colunas': {nome: tipo},
+                  'amostra': DataFrame, 'linhas_amostra': int}}
+    """
+    tabelas = {}
+    for caminho in sorted(glob.glob(os.path.join(pasta, '*.csv'))):
+        nome = os.path.splitext(os.path.basename(caminho))[0].upper()
+        amostra = ler_amostra(caminho, linhas)
+        tabelas[nome] = {
+            'arquivo': caminho,
+            'grupo': 'FATOS' if nome.startswith('FATO') else 'DIMENSOES',
+            'colunas': {col: tipo_coluna(col, amostra[col]) for col in amostra.columns},
+            'amostra': amostra,
+            'completa': len(amostra) < linhas,
+        }
+    return tabelas
+
 
-# Definição dos Relacionamentos (Fatos -> Dimensões/Outros Fatos)
-relationships = [
-    # FATO_JOGOS (Fato Central)
-    ("FATO_JOGOS", "DIM_DATA", "data_id"),
-    ("FATO_JOGOS", "DIM_ADVERSARIO", "adversario_id"),
+# ==============================================================================
+# 2. Inferência de Chaves (PK/FK)
+# ==============================================================================
+
+def _inteira(serie):
+    """True se todos os valores não nulos da série são inteiros (1.0, 2.0...)"""
+    valores = serie.dropna()
+    return bool(len(valores)) and bool((valores % 1 == 0).all())
+
+
+def _colunas_chave(tabela):
+    """Colunas _id candidatas a chave: inteiras, texto ou float com valores inteiros ('1,0')"""
+    return [col for col, tipo in tabela['colunas'].items() if col.endswith('_id') and (
+        tipo in ('int', 'texto') or (tipo == 'float' and _inteira(tabela['amostra'][col])))]
+
+
+def _nome_corresponde(tabela, coluna):
+    """jogo_id corresponde a FATO_JOGOS, setor_id a DIM_SETOR"""
+    radical = coluna[:-len('_id')].upper()
+    sufixo = tabela.split('_', 1)[-1]
+    return sufixo == radical or sufixo.startswith(radical)
+
+
+def _valores_chave(tabela, coluna):
+    """Conjunto de valores da PK (lê a coluna inteira se a amostra não cobriu a tabela)"""
+    if tabela['completa']:
+        return set(tabela['amostra'][coluna].dropna())
+    return set(ler_amostra(tabela['arquivo'], linhas=None, colunas=[coluna])[coluna].dropna())
+
+
+def inferir_chaves(tabelas, limiar=LIMIAR_SOBREPOSICAO):
+    """
+    Infere PKs e relacionamentos
+
+    Returns:
+        (pks, relacionamentos, problemas): {tabela: coluna}, lista de
+        (origem, destino, coluna, sobreposicao) e lista de mensagens
+    """
+    pks = {}
+    problemas = []
     
-    # Fatos Granulares que se ligam ao JOGO
-    ("FATO_CONSUMO", "FATO_JOGOS", "jogo_id (Fato-a-Fato)"),
-    ("FATO_MOBILIDADE_INCIDENTES", "FATO_JOGOS", "jogo_id (Fato-a-Fato)"),
-    ("FATO_PROJECAO", "FATO_JOGOS", "jogo_id (Fato-a-Fato)"),
-
-    # Dimensões específicas dos Fatos Granulares
-    ("FATO_CONSUMO", "DIM_PRODUTO", "produto_id"),
-    ("FATO_MOBILIDADE_INCIDENTES", "DIM_SETOR", "setor_id"),
+    # Chave gravada como decimal indica exportação fora do padrão: entra no
+    # diagrama se os valores forem inteiros, mas a verificação falha
+    for nome, tabela in tabelas.items():
+        for coluna, tipo in tabela['colunas'].items():
+            if coluna.endswith('_id') and tipo == 'float':
+                detalhe = ('valores inteiros gravados como decimais' if _inteira(tabela['amostra'][coluna])
+                           else 'valores não inteiros, ignorada como chave')
+                problemas.append(f"{nome}.{coluna}: chave com tipo float ({detalhe})")
     
-    # FATO_MERCADO_INGRESSOS
-    ("FATO_MERCADO_INGRESSOS", "DIM_DATA", "data_id"),
-    ("FATO_MERCADO_INGRESSOS", "DIM_CANAL", "canal_id"),
-]
+    unicas = {
+        nome: [col for col in _colunas_chave(t)
+               if t['amostra'][col].notna().all() and t['amostra'][col].is_unique]
+        for nome, t in tabelas.items()
+    }
+
+    # PK pelo nome da tabela; dimensões sem correspondência usam a primeira coluna única
+    for nome, candidatas in unicas.items():
+        por_nome = [col for col in candidatas if _nome_corresponde(nome, col)]
+        if por_nome:
+            pks[nome] = por_nome[0]
+        elif tabelas[nome]['grupo'] == 'DIMENSOES' and candidatas:
+            pks[nome] = candidatas[0]
+        elif tabelas[nome]['grupo'] == 'DIMENSOES':
+            problemas.append(f"{nome}: dimensão sem coluna _id única para PK")
+
+    dono_chave = {}
+    for nome, coluna in pks.items():
+        dono_chave.setdefault(coluna, nome)
+
+    relacionamentos = []
+    valores_pk = {}
+    for nome, tabela in tabelas.items():
+        for coluna in _colunas_chave(tabela):
+            if pks.get(nome) == coluna:
+                continue
+            destino = dono_chave.get(coluna)
+            if destino is None:
+                problemas.append(f"{nome}.{coluna}: nenhuma tabela tem {coluna} como PK")
+                continue
+
+            if destino not in valores_pk:
+                valores_pk[destino] = _valores_chave(tabelas[destino], coluna)
+            amostra = tabela['amostra'][coluna].dropna()
+            sobreposicao = amostra.isin(valores_pk[destino]).mean() if len(amostra) else 0.0
+
+            if sobreposicao >= limiar:
+                relacionamentos.append((nome, destino, coluna, round(float(sobreposicao), 4)))
+            if sobreposicao < 1:
+                problemas.append(f"{nome}.{coluna} -> {destino}: {1 - sobreposicao:.1%} dos valores amostrados sem correspondência")
+
+    return pks, relacionamentos, problemas
+
+
+def montar_esquema(pasta, linhas=AMOSTRA_LINHAS):
+    """Esquema serializável (tabelas, colunas, tipos, PKs e relacionamentos) e problemas encontrados"""
+    tabelas = introspectar(pasta, linhas)
+    pks, relacionamentos, problemas = inferir_chaves(tabelas)
+    esquema = {
+        'tabelas': {
+            nome: {'grupo': t['grupo'], 'pk': pks.get(nome), 'colunas': t['colunas']}
+            for nome, t in tabelas.items()
+        },
+        'relacionamentos': [
+            {'origem': origem, 'destino': destino, 'coluna': coluna}
+            for origem, destino, coluna, _ in relacionamentos
+        ],
+    }
+    return esquema, relacionamentos, problemas
+
+
+def comparar_esquemas(atual, esperado):
+    """Diferenças entre o esquema inferido e um esquema gravado com --gravar-esquema"""
+    diferencas = []
+    for nome in sorted(set(esperado['tabelas']) - set(atual['tabelas'])):
+        diferencas.append(f"tabela ausente: {nome}")
+    for nome in sorted(set(atual['tabelas']) - set(esperado['tabelas'])):
+        diferencas.append(f"tabela nova: {nome}")
+    for nome in sorted(set(atual['tabelas']) & set(esperado['tabelas'])):
+        a, e = atual['tabelas'][nome], esperado['tabelas'][nome]
+        if a['pk'] != e['pk']:
+            diferencas.append(f"{nome}: PK {e['pk']} -> {a['pk']}")
+        for col in e['colunas']:
+            if col not in a['colunas']:
+                diferencas.append(f"{nome}: coluna ausente {col}")
+            elif a['colunas'][col] != e['colunas'][col]:
+                diferencas.append(f"{nome}.{col}: tipo {e['colunas'][col]} -> {a['colunas'][col]}")
+        for col in a['colunas']:
+            if col not in e['colunas']:
+                diferencas.append(f"{nome}: coluna nova {col}")
+
+    chave = lambda r: (r['origem'], r['destino'], r['coluna'])
+    for r in sorted(set(map(chave, esperado['relacionamentos'])) - set(map(chave, atual['relacionamentos']))):
+        diferencas.append(f"relacionamento ausente: {r[0]}.{r[2]} -> {r[1]}")
+    for r in sorted(set(map(chave, atual['relacionamentos'])) - set(map(chave, esperado['relacionamentos']))):
+        diferencas.append(f"relacionamento novo: {r[0]}.{r[2]} -> {r[1]}")
+    return diferencas
+
 
 # ==============================================================================
-# 2. Geração do Diagrama Graphviz
+# 3. Geração do Diagrama Graphviz
 # ==============================================================================
 
-# Inicializa o gráfico
-dot = graphviz.Digraph(
-    'StarSchemaMineirao', 
-    comment='Star Schema do Mineirão (Cruzeiro EC) - Simulação',
-    graph_attr={'rankdir': 'LR', 'splines': 'spline', 'bgcolor': '#f5f5f5'},
-    node_attr={'shape': 'box', 'style': 'filled', 'fontname': 'Inter'}
-)
+def renderizar(esquema, relacionamentos, saida=SAIDA_PADRAO, formato='png'):
+    # Importado aqui: a verificação (CI) não depende do graphviz
+    import graphviz
+
+    # Inicializa o gráfico
+    dot = graphviz.Digraph(
+        'StarSchemaMineirao',
+        comment='Star Schema do Mineirão (Cruzeiro EC) - Simulação',
+        graph_attr={'rankdir': 'LR', 'splines': 'spline', 'bgcolor': '#f5f5f5'},
+        node_attr={'shape': 'box', 'style': 'filled', 'fontname': 'Inter'}
+    )
+
+    chaves_estrangeiras = {(origem, coluna) for origem, _, coluna, _ in relacionamentos}
+
+    # 3.1. Criação dos Nós (Tabelas)
+    for table_name, tabela in esquema['tabelas'].items():
+
+        # Define o estilo do nó baseado no tipo (Fato ou Dimensão)
+        if tabela['grupo'] == "FATOS":
+            color = '#004c99' # Azul escuro (Cruzeiro)
+            fillcolor = '#C9DAF8' # Azul claro (Fatos)
+        else:
+            color = '#1C4587' # Azul médio
+            fillcolor = '#D9EAD3' # Verde claro (Dimensões)
 
-# 2.1. Criação dos Nós (Tabelas)
-for group, tables in schema.items():
-    
-    # Define o estilo do nó baseado no tipo (Fato ou Dimensão)
-    if group == "FATOS":
-        color = '#004c99' # Azul escuro (Cruzeiro)
-        fillcolor = '#C9DAF8' # Azul claro (Fatos)
-        fontcolor = 'white'
-    else:
-        color = '#1C4587' # Azul médio
-        fillcolor = '#D9EAD3' # Verde claro (Dimensões)
-        fontcolor = 'black'
-
-    for table_name, columns in tables.items():
         # Cria o rótulo em formato HTML para melhor visualização das colunas
         label = f'<<TABLE BORDER="0" CELLBORDER="1" CELLSPACING="0" CELLPADDING="4" BGCOLOR="{fillcolor}">'
-        
+
         # O cabeçalho da tabela deve sempre ter COLSPAN=2 para cobrir as colunas de Nome e Tipo de Chave.
         label += f'<TR><TD COLSPAN="2" BGCOLOR="{color}"><B><FONT COLOR="white">{table_name}</FONT></B></TD></TR>'
-        
+
         # Colunas (cada coluna em uma linha separada para manter a clareza)
-        for col in columns:
-            col_color = 'red' if 'PK' in col else 'black'
-            col_label = col.replace('(PK)', '').replace('(FK)', '')
-            
-            # FIX DE ERRO: Garante que col_type não seja uma string vazia (que causa erro de sintaxe no dot)
-            # Se não for PK ou FK, usamos um espaço simples (' ')
-            col_type = 'PK' if 'PK' in col else ('FK' if 'FK' in col else ' ') 
-            
-            label += f'<TR><TD ALIGN="LEFT"><FONT COLOR="{col_color}">{col_label}</FONT></TD><TD ALIGN="RIGHT"><FONT COLOR="gray" POINT-SIZE="10">{col_type}</FONT></TD></TR>'
+        for col, tipo in tabela['colunas'].items():
+            eh_pk = tabela['pk'] == col
+            col_color = 'red' if eh_pk else 'black'
+            col_type = 'PK' if eh_pk else ('FK' if (table_name, col) in chaves_estrangeiras else '')
+            col_type = f"{col_type} {tipo}".strip()
+
+            label += f'<TR><TD ALIGN="LEFT"><FONT COLOR="{col_color}">{col}</FONT></TD><TD ALIGN="RIGHT"><FONT COLOR="gray" POINT-SIZE="10">{col_type}</FONT></TD></TR>'
 
         label += '</TABLE>>'
-        
+
         # Adiciona o nó ao gráfico
         dot.node(table_name, label=label, shape='none')
 
-# 2.2. Criação das Arestas (Relacionamentos)
-for source, target, label in relationships:
-    # Arestas de Fato para Dimensão são sólidas
-    style = 'solid'
-    
-    if "Fato-a-Fato" in label:
-        # Arestas de Fato para Fato são tracejadas
-        style = 'dashed'
-        label = label.replace(" (Fato-a-Fato)", "")
-        
-    dot.edge(source, target, label=label, style=style, color='gray', fontname='Inter')
-
-
-# 2.3. Renderização
-output_file = 'diagrama_star_schema'
-dot.render(output_file, view=False, format='png') 
-print(f"\n---")
-print(f"✅ Diagrama de Relacionamento gerado com sucesso!")
-print(f"Arquivo gerado: {output_file}.png (Requer a instalação do Graphviz no sistema)")
\ No newline at end of file
+    # 3.2. Criação das Arestas (Relacionamentos)
+    for source, target, coluna, sobreposicao in relacionamentos:
+        # Arestas de Fato para Dimensão são sólidas; de Fato para Fato, tracejadas
+        style = 'dashed' if esquema['tabelas'][target]['grupo'] == 'FATOS' else 'solid'
+        label = coluna if sobreposicao == 1 else f"{coluna} ({sobreposicao:.0%})"
+        dot.edge(source, target, label=label, style=style, color='gray', fontname='Inter')
+
+    # 3.3. Renderização
+    dot.render(saida, view=False, format=formato)
+    return f"{saida}.{formato}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o diagrama do Star Schema a partir dos CSVs exportados")
+    parser.add_argument('--pasta', default=PASTA_PADRAO, help=f"Pasta com os CSVs (padrão: {PASTA_PADRAO})")
+    parser.add_argument('--saida', default=SAIDA_PADRAO, help=f"Arquivo do diagrama, sem extensão (padrão: {SAIDA_PADRAO})")
+    parser.add_argument('--formato', default='png', help="Formato do diagrama (padrão: png)")
+    parser.add_argument('--amostra', type=int, default=AMOSTRA_LINHAS, help=f"Linhas lidas por tabela (padrão: {AMOSTRA_LINHAS})")
+    parser.add_argument('--verificar', action='store_true', help="Só verifica o esquema (sem desenhar); código 1 se houver problemas")
+    parser.add_argument('--esperado', metavar='JSON', help="Esquema gravado para comparar no modo --verificar")
+    parser.add_argument('--gravar-esquema', metavar='JSON', help="Grava o esquema inferido em JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.pasta):
+        print(f"⚠ Pasta não encontrada: {args.pasta}")
+        return 1
+
+    esquema, relacionamentos, problemas = montar_esquema(args.pasta, args.amostra)
+    print(f"✓ {len(esquema['tabelas'])} tabelas e {len(relacionamentos)} relacionamentos inferidos em '{args.pasta}'")
+
+    if args.gravar_esquema:
+        with open(args.gravar_esquema, 'w', encoding='utf-8') as f:
+            json.dump(esquema, f, ensure_ascii=False, indent=2)
+        print(f"✓ Esquema gravado em {args.gravar_esquema}")
+
+    if args.verificar:
+        if args.esperado:
+            with open(args.esperado, encoding='utf-8') as f:
+                problemas += comparar_esquemas(esquema, json.load(f))
+        for problema in problemas:
+            print(f"  ⚠ {problema}")
+        if problemas:
+            print(f"⚠ Verificação do esquema falhou ({len(problemas)} problema(s))")
+            return 1
+        print("✅ Esquema consistente")
+        return 0
+
+    for problema in problemas:
+        print(f"  ⚠ {problema}")
+
+    try:
+        arquivo = renderizar(esquema, relacionamentos, args.saida, args.formato)
+    except ImportError:
+        print("⚠ Pacote graphviz não instalado (pip install graphviz); use --verificar ou --gravar-esquema")
+        return 1
+
+    print(f"\n---")
+    print(f"✅ Diagrama de Relacionamento gerado com sucesso!")
+    print(f"Arquivo gerado: {arquivo} (Requer a instalação do Graphviz no sistema)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
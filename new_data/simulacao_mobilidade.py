@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Simulação de fluxo de torcedores nos portões do Mineirão (Tema 5: Mobilidade, Tema 10: Incidentes)
+
+Todas as grandezas são arrays com eixos (jogos, setores, minutos), então uma
+temporada inteira é simulada minuto a minuto com operações vetorizadas:
+
+- chegada: curva de chegada aos portões antes do início do jogo, com pico
+  e dispersão por setor e deslocamento aleatório por jogo;
+- entrada: fila por setor com vazão limitada pelos portões de tipo_acesso
+  (recursão de Lindley resolvida com cumsum / minimum.accumulate);
+- saída: esvaziamento do setor pela vazão de saída dos mesmos portões;
+- incidentes: sorteios de Poisson proporcionais ao público e à densidade.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Janela simulada: de 180 minutos antes até 15 minutos depois do início
+MINUTO_INICIAL = -180
+MINUTO_FINAL = 15
+
+# Parâmetros de operação (pessoas por minuto por portão, minutos)
+VAZAO_ENTRADA_POR_PORTAO = 25
+VAZAO_SAIDA_POR_PORTAO = 80
+DESLOCAMENTO_ENTRADA_MIN = 5
+DESLOCAMENTO_SAIDA_MIN = 8
+
+# Incidentes por torcedor em setor vazio e o ganho em setor lotado
+TAXA_INCIDENTE_BASE = 0.00004
+GANHO_INCIDENTE_DENSIDADE = 3.0
+
+
+def contar_portoes(tipo_acesso):
+    """
+    Número de portões de cada setor a partir de tipo_acesso
+
+    'Portão 1-3' -> 3, 'Portão 13' -> 1
+    """
+    contagens = []
+    for texto in tipo_acesso:
+        numeros = [int(n) for n in re.findall(r'\d+', str(texto))]
+        if len(numeros) >= 2:
+            contagens.append(numeros[-1] - numeros[0] + 1)
+        else:
+            contagens.append(1)
+    return np.array(contagens)
+
+
+def curvas_chegada(n_jogos, n_setores, rng, pico_min=-45.0, dispersao_min=30.0, variacao_pico_min=10.0):
+    """
+    Fração do público do setor que chega em cada minuto
+
+    Curva normal truncada na janela simulada, com o pico deslocado
+    aleatoriamente por jogo e setor.
+
+    Returns:
+        (minutos, fracoes): minutos relativos ao início e array
+        (jogos, setores, minutos) que soma 1 no eixo dos minutos
+    """
+    minutos = np.arange(MINUTO_INICIAL, MINUTO_FINAL + 1)
+    pico = np.broadcast_to(pico_min, (n_jogos, n_setores)) + rng.normal(0, variacao_pico_min, (n_jogos, n_setores))
+    dispersao = np.broadcast_to(dispersao_min, (n_jogos, n_setores))
+    
+    densidade = np.exp(-0.5 * ((minutos[None, None, :] - pico[..., None]) / dispersao[..., None]) ** 2)
+    return minutos, densidade / densidade.sum(axis=2, keepdims=True)
+
+
+def simular_fila(chegadas, vazao):
+    """
+    Fila de entrada minuto a minuto (recursão de Lindley vetorizada)
+
+    fila_t = max(0, fila_{t-1} + chegadas_t - vazao), resolvida como
+    S_t - min(0, min_{k<=t} S_k) com S = soma acumulada de (chegadas - vazao).
+
+    Args:
+        chegadas: array (..., minutos)
+        vazao: pessoas atendidas por minuto, broadcast em (..., 1)
+
+    Returns:
+        Array (..., minutos) com o tamanho da fila ao fim de cada minuto
+    """
+    saldo = np.cumsum(chegadas - vazao, axis=-1)
+    return saldo - np.minimum(np.minimum.accumulate(saldo, axis=-1), 0)
+
+
+def simular_mobilidade(publico_setor, capacidade_setor, n_portoes, rng):
+    """
+    Simula entrada, saída e incidentes para todos os jogos × setores
+
+    Args:
+        publico_setor: array (jogos, setores) com o público de cada setor
+        capacidade_setor: array (setores,) com a capacidade de cada setor
+        n_portoes: array (setores,) com o número de portões de cada setor
+        rng: numpy.random.Generator
+
+    Returns:
+        dict com 'minutos', 'chegadas' e 'fila' (jogos, setores, minutos) e
+        os resumos por jogo × setor: 'tempo_entrada_medio_min',
+        'tempo_saida_medio_min', 'incidente_contagem', 'tempo_resposta_min'
+    """
+    n_jogos, n_setores = publico_setor.shape
+    vazao_entrada = (n_portoes * VAZAO_ENTRADA_POR_PORTAO)[None, :, None]
+    vazao_saida = (n_portoes * VAZAO_SAIDA_POR_PORTAO)[None, :]
+    
+    # Chegadas (Poisson em torno da curva esperada) e fila nos portões
+    minutos, fracoes = curvas_chegada(n_jogos, n_setores, rng)
+    chegadas = rng.poisson(publico_setor[..., None] * fracoes)
+    fila = simular_fila(chegadas, vazao_entrada)
+    
+    # Espera de quem chega no minuto t ~ fila_t / vazão (FIFO), ponderada pelas chegadas
+    espera = fila / vazao_entrada
+    total_chegadas = np.maximum(chegadas.sum(axis=2), 1)
+    tempo_entrada = DESLOCAMENTO_ENTRADA_MIN + (chegadas * espera).sum(axis=2) / total_chegadas
+    
+    # Saída: todos deixam o setor no apito final; espera média = metade do tempo de esvaziamento
+    tempo_saida = (DESLOCAMENTO_SAIDA_MIN + publico_setor / vazao_saida / 2
+                   + rng.normal(0, 2, (n_jogos, n_setores)))
+    
+    # Incidentes: Poisson com taxa crescente com a densidade do setor
+    densidade = publico_setor / capacidade_setor[None, :]
+    taxa = TAXA_INCIDENTE_BASE * (1 + GANHO_INCIDENTE_DENSIDADE * densidade ** 2)
+    incidentes = rng.poisson(publico_setor * taxa)
+    
+    tempo_resposta = rng.normal(7, 2, (n_jogos, n_setores))
+    
+    return {
+        'minutos': minutos,
+        'chegadas': chegadas,
+        'fila': fila,
+        'tempo_entrada_medio_min': np.round(np.maximum(5, tempo_entrada), 1),
+        'tempo_saida_medio_min': np.round(np.maximum(10, tempo_saida), 1),
+        'incidente_contagem': incidentes,
+        'tempo_resposta_min': np.round(np.maximum(3, tempo_resposta), 1),
+    }
+
+
+def fato_mobilidade_incidentes(fato_jogos, dim_setor, rng, publico_minimo=1000):
+    """
+    Monta FATO_MOBILIDADE_INCIDENTES a partir de FATO_JOGOS e DIM_SETOR
+
+    O público de cada setor é a capacidade × taxa de ocupação do jogo com
+    variação de ±10%; setores com até publico_minimo torcedores são omitidos.
+    """
+    capacidade = dim_setor['capacidade_mil'].to_numpy(dtype=float) * 1000
+    n_portoes = contar_portoes(dim_setor['tipo_acesso'])
+    ocupacao = fato_jogos['taxa_ocupacao'].to_numpy(dtype=float) / 100
+    
+    fator_ocupacao = ocupacao[:, None] * rng.uniform(0.9, 1.1, (len(fato_jogos), len(dim_setor)))
+    publico_setor = (capacidade[None, :] * fator_ocupacao).astype(np.int64)
+    
+    simulacao = simular_mobilidade(publico_setor, capacidade, n_portoes, rng)
+    
+    jogo_id = np.repeat(fato_jogos['jogo_id'].to_numpy(), len(dim_setor))
+    setor_id = np.tile(dim_setor['setor_id'].to_numpy(), len(fato_jogos))
+    fato = pd.DataFrame({
+        'jogo_id': jogo_id,
+        'setor_id': setor_id,
+        'publico_setor': publico_setor.ravel(),
+        'tempo_entrada_medio_min': simulacao['tempo_entrada_medio_min'].ravel(),
+        'tempo_saida_medio_min': simulacao['tempo_saida_medio_min'].ravel(),
+        'incidente_contagem': simulacao['incidente_contagem'].ravel(),
+        'tempo_resposta_min': simulacao['tempo_resposta_min'].ravel(),
+    })
+    return fato[fato['publico_setor'] > publico_minimo].reset_index(drop=True)
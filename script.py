@@ -1,77 +1,1648 @@
-import pandas as pd
-import numpy as np
 from datetime import datetime
 import warnings
 import os
+import importlib
+import logging
+import re
+import time
+import contextlib
+import unicodedata
+import sys
 import glob
+import gzip
+import hashlib
+import pickle
+import functools
+import argparse
+import json
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
+# Mensagens de mapeamento e carga; main() direciona para a saída padrão conforme -v/-q
+log = logging.getLogger('cruzeiro_powerbi')
+
+
+class ModuloSobDemanda:
+    """
+    Importa um módulo pesado só no primeiro uso
+    
+    pd e np são instâncias desta classe, então importar o script e comandos
+    leves (--listar, --fontes, --estado-cache) não carregam pandas/numpy. No
+    primeiro acesso a um atributo o módulo real é importado e substitui o
+    proxy nos globais do script; os acessos seguintes vão direto ao módulo.
+    """
+    
+    def __init__(self, nome, apelido):
+        self._nome = nome
+        self._apelido = apelido
+    
+    def __getattr__(self, atributo):
+        modulo = importlib.import_module(self._nome)
+        globals()[self._apelido] = modulo
+        return getattr(modulo, atributo)
+
+
+pd = ModuloSobDemanda('pandas', 'pd')
+np = ModuloSobDemanda('numpy', 'np')
+
+
+class DatasetsSobDemanda(MutableMapping):
+    """
+    Dicionário de DataFrames que só lê cada fonte no primeiro acesso
+    
+    Fontes são registradas com um carregador (função sem argumentos que
+    devolve um DataFrame). O resultado é memorizado, então cada CSV é lido
+    no máximo uma vez. Tabelas derivadas continuam sendo atribuídas
+    normalmente com self.dfs['nome'] = df.
+    """
+    
+    def __init__(self):
+        self._carregadores = {}
+        self._dados = {}
+        self._lock = threading.Lock()
+        self._locks_fonte = {}
+    
+    def registrar(self, nome, carregador):
+        """Registra (ou substitui) o carregador de uma fonte, descartando o valor memorizado"""
+        self._dados.pop(nome, None)
+        self._carregadores[nome] = carregador
+    
+    def carregados(self):
+        """Lista as chaves que já estão em memória"""
+        return list(self._dados)
+    
+    def pendentes(self):
+        """Lista as fontes registradas que ainda não foram lidas"""
+        return [nome for nome in self._carregadores if nome not in self._dados]
+    
+    def __getitem__(self, nome):
+        if nome in self._dados:
+            return self._dados[nome]
+        if nome not in self._carregadores:
+            raise KeyError(nome)
+        
+        # Um lock por fonte: leituras concorrentes da mesma fonte esperam a primeira
+        with self._lock:
+            lock_fonte = self._locks_fonte.setdefault(nome, threading.Lock())
+        with lock_fonte:
+            if nome not in self._dados:
+                self._dados[nome] = self._carregadores[nome]()
+        return self._dados[nome]
+    
+    def __setitem__(self, nome, valor):
+        self._dados[nome] = valor
+    
+    def __delitem__(self, nome):
+        if nome not in self._dados and nome not in self._carregadores:
+            raise KeyError(nome)
+        self._dados.pop(nome, None)
+        self._carregadores.pop(nome, None)
+    
+    def __contains__(self, nome):
+        # Não dispara a leitura: basta a fonte estar registrada
+        return nome in self._dados or nome in self._carregadores
+    
+    def __iter__(self):
+        yield from self._dados
+        yield from (nome for nome in self._carregadores if nome not in self._dados)
+    
+    def __len__(self):
+        return len(set(self._dados) | set(self._carregadores))
+
+
+# ==============================================================================
+# Armazenamento binário de fatos (leitura via numpy.memmap)
+# ==============================================================================
+
+PASTA_FATOS_BINARIOS = '_fatos'
+
+
+def caminho_fato_binario(caminho_csv):
+    """Pasta do armazenamento binário correspondente a um CSV"""
+    pasta, arquivo = os.path.split(caminho_csv)
+    return os.path.join(pasta, PASTA_FATOS_BINARIOS, os.path.splitext(arquivo)[0] + '.fatos')
+
+
+def gravar_fato_binario(df, destino, origem=None):
+    """
+    Grava um DataFrame no formato binário de fatos
+    
+    Cada coluna vira um arquivo de largura fixa: colunas numéricas e booleanas
+    no dtype nativo, datas como int64 (nanossegundos) e textos codificados em
+    dicionário (códigos int32, -1 para nulo, com o dicionário no esquema).
+    
+    Args:
+        df: DataFrame a gravar
+        destino: Pasta de destino (criada se necessário)
+        origem: CSV de origem; seu mtime e tamanho ficam no esquema para
+            detectar armazenamentos desatualizados
+    """
+    os.makedirs(destino, exist_ok=True)
+    colunas = []
+    
+    for i, coluna in enumerate(df.columns):
+        serie = df[coluna]
+        arquivo = f"{i:04d}.bin"
+        info = {'nome': coluna, 'arquivo': arquivo}
+        
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            valores = serie.to_numpy(dtype='datetime64[ns]').view('int64')
+            info.update(tipo='data', dtype='int64')
+        elif pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            valores = serie.to_numpy()
+            info.update(tipo='numerico', dtype=valores.dtype.str)
+        else:
+            codigos, categorias = pd.factorize(serie, use_na_sentinel=True)
+            valores = codigos.astype('int32')
+            info.update(tipo='texto', dtype='int32', dicionario=[str(c) for c in categorias])
+        
+        np.ascontiguousarray(valores).tofile(os.path.join(destino, arquivo))
+        colunas.append(info)
+    
+    esquema = {'versao': 1, 'linhas': len(df), 'colunas': colunas}
+    if origem is not None:
+        stat = os.stat(origem)
+        esquema['origem'] = {'arquivo': os.path.basename(origem),
+                             'mtime_ns': stat.st_mtime_ns, 'tamanho': stat.st_size}
+    
+    with open(os.path.join(destino, 'esquema.json'), 'w', encoding='utf-8') as f:
+        json.dump(esquema, f, ensure_ascii=False, indent=2)
+
+
+def ler_fato_binario(destino):
+    """
+    Lê um armazenamento binário de fatos sem copiar as colunas numéricas
+    
+    Colunas numéricas e de data são numpy.memmap somente-leitura: nada é lido
+    do disco até a coluna ser acessada. Textos são decodificados do dicionário.
+    """
+    with open(os.path.join(destino, 'esquema.json'), encoding='utf-8') as f:
+        esquema = json.load(f)
+    
+    linhas = esquema['linhas']
+    colunas = {}
+    for info in esquema['colunas']:
+        caminho = os.path.join(destino, info['arquivo'])
+        if linhas == 0:
+            valores = np.empty(0, dtype=info['dtype'])
+        else:
+            valores = np.memmap(caminho, dtype=info['dtype'], mode='r', shape=(linhas,))
+        
+        if info['tipo'] == 'data':
+            colunas[info['nome']] = valores.view('datetime64[ns]')
+        elif info['tipo'] == 'texto':
+            dicionario = np.array(info['dicionario'] + [np.nan], dtype=object)
+            # Código -1 (nulo) indexa o NaN no fim do dicionário
+            colunas[info['nome']] = dicionario[valores]
+        else:
+            colunas[info['nome']] = valores
+    
+    return pd.DataFrame(colunas, copy=False)
+
+
+def ler_csv_fato(caminho_csv):
+    """Lê um CSV de fatos, aceitando também o formato ';' + decimal ',' do Star Schema"""
+    with open(caminho_csv, encoding='utf-8') as f:
+        cabecalho = f.readline()
+    if ';' in cabecalho:
+        return pd.read_csv(caminho_csv, sep=';', decimal=',')
+    return pd.read_csv(caminho_csv)
+
+
+def fato_binario_atualizado(caminho_csv):
+    """True se existe armazenamento binário gravado a partir da versão atual do CSV"""
+    esquema_path = os.path.join(caminho_fato_binario(caminho_csv), 'esquema.json')
+    if not os.path.exists(esquema_path):
+        return False
+    with open(esquema_path, encoding='utf-8') as f:
+        origem = json.load(f).get('origem')
+    if not origem:
+        return False
+    stat = os.stat(caminho_csv)
+    return origem['mtime_ns'] == stat.st_mtime_ns and origem['tamanho'] == stat.st_size
+
+
+def ajustar_fatores_log(y_log, fatores, passes=10, suavizacao=5.0):
+    """
+    Ajusta um modelo multiplicativo log(y) = base + soma dos efeitos de cada fator
+    
+    Os efeitos são estimados por backfitting: a cada passada, o efeito de cada
+    nível é a média dos resíduos dos jogos daquele nível, encolhida em direção
+    a zero por n / (n + suavizacao) para níveis com poucos jogos. Fatores
+    ausentes (NaN) não contribuem para o jogo.
+    
+    Args:
+        y_log: Series com o logaritmo do alvo
+        fatores: DataFrame com uma coluna categórica por fator (mesmo índice de y_log)
+    
+    Returns:
+        (base, efeitos, sigma): intercepto, {fator: Series nível -> efeito} e
+        desvio-padrão dos resíduos
+    """
+    base = y_log.mean()
+    efeitos = {fator: pd.Series(dtype=float) for fator in fatores.columns}
+    contribuicao = pd.DataFrame(0.0, index=y_log.index, columns=fatores.columns)
+    
+    for _ in range(passes):
+        for fator in fatores.columns:
+            residuo = y_log - base - contribuicao.drop(columns=fator).sum(axis=1)
+            grupos = residuo.groupby(fatores[fator])
+            efeitos[fator] = grupos.mean() * grupos.size() / (grupos.size() + suavizacao)
+            contribuicao[fator] = fatores[fator].map(efeitos[fator]).fillna(0.0).astype(float)
+    
+    residuo = y_log - base - contribuicao.sum(axis=1)
+    sigma = float(residuo.std(ddof=1)) if len(residuo) > 1 else 0.0
+    return base, efeitos, sigma
+
+
+class AgregadosKPI:
+    """
+    Agregados materializados de KPIs em vários grãos
+    
+    Para cada base (conjunto de jogos), grão e chave guarda estatísticas
+    combináveis (soma, contagem, mínimo, máximo e número de jogos), então
+    novos jogos são incorporados sem reprocessar o fato inteiro. As médias
+    saem de soma / contagem na hora de montar a tabela.
+    """
+    
+    # Grão -> coluna de agrupamento (None = total geral)
+    GRAOS = {
+        'geral': None,
+        'ano': 'ano',
+        'competicao': 'competicao',
+        'tipo_adversario': 'tipo_adversario',
+        'era': 'era',
+    }
+    
+    METRICAS = ['publico_total', 'total_arrecadado', 'ticket_medio_ingresso', 'receita_per_capita']
+    
+    def __init__(self):
+        # (base, grão) -> {'soma'|'contagem'|'minimo'|'maximo': DataFrame chave × métrica, 'jogos': Series}
+        self._parciais = {}
+    
+    def adicionar(self, jogos, base):
+        """
+        Incorpora jogos novos aos agregados de uma base
+        
+        Args:
+            jogos: DataFrame com as colunas de METRICAS e de GRAOS disponíveis
+            base: Nome da base (ex.: 'fato_consolidado')
+        """
+        metricas = [m for m in self.METRICAS if m in jogos.columns]
+        valores = jogos[metricas].apply(pd.to_numeric, errors='coerce')
+        
+        for grao, coluna in self.GRAOS.items():
+            if coluna is None:
+                chave = pd.Series('Total', index=jogos.index)
+            elif coluna in jogos.columns:
+                chave = jogos[coluna]
+            else:
+                continue
+            
+            grupos = valores.groupby(chave)
+            novo = {
+                'soma': grupos.sum(),
+                'contagem': grupos.count(),
+                'minimo': grupos.min(),
+                'maximo': grupos.max(),
+                'jogos': grupos.size(),
+            }
+            
+            atual = self._parciais.get((base, grao))
+            if atual is not None:
+                novo = {
+                    estatistica: getattr(pd.concat([atual[estatistica], parcial]).groupby(level=0),
+                                         'sum' if estatistica in ('soma', 'contagem', 'jogos') else
+                                         'min' if estatistica == 'minimo' else 'max')()
+                    for estatistica, parcial in novo.items()
+                }
+            self._parciais[(base, grao)] = novo
+    
+    def valor(self, base, metrica, estatistica='media', grao='geral', chave='Total'):
+        """Valor agregado pontual (ex.: média de público no total geral)"""
+        parcial = self._parciais.get((base, grao))
+        if parcial is None:
+            return np.nan
+        if estatistica == 'jogos':
+            return parcial['jogos'].get(chave, 0)
+        if metrica not in parcial['soma'].columns or chave not in parcial['soma'].index:
+            return np.nan
+        if estatistica == 'media':
+            contagem = parcial['contagem'].at[chave, metrica]
+            return parcial['soma'].at[chave, metrica] / contagem if contagem else np.nan
+        return parcial[estatistica].at[chave, metrica]
+    
+    def metricas(self, base):
+        """Métricas disponíveis para uma base"""
+        parcial = self._parciais.get((base, 'geral'))
+        return [] if parcial is None else list(parcial['soma'].columns)
+    
+    def tabela(self):
+        """Tabela longa e numérica: base, grao, chave, metrica, jogos, contagem, soma, media, minimo, maximo"""
+        linhas = []
+        for (base, grao), parcial in self._parciais.items():
+            for metrica in parcial['soma'].columns:
+                bloco = pd.DataFrame({
+                    'jogos': parcial['jogos'],
+                    'contagem': parcial['contagem'][metrica],
+                    'soma': parcial['soma'][metrica],
+                    'minimo': parcial['minimo'][metrica],
+                    'maximo': parcial['maximo'][metrica],
+                })
+                bloco['media'] = bloco['soma'] / bloco['contagem'].where(bloco['contagem'] > 0)
+                bloco.index = [str(int(k)) if isinstance(k, float) and k.is_integer() else str(k)
+                               for k in bloco.index]
+                bloco = bloco.rename_axis('chave').reset_index()
+                bloco.insert(0, 'metrica', metrica)
+                bloco.insert(0, 'grao', grao)
+                bloco.insert(0, 'base', base)
+                linhas.append(bloco)
+        
+        if not linhas:
+            return pd.DataFrame()
+        colunas = ['base', 'grao', 'chave', 'metrica', 'jogos', 'contagem', 'soma', 'media', 'minimo', 'maximo']
+        return pd.concat(linhas, ignore_index=True)[colunas]
+
+
+# ==============================================================================
+# Gravação de CSV em blocos (memória limitada, compressão opcional)
+# ==============================================================================
+
+EXTENSOES_COMPRESSAO = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+OPCOES_EXPORTACAO_PADRAO = {'compressao': None, 'float_format': None, 'linhas_por_bloco': 100_000}
+
+
+def _abrir_saida_comprimida(caminho, compressao):
+    """Abre o arquivo de destino em modo binário, com o compressor pedido"""
+    if compressao is None:
+        return open(caminho, 'wb')
+    if compressao == 'gzip':
+        # mtime fixo mantém o .gz idêntico entre execuções com os mesmos dados
+        return gzip.GzipFile(caminho, 'wb', compresslevel=6, mtime=0)
+    if compressao == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(caminho, 'wb'), closefd=True)
+    raise ValueError(f"Compressão desconhecida: {compressao} (use {', '.join(c for c in EXTENSOES_COMPRESSAO if c)})")
+
+
+def _formatos_datas(df):
+    """
+    Formato fixo para cada coluna de data do DataFrame
+
+    O to_csv escolhe entre 'AAAA-MM-DD' e data + hora olhando os valores que
+    recebe; bloco a bloco, a mesma coluna poderia sair nos dois formatos.
+    """
+    formatos = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if not pd.api.types.is_datetime64_dtype(serie.dtype):
+            continue
+        if ((serie.dt.normalize() == serie) | serie.isna()).all():
+            formatos[coluna] = '%Y-%m-%d'
+        elif ((serie.dt.floor('s') != serie) & serie.notna()).any():
+            formatos[coluna] = '%Y-%m-%d %H:%M:%S.%f'
+        else:
+            formatos[coluna] = '%Y-%m-%d %H:%M:%S'
+    return formatos
+
+
+def gravar_csv_em_blocos(df, caminho, linhas_por_bloco=100_000, compressao=None,
+                         float_format=None, index=False, encoding='utf-8-sig', colunas_fixas=None):
+    """
+    Grava um DataFrame em CSV formatando e descarregando um bloco de linhas por vez
+
+    Equivale a df.to_csv(caminho, index=index, encoding=encoding), mas o texto
+    nunca existe inteiro em memória: o pico fica limitado ao tamanho do bloco.
+
+    Args:
+        df: DataFrame a gravar
+        caminho: Arquivo de destino (a extensão da compressão é acrescentada)
+        linhas_por_bloco: Linhas formatadas por vez
+        compressao: None, 'gzip' ou 'zstd'
+        float_format: Formato dos números decimais (ex.: '%.2f')
+        index: Grava também o índice
+        encoding: Codificação; com 'utf-8-sig' o BOM sai apenas no início
+        colunas_fixas: {coluna: valor} acrescentadas ao fim de cada linha
+            (ex.: a partição de origem), sem copiar o DataFrame inteiro
+
+    Returns:
+        Caminho efetivamente gravado
+    """
+    caminho = caminho + EXTENSOES_COMPRESSAO[compressao]
+    linhas_por_bloco = max(int(linhas_por_bloco), 1)
+    formatos = _formatos_datas(df)
+    encoding_blocos = 'utf-8' if encoding.lower().replace('_', '-') == 'utf-8-sig' else encoding
+
+    colunas_fixas = colunas_fixas or {}
+    
+    temporario = caminho + '.tmp'
+    with _abrir_saida_comprimida(temporario, compressao) as saida:
+        saida.write(df.iloc[:0].assign(**colunas_fixas).to_csv(index=index, float_format=float_format).encode(encoding))
+        for inicio in range(0, len(df), linhas_por_bloco):
+            bloco = df.iloc[inicio:inicio + linhas_por_bloco]
+            if formatos or colunas_fixas:
+                bloco = bloco.assign(**{c: bloco[c].dt.strftime(f) for c, f in formatos.items()}, **colunas_fixas)
+            texto = bloco.to_csv(header=False, index=index, float_format=float_format)
+            saida.write(texto.encode(encoding_blocos))
+    os.replace(temporario, caminho)
+    return caminho
+
+
+
+# ==============================================================================
+# Métricas de execução (JSON lines ou texto Prometheus)
+# ==============================================================================
+
+PREFIXO_METRICAS = 'cruzeiro_powerbi'
+
+
+class EmissorMetricas:
+    """
+    Registra eventos do pipeline (carga, etapa, exportação, cache) em arquivo
+    
+    Cada evento tem um tipo e campos: textos viram rótulos, números viram
+    valores. Em 'jsonl' cada evento é uma linha gravada na hora; em
+    'prometheus' o arquivo é reescrito inteiro em fechar(), no formato de
+    texto do node_exporter (textfile collector), com uma série
+    <prefixo>_<tipo>_<campo>{rótulos} por valor numérico. Sem destino o
+    emissor fica inativo e evento() retorna de imediato.
+    """
+    
+    FORMATOS = ('jsonl', 'prometheus')
+    
+    def __init__(self, destino=None, formato=None, rotulos=None):
+        if formato is None and destino is not None:
+            formato = 'prometheus' if destino.endswith('.prom') else 'jsonl'
+        if formato is not None and formato not in self.FORMATOS:
+            raise ValueError(f"Formato de métricas desconhecido: {formato}")
+        self.destino = destino
+        self.formato = formato
+        self.rotulos = dict(rotulos or {})
+        self.ativo = destino is not None
+        self._series = {}
+        self._arquivo = None
+        self._lock = threading.Lock()
+    
+    def evento(self, tipo, **campos):
+        """Registra um evento; campos str são rótulos e int/float são valores"""
+        if not self.ativo:
+            return
+        with self._lock:
+            if self.formato == 'jsonl':
+                if self._arquivo is None:
+                    pasta = os.path.dirname(self.destino)
+                    if pasta:
+                        os.makedirs(pasta, exist_ok=True)
+                    self._arquivo = open(self.destino, 'a', encoding='utf-8')
+                registro = {'ts': round(time.time(), 3), 'tipo': tipo, **self.rotulos, **campos}
+                self._arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+                self._arquivo.flush()
+                return
+            
+            rotulos = {**self.rotulos, **{k: v for k, v in campos.items() if isinstance(v, str)}}
+            chave_rotulos = tuple(sorted(rotulos.items()))
+            for campo, valor in campos.items():
+                if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                    continue
+                self._series[(f"{PREFIXO_METRICAS}_{tipo}_{campo}", chave_rotulos)] = valor
+    
+    @staticmethod
+    def _escapar_rotulo(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def _texto_prometheus(self):
+        linhas = []
+        anterior = None
+        for (metrica, rotulos), valor in sorted(self._series.items()):
+            if metrica != anterior:
+                linhas.append(f"# TYPE {metrica} gauge")
+                anterior = metrica
+            texto_rotulos = ','.join(f'{k}="{self._escapar_rotulo(v)}"' for k, v in rotulos)
+            linhas.append(f"{metrica}{{{texto_rotulos}}} {valor!r}" if texto_rotulos else f"{metrica} {valor!r}")
+        return '\n'.join(linhas) + '\n'
+    
+    def fechar(self):
+        """Fecha o arquivo JSON lines ou grava o texto Prometheus (escrita atômica)"""
+        if not self.ativo:
+            return
+        with self._lock:
+            if self.formato == 'jsonl':
+                if self._arquivo is not None:
+                    self._arquivo.close()
+                    self._arquivo = None
+                return
+            pasta = os.path.dirname(self.destino)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            temporario = f"{self.destino}.{os.getpid()}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                f.write(self._texto_prometheus())
+            os.replace(temporario, self.destino)
+
+
+# ==============================================================================
+# Memoização das etapas criar_* (cache LRU em disco)
+# ==============================================================================
+
+PASTA_CACHE_ETAPAS = os.path.join('cruzeiro_powerbi', 'etapas')
+
+
+def pasta_cache_etapas(pasta_dados):
+    """
+    Pasta padrão do cache de etapas de uma pasta de dados
+    
+    Fica no diretório de cache do usuário ($XDG_CACHE_HOME ou ~/.cache), não
+    junto dos CSVs, que podem estar numa pasta somente leitura. Cada pasta de
+    dados tem a sua subpasta (nome + hash do caminho absoluto).
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    pasta = os.path.abspath(pasta_dados)
+    sufixo = hashlib.blake2b(pasta.encode('utf-8'), digest_size=6).hexdigest()
+    return os.path.join(base, PASTA_CACHE_ETAPAS, f"{os.path.basename(pasta) or 'raiz'}-{sufixo}")
+
+
+@functools.cache
+def versao_codigo():
+    """Hash deste arquivo: qualquer mudança no código invalida o cache de etapas (lido no primeiro uso)"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def impressao_dataframe(df):
+    """Hash do conteúdo de um DataFrame (colunas, tipos, índice e valores)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Células não hasheáveis (listas, dicts): cai para a serialização
+        h.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
+
+
+def impressao_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Hash do conteúdo de um arquivo, lido em blocos"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheEtapas:
+    """
+    Cache LRU em disco para os resultados das etapas criar_*
+    
+    Cada entrada é um pickle <chave>.pkl. Um acerto atualiza o mtime do
+    arquivo, que serve de ordem de uso; ao gravar, as entradas usadas há
+    mais tempo são removidas até o total caber em limite_bytes. Falhas de
+    escrita (pasta sem permissão, disco cheio) viram um aviso: a etapa
+    continua valendo, só não fica no cache.
+    """
+    
+    def __init__(self, pasta, limite_bytes=256 * 2**20):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.erros_gravacao = 0
+        self._lock = threading.Lock()
+    
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, f"{chave}.pkl")
+    
+    def obter(self, chave):
+        """Conteúdo gravado para a chave, ou None"""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                conteudo = pickle.load(f)
+            os.utime(caminho)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            with self._lock:
+                self.falhas += 1
+            return None
+        with self._lock:
+            self.acertos += 1
+        return conteudo
+    
+    def gravar(self, chave, conteudo):
+        """Grava uma entrada (escrita atômica) e aplica o limite de tamanho; False se a escrita falhar"""
+        temporario = self._caminho(chave) + f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(temporario, 'wb') as f:
+                pickle.dump(conteudo, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, self._caminho(chave))
+        except OSError as e:
+            with self._lock:
+                self.erros_gravacao += 1
+                primeiro = self.erros_gravacao == 1
+            with contextlib.suppress(OSError):
+                os.remove(temporario)
+            if primeiro:
+                log.warning(f"⚠ Cache de etapas: não foi possível gravar em {self.pasta} ({e}); "
+                            f"as etapas seguem sem cache")
+            return False
+        self._despejar()
+        return True
+    
+    def _entradas(self):
+        """(mtime, tamanho, caminho) de cada entrada, da usada há mais tempo para a mais recente"""
+        entradas = []
+        for caminho in glob.glob(os.path.join(self.pasta, '*.pkl')):
+            try:
+                stat = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((stat.st_mtime_ns, stat.st_size, caminho))
+        return sorted(entradas)
+    
+    def _despejar(self):
+        with self._lock:
+            entradas = self._entradas()
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            for _, tamanho, caminho in entradas[:-1]:
+                if total <= self.limite_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                self.despejos += 1
+    
+    def tamanho(self):
+        """(entradas, bytes) atualmente em disco"""
+        entradas = self._entradas()
+        return len(entradas), sum(tamanho for _, tamanho, _ in entradas)
+    
+    def limpar(self):
+        """Remove todas as entradas"""
+        for _, _, caminho in self._entradas():
+            try:
+                os.remove(caminho)
+            except OSError as e:
+                log.warning(f"⚠ Cache de etapas: não foi possível remover {caminho} ({e})")
+    
+    def estatisticas(self):
+        """Contadores da execução e ocupação em disco"""
+        entradas, total = self.tamanho()
+        return {'acertos': self.acertos, 'falhas': self.falhas, 'despejos': self.despejos,
+                'erros_gravacao': self.erros_gravacao, 'entradas': entradas, 'bytes': total}
+    
+    def resumo(self):
+        e = self.estatisticas()
+        consultas = e['acertos'] + e['falhas']
+        taxa = f" ({e['acertos'] / consultas:.0%} de acerto)" if consultas else ""
+        erros = f", {e['erros_gravacao']} erro(s) de gravação" if e['erros_gravacao'] else ""
+        return (f"Cache de etapas: {e['acertos']} acerto(s), {e['falhas']} falha(s){taxa}, "
+                f"{e['despejos']} despejo(s){erros}; {e['entradas']} entrada(s), "
+                f"{e['bytes'] / 2**20:.1f} MB em disco ({self.pasta})")
+
+
+def memoizar_etapa(metodo):
+    """
+    Memoiza uma etapa criar_* do CruzeiroPowerBIExporter no cache em disco
+    
+    A chave combina o nome da etapa, o hash do código, os argumentos e a
+    impressão de cada dataset de entrada (ver _impressao_dataset). Num
+    acerto, os datasets de saída e os atributos em ATRIBUTOS_ETAPAS são
+    restaurados sem executar a etapa. Com métricas ativas, cada execução
+    emite um evento 'etapa' (duração, resultado do cache, linhas de entrada
+    e de saída).
+    """
+    
+    def _executar_etapa(self, args, kwargs):
+        """(retorno, resultado do cache: 'acerto', 'falha' ou 'desativado')"""
+        if self.cache_etapas is None:
+            return metodo(self, *args, **kwargs), 'desativado'
+        
+        nome = metodo.__name__
+        chave = self._chave_etapa(nome, args, kwargs)
+        saidas = [ds for ds, (m, _) in self.ETAPAS.items() if m == nome and ds != 'matriz_correlacao']
+        atributos = self.ATRIBUTOS_ETAPAS.get(nome, [])
+        
+        conteudo = self.cache_etapas.obter(chave)
+        if conteudo is not None:
+            for dataset, df in conteudo['datasets'].items():
+                self.dfs[dataset] = df
+            for atributo, valor in conteudo['atributos'].items():
+                setattr(self, atributo, valor)
+            self._modificados_em_memoria.difference_update(conteudo['datasets'])
+            log.info(f"✓ {nome}: resultado do cache\n")
+            return conteudo['retorno'], 'acerto'
+        
+        retorno = metodo(self, *args, **kwargs)
+        self._modificados_em_memoria.difference_update(saidas)
+        self.cache_etapas.gravar(chave, {
+            'datasets': {ds: self.dfs[ds] for ds in saidas if ds in self.dfs},
+            'atributos': {atributo: getattr(self, atributo) for atributo in atributos},
+            'retorno': retorno,
+        })
+        return retorno, 'falha'
+    
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        if not self.metricas.ativo:
+            return _executar_etapa(self, args, kwargs)[0]
+        
+        inicio = time.perf_counter()
+        retorno, cache = _executar_etapa(self, args, kwargs)
+        segundos = time.perf_counter() - inicio
+        
+        # Só conta datasets já em memória: medir não pode disparar leituras
+        nome = metodo.__name__
+        carregados = set(self.dfs.carregados())
+        entradas = {dep for m, deps in self.ETAPAS.values() if m == nome for dep in deps}
+        saidas = [ds for ds, (m, _) in self.ETAPAS.items() if m == nome]
+        self.metricas.evento(
+            'etapa', etapa=nome, cache=cache, segundos=round(segundos, 6),
+            linhas_entrada=sum(len(self.dfs[ds]) for ds in entradas & carregados),
+            linhas_saida=sum(len(self.dfs[ds]) for ds in saidas if ds in carregados),
+        )
+        return retorno
+    
+    return executar
+
+
+class SerieTemporal:
+    """
+    Fatos ordenados por data para consultas por intervalo e janelas móveis
+    
+    As linhas com data válida ficam ordenadas (ordenação estável) sob um
+    DatetimeIndex monotônico: intervalo() localiza as bordas por busca
+    binária (searchsorted) e devolve uma fatia, sem varrer a coluna de datas.
+    As médias móveis (últimos N jogos, últimos D dias) usam as janelas
+    deslizantes do pandas, lineares no número de linhas.
+    """
+    
+    def __init__(self, df, coluna_data='data'):
+        datas = pd.to_datetime(df[coluna_data], errors='coerce')
+        ordem = np.argsort(datas.to_numpy(), kind='stable')
+        ordenado = df.iloc[ordem]
+        validas = datas.iloc[ordem].notna().to_numpy()
+        
+        self.coluna_data = coluna_data
+        self.dados = ordenado[validas].set_index(pd.DatetimeIndex(datas.iloc[ordem][validas], name=coluna_data))
+        self.sem_data = ordenado[~validas]
+    
+    def __len__(self):
+        return len(self.dados)
+    
+    def intervalo(self, inicio=None, fim=None):
+        """Linhas com inicio <= data <= fim (bordas opcionais, inclusivas)"""
+        datas = self.dados.index
+        i = 0 if inicio is None else datas.searchsorted(pd.Timestamp(inicio), side='left')
+        j = len(datas) if fim is None else datas.searchsorted(pd.Timestamp(fim), side='right')
+        return self.dados.iloc[i:j]
+    
+    def ultimos_jogos(self, colunas, n=5):
+        """Média móvel dos últimos n jogos (incluindo o atual) para cada coluna"""
+        valores = self.dados[colunas].apply(pd.to_numeric, errors='coerce')
+        return valores.rolling(n, min_periods=1).mean()
+    
+    def ultimos_dias(self, colunas, dias=30):
+        """Média móvel dos jogos nos últimos `dias` dias (incluindo o atual) para cada coluna"""
+        valores = self.dados[colunas].apply(pd.to_numeric, errors='coerce')
+        return valores.rolling(f'{dias}D', min_periods=1).mean()
+    
+    def metricas_moveis(self, colunas, n=5, dias=30):
+        """Dados ordenados com <coluna>_media_<n>_jogos e <coluna>_media_<dias>_dias acrescentadas"""
+        jogos = self.ultimos_jogos(colunas, n).add_suffix(f'_media_{n}_jogos')
+        periodo = self.ultimos_dias(colunas, dias).add_suffix(f'_media_{dias}_dias')
+        return pd.concat([self.dados, jogos.round(2), periodo.round(2)], axis=1)
+
+
+class IndiceJogos:
+    """
+    Índice central de jogos: jogo_id normalizado -> chave substituta inteira (jogo_sk)
+    
+    Cada fonte por jogo tem seus identificadores normalizados uma única vez
+    na carga (' JOGO_1 ' e 1 viram 'JOGO_1') e recebe a coluna jogo_sk, densa
+    e estável: só a tabela de referência (jogo_fatos) define chaves, na ordem
+    do arquivo. Jogos ausentes da referência (órfãos) ficam com jogo_sk nulo,
+    para que a chave não dependa da ordem de carga das fontes. Os merges por
+    jogo usam jogo_sk.
+    
+    Para cada fonte ficam registrados os jogos órfãos e os duplicados (em
+    fontes com uma linha por jogo).
+    """
+    
+    # Identificador normalizado ('JOGO_1', 'SIM_3'); ver parecem_ids
+    PADRAO_ID = r'[A-Za-z]+_\d+'
+    
+    def __init__(self):
+        self._ids = None
+        self._referencia = None
+        self._relatorio = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def ids(self):
+        """jogo_id registrados, na ordem das chaves (criado no primeiro uso)"""
+        if self._ids is None:
+            self._ids = pd.Index([], dtype=object)
+        return self._ids
+    
+    @staticmethod
+    def normalizar(serie):
+        """Padroniza identificadores de jogo: ' JOGO_1 ' e 1 viram 'JOGO_1' (vazios viram nulo)"""
+        texto = serie.astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+        texto = texto.mask(texto == '')
+        numerico = texto.str.fullmatch(r'\d+').fillna(False)
+        return texto.where(~numerico, 'JOGO_' + texto).astype(object)
+    
+    @classmethod
+    def parecem_ids(cls, serie):
+        """
+        True se a maioria dos valores preenchidos tem forma de identificador
+        
+        Uma coluna de jogo com nomes de times ou datas indica cabeçalho
+        deslocado: a fonte não entra no índice nem nas regras de integridade.
+        """
+        ids = pd.Series(cls.normalizar(serie)).dropna()
+        return ids.empty or ids.astype(str).str.fullmatch(cls.PADRAO_ID).mean() >= 0.5
+    
+    def chaves(self, fonte, serie, referencia=False, unico=False):
+        """
+        Registra os identificadores de uma fonte e devolve (jogo_id normalizado, jogo_sk)
+        
+        Args:
+            fonte: Nome da fonte (para o relatório)
+            serie: Identificadores como lidos do arquivo
+            referencia: True para a tabela que define o universo de jogos
+            unico: True se a fonte deve ter uma linha por jogo
+        """
+        ids = self.normalizar(serie)
+        validos = ids.dropna()
+        
+        with self._lock:
+            if referencia:
+                self._referencia = pd.Index(validos.unique())
+                self._ids = self.ids.append(self._referencia.difference(self.ids, sort=False))
+            posicoes = self.ids.get_indexer(ids)
+            jogo_sk = pd.array(posicoes, dtype='Int32')
+            jogo_sk[posicoes < 0] = pd.NA
+            
+            orfaos = [] if self._referencia is None else list(pd.Index(validos.unique()).difference(self._referencia))
+            duplicados = sorted(validos[validos.duplicated()].unique()) if unico else []
+            self._relatorio[fonte] = {
+                'fonte': fonte, 'linhas': len(ids), 'jogos': validos.nunique(),
+                'sem_id': int(ids.isna().sum()), 'orfaos': orfaos, 'duplicados': duplicados,
+            }
+        
+        if orfaos:
+            log.warning(f"  ⚠ {fonte}: {len(orfaos)} jogo_id sem correspondência na referência ({', '.join(orfaos[:5])})")
+        if duplicados:
+            log.warning(f"  ⚠ {fonte}: {len(duplicados)} jogo_id duplicado(s) ({', '.join(duplicados[:5])})")
+        
+        return pd.Series(ids.to_numpy(), index=serie.index), pd.Series(jogo_sk, index=serie.index)
+    
+    def buscar(self, serie):
+        """jogo_sk de identificadores já registrados (nulo para desconhecidos), sem alterar o índice"""
+        ids = self.normalizar(serie)
+        posicoes = self.ids.get_indexer(ids)
+        return pd.Series(pd.array(np.where(posicoes >= 0, posicoes, 0), dtype='Int32'), index=serie.index).mask(posicoes < 0)
+    
+    def referencia(self):
+        """jogo_id da tabela de referência (vazio antes de ela ser registrada)"""
+        return self._referencia if self._referencia is not None else pd.Index([], dtype=object)
+    
+    def relatorio(self):
+        """Uma linha por fonte: linhas, jogos, sem_id, número e exemplos de órfãos e duplicados"""
+        linhas = []
+        for info in self._relatorio.values():
+            linhas.append({
+                'fonte': info['fonte'], 'linhas': info['linhas'], 'jogos': info['jogos'], 'sem_id': info['sem_id'],
+                'orfaos': len(info['orfaos']), 'exemplos_orfaos': ', '.join(info['orfaos'][:5]),
+                'duplicados': len(info['duplicados']), 'exemplos_duplicados': ', '.join(info['duplicados'][:5]),
+            })
+        return pd.DataFrame(linhas)
+    
+    def __len__(self):
+        return 0 if self._ids is None else len(self._ids)
+
+
+# ==============================================================================
+# Períodos e faixas em texto livre (sócios-torcedores, vendas)
+# ==============================================================================
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+
+# Partes do ano sem mês exato -> (mês inicial, mês final) do intervalo
+PARTES_ANO = {
+    'inicio': (1, 2), 'comeco': (1, 2),
+    'meados': (6, 7), 'metade': (6, 7),
+    'fim': (11, 12), 'final': (11, 12),
+}
+
+# Número no formato brasileiro ('252.000', '78,9') com sufixo 'mil' opcional
+_NUMERO_BR = r'\d+(?:\.\d{3})*(?:,\d+)?'
+_FAIXA = (rf'(?P<minimo>{_NUMERO_BR})\s*(?P<mil_minimo>mil\b)?\s*%?'
+          rf'(?:\s*(?:a|ate|-)\s*(?P<maximo>{_NUMERO_BR})\s*(?P<mil_maximo>mil\b)?)?')
+
+
+def _sem_acentos(textos):
+    """Série de textos em minúsculas, sem acentos e sem espaços nas pontas (travessões viram '-')"""
+    return (textos.astype('string').str.strip().str.lower()
+            .str.replace(r'[–—]', '-', regex=True)
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'))
+
+
+def _numero_br(textos):
+    """Converte '252.000' e '78,9' em número (ponto é milhar, vírgula é decimal)"""
+    return pd.to_numeric(textos.str.replace('.', '', regex=False).str.replace(',', '.', regex=False),
+                         errors='coerce')
+
+
+def interpretar_periodos(textos):
+    """
+    Converte períodos em texto ('Agosto de 2024', 'Fim de 2024') em intervalos de datas
+    
+    Um mês vira o mês inteiro; partes do ano usam PARTES_ANO. Textos não
+    reconhecidos ficam com NaT.
+    
+    Returns:
+        DataFrame (mesmo índice) com inicio, fim e data_referencia (meio do intervalo)
+    """
+    nomes = '|'.join(list(MESES) + list(PARTES_ANO))
+    partes = _sem_acentos(textos).str.extract(rf'^(?P<nome>{nomes})\s+(?:de\s+)?(?P<ano>\d{{4}})$')
+    
+    ano = pd.to_numeric(partes['ano'], errors='coerce')
+    mes_inicio = partes['nome'].map({**MESES, **{nome: meses[0] for nome, meses in PARTES_ANO.items()}})
+    mes_fim = partes['nome'].map({**MESES, **{nome: meses[1] for nome, meses in PARTES_ANO.items()}})
+    
+    inicio = pd.to_datetime(pd.DataFrame({'year': ano, 'month': mes_inicio, 'day': 1}), errors='coerce')
+    fim = (pd.to_datetime(pd.DataFrame({'year': ano, 'month': mes_fim, 'day': 1}), errors='coerce')
+           + pd.offsets.MonthEnd(0))
+    return pd.DataFrame({
+        'inicio': inicio,
+        'fim': fim,
+        'data_referencia': (inicio + (fim - inicio) / 2).dt.normalize(),
+    }, index=textos.index)
+
+
+def interpretar_faixas(textos):
+    """
+    Converte valores em texto ('75 mil', '78,9 mil a 81 mil', '35.000-42.000') em números
+    
+    Um valor único tem mínimo = máximo. Se só o máximo traz 'mil'
+    ('78,9 a 81 mil'), o mínimo usa a mesma unidade.
+    
+    Returns:
+        DataFrame (mesmo índice) com minimo, maximo e medio
+    """
+    partes = _sem_acentos(textos).str.extract(_FAIXA)
+    
+    maximo_em_mil = partes['mil_maximo'].notna()
+    minimo_em_mil = partes['mil_minimo'].notna() | (partes['maximo'].notna() & maximo_em_mil)
+    minimo = _numero_br(partes['minimo']) * np.where(minimo_em_mil, 1000.0, 1.0)
+    maximo = (_numero_br(partes['maximo']) * np.where(maximo_em_mil, 1000.0, 1.0)).fillna(minimo)
+    return pd.DataFrame({
+        'minimo': minimo,
+        'maximo': maximo,
+        'medio': (minimo + maximo) / 2,
+    }, index=textos.index)
+
+
+_PERCENTUAL_ENTRE_PARENTESES = r'\(\s*(\d+(?:,\d+)?)\s*%\s*\)'
+
+
+def interpretar_faixas_tabela(df, colunas_id):
+    """
+    Interpreta de uma vez todas as células de faixa de uma tabela larga
+    
+    As colunas fora de colunas_id são empilhadas em formato longo e passam
+    por um único interpretar_faixas; um percentual entre parênteses
+    ('252.000 – 308.000 (40%)') vai para participacao_percent.
+    
+    Returns:
+        DataFrame longo com colunas_id, coluna, minimo, maximo, medio e participacao_percent
+    """
+    longo = df.melt(id_vars=colunas_id, var_name='coluna', value_name='texto')
+    textos = longo['texto'].astype('string')
+    faixas = interpretar_faixas(textos.str.replace(_PERCENTUAL_ENTRE_PARENTESES, '', regex=True))
+    return pd.concat([longo[colunas_id + ['coluna']], faixas], axis=1).assign(
+        participacao_percent=_numero_br(textos.str.extract(_PERCENTUAL_ENTRE_PARENTESES, expand=False)))
+
+
+class SerieSocios:
+    """
+    Série diária de sócios-torcedores a partir de observações esparsas
+    
+    Cada observação (período em texto, número ou faixa em texto) vira um
+    ponto na data de referência do período. diaria() interpola no tempo
+    entre esses pontos (médio, mínimo e máximo) e, nas bordas, mantém o
+    valor da observação mais próxima até o fim do período informado; fora
+    dos períodos a série não é estendida. no_dia() consulta a série para um
+    vetor de datas (um jogo por linha) com um único reindex.
+    """
+    
+    COLUNAS_DIARIA = ['socios_ativos', 'socios_ativos_min', 'socios_ativos_max', 'origem_socios']
+    
+    def __init__(self, df):
+        normalizar = lambda nome: unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode().lower()
+        col_periodo = next((c for c in df.columns if 'periodo' in normalizar(c)), None)
+        col_valor = next((c for c in df.columns if 'socio' in normalizar(c)), None)
+        col_contexto = next((c for c in df.columns if c not in (col_periodo, col_valor)), None)
+        if col_periodo is None or col_valor is None:
+            raise ValueError(f"Sócios-torcedores sem colunas de período e de quantidade: {list(df.columns)}")
+        
+        periodos = interpretar_periodos(df[col_periodo])
+        faixas = interpretar_faixas(df[col_valor])
+        observacoes = pd.DataFrame({
+            'periodo': df[col_periodo].astype(str).str.strip(),
+            **periodos,
+            'socios_ativos': faixas['medio'],
+            'socios_ativos_min': faixas['minimo'],
+            'socios_ativos_max': faixas['maximo'],
+            'contexto': df[col_contexto].fillna('') if col_contexto else '',
+        })
+        validas = observacoes['data_referencia'].notna() & observacoes['socios_ativos'].notna()
+        self.ignoradas = observacoes[~validas]
+        self.observacoes = observacoes[validas].sort_values('data_referencia', kind='stable').reset_index(drop=True)
+        self._diaria = None
+    
+    def diaria(self):
+        """DataFrame indexado por data (um dia por linha) com COLUNAS_DIARIA"""
+        if self._diaria is not None:
+            return self._diaria
+        
+        obs = self.observacoes
+        if obs.empty:
+            self._diaria = pd.DataFrame(columns=self.COLUNAS_DIARIA,
+                                        index=pd.DatetimeIndex([], name='data'))
+            return self._diaria
+        
+        valores = ['socios_ativos', 'socios_ativos_min', 'socios_ativos_max']
+        pontos = obs.groupby('data_referencia')[valores].mean()
+        dias = pd.date_range(obs['inicio'].min(), obs['fim'].max(), freq='D', name='data')
+        
+        serie = (pontos.reindex(dias)
+                 .interpolate(method='time', limit_area='inside')
+                 .ffill().bfill()
+                 .round()
+                 .astype('Int64'))
+        
+        primeira, ultima = pontos.index[0], pontos.index[-1]
+        serie['origem_socios'] = np.select(
+            [dias.isin(pontos.index), (dias > primeira) & (dias < ultima)],
+            ['observado', 'interpolado'],
+            default='mantido',
+        )
+        self._diaria = serie
+        return serie
+    
+    def no_dia(self, datas):
+        """COLUNAS_DIARIA para cada data (NaN fora dos períodos), com o índice de datas"""
+        datas = pd.to_datetime(pd.Series(datas), errors='coerce')
+        resultado = self.diaria().reindex(datas.dt.normalize())
+        resultado.index = datas.index
+        return resultado
+
+
+# ==============================================================================
+# Consumo em granularidade de transação (logs de ponto de venda)
+# ==============================================================================
+
+# Nome normalizado da coluna no log -> nome padronizado
+COLUNAS_TRANSACOES = {
+    'jogo_id': 'jogo_id',
+    'produto': 'Produto_Tipico',
+    'produto_tipico': 'Produto_Tipico',
+    'quiosque': 'quiosque',
+    'quiosque_id': 'quiosque',
+    'data_hora': 'data_hora',
+    'timestamp': 'data_hora',
+    'valor': 'valor',
+    'valor_rs': 'valor',
+    'quantidade': 'quantidade',
+}
+
+
+class AgregadorConsumo:
+    """
+    Agregação por hash de transações de ponto de venda
+    
+    Cada bloco de transações é reduzido a somas por jogo_id × Produto_Tipico ×
+    faixa de horário e combinado com o parcial acumulado, então a memória
+    depende do número de grupos e não do número de transações. Transações
+    sem jogo_id continuam somadas (jogo_id nulo) e são contadas em sem_id.
+    """
+    
+    CHAVES = ['jogo_id', 'Produto_Tipico', 'faixa_horario']
+    
+    def __init__(self, tamanho_faixa_min=15):
+        self.tamanho_faixa_min = tamanho_faixa_min
+        self.transacoes = 0
+        self.sem_id = 0
+        self.receita_sem_id = 0.0
+        self._parcial = None
+    
+    def adicionar(self, bloco):
+        """Incorpora um bloco de transações (colunas já padronizadas)"""
+        if bloco.empty:
+            return
+        
+        jogo_id = IndiceJogos.normalizar(bloco['jogo_id'])
+        
+        if 'data_hora' in bloco.columns:
+            data_hora = pd.to_datetime(bloco['data_hora'], errors='coerce')
+            faixa = data_hora.dt.floor(f'{self.tamanho_faixa_min}min').dt.strftime('%H:%M')
+        else:
+            faixa = pd.Series('Total', index=bloco.index)
+        
+        quantidade = (pd.to_numeric(bloco['quantidade'], errors='coerce') if 'quantidade' in bloco.columns
+                      else pd.Series(1.0, index=bloco.index))
+        
+        valores = pd.DataFrame({
+            'jogo_id': jogo_id,
+            'Produto_Tipico': bloco['Produto_Tipico'].astype(str).str.strip(),
+            'faixa_horario': faixa.fillna('Sem horário'),
+            'transacoes': 1,
+            'quantidade': quantidade,
+            'receita': pd.to_numeric(bloco['valor'], errors='coerce'),
+        })
+        parcial = valores.groupby(self.CHAVES, sort=False, dropna=False).sum()
+        
+        if self._parcial is not None:
+            parcial = pd.concat([self._parcial, parcial]).groupby(level=self.CHAVES, sort=False, dropna=False).sum()
+        self._parcial = parcial
+        self.transacoes += len(bloco)
+        sem_id = jogo_id.isna()
+        self.sem_id += int(sem_id.sum())
+        self.receita_sem_id += float(valores.loc[sem_id, 'receita'].sum())
+    
+    def por_faixa(self):
+        """Tabela jogo_id × Produto_Tipico × faixa_horario com transações, quantidade e receita"""
+        if self._parcial is None:
+            return pd.DataFrame(columns=self.CHAVES + ['transacoes', 'quantidade', 'receita'])
+        return self._parcial.sort_index().reset_index()
+    
+    @staticmethod
+    def por_produto(faixas, publico_por_jogo=None):
+        """
+        Consolida a tabela por_faixa em jogo_id × Produto_Tipico no formato de lotacao_por_jogo.csv
+        
+        Args:
+            faixas: Resultado de por_faixa()
+            publico_por_jogo: Series jogo_id -> público, usada no gasto médio
+                por torcedor (NaN para jogos sem público conhecido)
+        """
+        produtos = faixas.groupby(['jogo_id', 'Produto_Tipico'], dropna=False)[['quantidade', 'receita']].sum().reset_index()
+        publico = (produtos['jogo_id'].map(publico_por_jogo) if publico_por_jogo is not None
+                   else pd.Series(np.nan, index=produtos.index))
+        publico = pd.to_numeric(publico, errors='coerce')
+        
+        return pd.DataFrame({
+            'jogo_id': produtos['jogo_id'],
+            'Produto_Típico': produtos['Produto_Tipico'],
+            'Preço_Médio': (produtos['receita'] / produtos['quantidade'].where(produtos['quantidade'] > 0)).round(2),
+            'Gasto_Medio_por_Torcedor_Estimado': (produtos['receita'] / publico.where(publico > 0)).round(2),
+            'Receita_Total_Estimada_Produto': produtos['receita'].round(2),
+        })
+
+
+def agregar_transacoes_consumo(caminho_csv, tamanho_bloco=500_000, tamanho_faixa_min=15):
+    """
+    Lê um log de transações em blocos e devolve o AgregadorConsumo preenchido
+    
+    O log precisa de jogo_id, produto e valor; quiosque, data_hora e
+    quantidade são opcionais. Aceita ',' ou ';' (com decimal ',') e .csv.gz.
+    """
+    abrir = gzip.open if caminho_csv.endswith('.gz') else open
+    with abrir(caminho_csv, 'rt', encoding='utf-8') as f:
+        cabecalho = f.readline()
+    sep, decimal = (';', ',') if ';' in cabecalho else (',', '.')
+    
+    normalizar = lambda nome: nome.strip().lower().replace(' ', '_')
+    usecols = lambda nome: normalizar(nome) in COLUNAS_TRANSACOES
+    
+    # jogo_id como texto qualquer que seja o nome da coluna no arquivo ('Jogo ID', 'jogo_id')
+    colunas_jogo = [nome for nome in pd.read_csv(caminho_csv, sep=sep, nrows=0).columns
+                    if COLUNAS_TRANSACOES.get(normalizar(nome)) == 'jogo_id']
+    
+    agregador = AgregadorConsumo(tamanho_faixa_min)
+    leitor = pd.read_csv(caminho_csv, sep=sep, decimal=decimal, usecols=usecols,
+                         chunksize=tamanho_bloco, dtype={nome: str for nome in colunas_jogo})
+    for bloco in leitor:
+        bloco.columns = [COLUNAS_TRANSACOES[normalizar(c)] for c in bloco.columns]
+        faltando = {'jogo_id', 'Produto_Tipico', 'valor'} - set(bloco.columns)
+        if faltando:
+            raise ValueError(f"Log de transações sem as colunas: {sorted(faltando)}")
+        agregador.adicionar(bloco)
+    return agregador
+
+
+# ==============================================================================
+# Validação de qualidade dos dados (regras vetorizadas por tabela)
+# ==============================================================================
+
+class ValidadorQualidade:
+    """
+    Regras de qualidade avaliadas como máscaras vetorizadas sobre cada tabela
+    
+    Cada regra é uma função df -> máscara booleana (True = linha viola a
+    regra). As tabelas são avaliadas em threads, cada uma assim que é lida,
+    e o resultado é uma única tabela de violações com a linha do arquivo,
+    o jogo, o valor encontrado e, quando houver, o valor esperado.
+    
+    A linha do arquivo vem do índice da tabela: os carregadores mantêm o
+    índice do read_csv (registro 0 = linha 2) mesmo quando filtram linhas.
+    Tabelas em `agregadas` não têm linhas de arquivo (linha_arquivo nula).
+    """
+    
+    COLUNAS = ['tabela', 'regra', 'severidade', 'linha_arquivo', 'jogo_id', 'jogo_sk',
+               'coluna', 'valor', 'esperado', 'descricao']
+    
+    def __init__(self, agregadas=()):
+        self.regras = {}
+        self.ignoradas = []
+        self.agregadas = set(agregadas)
+    
+    def adicionar(self, tabela, regra, severidade, coluna, mascara, esperado=None, colunas=(), descricao=''):
+        """
+        Registra uma regra
+        
+        Args:
+            tabela: Dataset de self.dfs ao qual a regra se aplica
+            regra: Nome curto da regra
+            severidade: 'erro' ou 'aviso'
+            coluna: Coluna cujo valor vai para a tabela de violações
+            mascara: Função df -> máscara booleana das linhas inválidas
+            esperado: Função df -> valor esperado por linha (opcional)
+            colunas: Colunas exigidas além de `coluna`; sem elas a regra é ignorada
+            descricao: Texto exibido no relatório
+        """
+        self.regras.setdefault(tabela, []).append({
+            'regra': regra, 'severidade': severidade, 'coluna': coluna, 'mascara': mascara,
+            'esperado': esperado, 'colunas': {coluna, *colunas}, 'descricao': descricao,
+        })
+    
+    @staticmethod
+    def _padronizar_colunas(df):
+        """Remove espaços dos nomes e chama a coluna de jogo de 'jogo_id'"""
+        nomes = {}
+        for coluna in df.columns:
+            nome = str(coluna).strip()
+            nomes[coluna] = 'jogo_id' if nome.lower().replace(' ', '_') in ('jogo_id', 'jogo') else nome
+        return df.rename(columns=nomes)
+    
+    def validar_tabela(self, tabela, df):
+        """Avalia as regras de uma tabela e devolve as violações encontradas"""
+        if df is None or df.empty:
+            return pd.DataFrame(columns=self.COLUNAS)
+        
+        df = self._padronizar_colunas(df)
+        sem_jogo = pd.Series(pd.NA, index=df.index, dtype=object)
+        jogo_id = df['jogo_id'].astype(object) if 'jogo_id' in df.columns else sem_jogo
+        jogo_sk = df['jogo_sk'] if 'jogo_sk' in df.columns else pd.Series(pd.NA, index=df.index, dtype='Int32')
+        if tabela in self.agregadas or not pd.api.types.is_integer_dtype(df.index):
+            linhas = pd.array([pd.NA] * len(df), dtype='Int64')
+        else:
+            linhas = pd.array(df.index.to_numpy() + 2, dtype='Int64')  # cabeçalho na linha 1
+        
+        blocos = []
+        for regra in self.regras.get(tabela, []):
+            faltando = regra['colunas'] - set(df.columns)
+            if faltando:
+                self.ignoradas.append((tabela, regra['regra'], sorted(faltando)))
+                continue
+            
+            mascara = pd.array(regra['mascara'](df), dtype='boolean').fillna(False).to_numpy(dtype=bool)
+            posicoes = np.flatnonzero(mascara)
+            if not len(posicoes):
+                continue
+            
+            valor = pd.to_numeric(df[regra['coluna']].iloc[posicoes], errors='coerce')
+            esperado = (np.asarray(regra['esperado'](df), dtype=float)[posicoes].round(2) if regra['esperado'] is not None
+                        else np.full(len(posicoes), np.nan))
+            blocos.append(pd.DataFrame({
+                'tabela': tabela,
+                'regra': regra['regra'],
+                'severidade': regra['severidade'],
+                'linha_arquivo': linhas[posicoes],
+                'jogo_id': jogo_id.iloc[posicoes].to_numpy(),
+                'jogo_sk': jogo_sk.iloc[posicoes].to_numpy(),
+                'coluna': regra['coluna'],
+                'valor': valor.to_numpy(dtype=float, na_value=np.nan),
+                'esperado': esperado,
+                'descricao': regra['descricao'],
+            }))
+        
+        if not blocos:
+            return pd.DataFrame(columns=self.COLUNAS)
+        return pd.concat(blocos, ignore_index=True)
+    
+    def validar(self, dfs, max_threads=4):
+        """
+        Avalia todas as tabelas com regras presentes em dfs
+        
+        Cada tabela é lida (se ainda não estiver em memória) e validada na
+        sua própria thread, em paralelo com as demais.
+        """
+        self.ignoradas = []
+        tabelas = [tabela for tabela in self.regras if tabela in dfs]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(tabelas)))) as executor:
+            resultados = list(executor.map(lambda tabela: self.validar_tabela(tabela, dfs[tabela]), tabelas))
+        
+        resultados = [r for r in resultados if not r.empty]
+        if not resultados:
+            return pd.DataFrame(columns=self.COLUNAS)
+        violacoes = pd.concat(resultados, ignore_index=True)
+        violacoes['jogo_sk'] = violacoes['jogo_sk'].astype('Int32')
+        violacoes['linha_arquivo'] = violacoes['linha_arquivo'].astype('Int64')
+        return violacoes
+
+
 class CruzeiroPowerBIExporter:
     """
     Sistema de análise e exportação de dados do Cruzeiro para Power BI
     VERSÃO 2.0 - Com dados financeiros detalhados 2019-2025
     """
     
-    def __init__(self, caminho_dados='data/data.csv'):
+    # Tabela exportada -> dataset em self.dfs
+    TABELAS_POWERBI = {
+        'FATO_Jogos': 'fato_consolidado',
+        'DIM_Produtos': 'dim_produtos',
+        'DIM_Demografica': 'dim_demografica',
+        'FATO_Temporal': 'analise_temporal',
+        'AGG_Metricas_Anuais': 'metricas_anuais',
+        'KPI_Dashboard': 'kpis_dashboard',
+        # ========== NOVO: Tabelas de receitas detalhadas ==========
+        'FATO_Receitas_Detalhadas': 'receitas_detalhadas',
+        'ANALISE_Precificacao': 'analise_precificacao',
+        'ANALISE_Mix_Receitas': 'mix_receitas',
+        'ANALISE_Ocupacao': 'analise_ocupacao',
+        'SERIE_Temporal_Completa': 'serie_temporal_completa',
+        # ==========================================================
+        'FATO_Setores': 'fato_setores',
+        'AGG_KPIs': 'agregados_kpis',
+        'PROJ_Publico': 'projecao_publico',
+        'ANALISE_Otimizacao_Precos': 'otimizacao_precos',
+        'FATO_Consumo_Faixas': 'transacoes_consumo',
+        'QUALIDADE_Violacoes': 'violacoes_qualidade',
+        'FATO_Socios_Diario': 'socios_diario',
+        'FATO_Socios_Jogos': 'socios_jogos',
+        'FATO_Vendas_Canal': 'vendas_canal_faixas',
+        'FATO_Vendas_Competicao': 'vendas_competicao_faixas',
+    }
+    
+    # Fontes de fatos que podem ser lidas do armazenamento binário (compilar_fatos)
+    FONTES_FATOS = ['receitas_historicas', 'receitas_detalhadas']
+    
+    # Capacidade oficial do Mineirão (lugares)
+    CAPACIDADE_MINEIRAO = 61927
+    
+    # Mandantes do Mineirão: rivais definem o clássico de cada clube
+    CLUBES = {
+        'Cruzeiro': {'rivais': ['Atlético-MG']},
+        'Atlético-MG': {'rivais': ['Cruzeiro']},
+        'América-MG': {'rivais': ['Cruzeiro', 'Atlético-MG']},
+    }
+    
+    # Adversários considerados grandes (o clube analisado é desconsiderado)
+    CLUBES_GRANDES = ['Flamengo', 'Palmeiras', 'São Paulo', 'Corinthians', 'Atlético-MG',
+                      'Grêmio', 'Internacional', 'Santos', 'Vasco', 'Cruzeiro']
+    
+    # Fatores multiplicativos usados na projeção de público e receita
+    FATORES_PROJECAO = ['tipo_adversario', 'competicao', 'dia_semana', 'faixa_horario']
+    
+    # Fontes por jogo indexadas em IndiceJogos -> True se têm uma linha por jogo
+    # (jogo_fatos é a referência que define o universo de jogos)
+    FONTES_POR_JOGO = {
+        'jogo_fatos': True,
+        'receita': True,
+        'setor_fatos': True,
+        'setor_por_jogo': True,
+        'ticket_medio_estimativa': True,
+        'ticket_medio_torcedor': True,
+        'lotacao': False,
+        'demografico': False,
+        'transacoes_consumo': False,
+    }
+    
+    # Prefixo do jogo_id de jogos do Star Schema sem jogo real na mesma data
+    # (os jogos simulados têm numeração própria: 1 não é o JOGO_1 real)
+    PREFIXO_JOGO_SIMULADO = 'SIM_'
+    
+    # Tolerâncias das regras de qualidade: totais x soma das partes (R$ e relativa)
+    # e taxa de ocupação informada x calculada pelo público (pontos percentuais)
+    TOLERANCIA_SOMA = (1.0, 1e-3)
+    TOLERANCIA_TAXA_PP = 1.0
+    
+    # Diferença aceita entre a participação de um canal informada nas vendas
+    # anuais e a observada nas vendas por jogo do Star Schema (pontos percentuais)
+    TOLERANCIA_CANAL_PP = 5.0
+    
+    # canal_id do Star Schema (create_data.py), usado se dim_canal não estiver mapeada
+    CANAIS_MERCADO = {1: 'Site', 2: 'Bilheteria', 3: 'Aplicativo'}
+    
+    # Palavra-chave da coluna de vendas_competicao -> prefixo das colunas numéricas
+    COLUNAS_VENDAS_COMPETICAO = {
+        'jogos': 'jogos_ano',
+        'publico': 'publico_medio',
+        'vendas': 'vendas',
+        'participacao': 'participacao_percent',
+    }
+    
+    # Métricas do perfil demográfico, na ordem das colunas de DIM_Demografica
+    METRICAS_DEMOGRAFICAS = ['Gênero', 'Faixa Etária', 'Região']
+    
+    # Fontes combinadas por _carregar_mobilidade (simulados ligados aos reais pela data)
+    FONTES_MOBILIDADE = ['mobilidade_incidentes', 'jogos_simulados', 'dim_data', 'jogo_fatos']
+    
+    # Fontes lidas por _regras_qualidade além das FONTES_POR_JOGO
+    FONTES_QUALIDADE = ['receitas_detalhadas', 'receitas_historicas', *FONTES_MOBILIDADE]
+    
+    # Dataset derivado -> (método que o cria, datasets de que depende)
+    # Dependências que não aparecem aqui são fontes lidas de CSV.
+    ETAPAS = {
+        'fato_consolidado': ('criar_fato_consolidado', ['jogo_fatos', 'receita', 'setor_fatos']),
+        'dim_produtos': ('criar_dimensao_produtos', ['lotacao', 'transacoes_consumo', 'jogo_fatos']),
+        'dim_demografica': ('criar_dimensao_demografica', ['demografico']),
+        'analise_temporal': ('criar_analise_temporal', ['receita', 'receitas_historicas']),
+        'metricas_anuais': ('criar_analise_temporal', ['receita', 'receitas_historicas']),
+        'agregados_kpis': ('criar_agregados_kpis', ['fato_consolidado', 'receitas_detalhadas']),
+        'kpis_dashboard': ('criar_kpis_dashboard', ['agregados_kpis']),
+        'projecao_publico': ('criar_projecao_publico', ['fato_consolidado', 'receitas_detalhadas']),
+        'analise_precificacao': ('criar_analise_precificacao', ['receitas_detalhadas']),
+        'mix_receitas': ('criar_mix_receitas', ['receitas_detalhadas']),
+        'analise_ocupacao': ('criar_analise_ocupacao', ['receitas_detalhadas']),
+        'serie_temporal_completa': ('criar_serie_temporal_completa', ['receitas_detalhadas']),
+        'otimizacao_precos': ('criar_otimizacao_precos', ['receitas_detalhadas']),
+        'matriz_correlacao': ('calcular_correlacoes', ['fato_consolidado']),
+        'fato_setores': ('criar_fato_setores', ['setor_fatos', 'setor_por_jogo', 'dim_setor', *FONTES_MOBILIDADE]),
+        'violacoes_qualidade': ('validar_qualidade', list(dict.fromkeys([*FONTES_POR_JOGO, *FONTES_QUALIDADE]))),
+        'socios_diario': ('criar_serie_socios', ['socio_torcedor']),
+        'socios_jogos': ('criar_socios_jogos', ['socios_diario', 'fato_consolidado']),
+        'vendas_canal_faixas': ('criar_vendas_canal', ['vendas_canal', 'mercado_ingressos',
+                                                        'dim_canal', 'dim_data']),
+        'vendas_competicao_faixas': ('criar_vendas_competicao', ['vendas_competicao']),
+    }
+    
+    # Etapas que só rodam se receitas_detalhadas tiver dados
+    ETAPAS_RECEITAS_DETALHADAS = ['criar_analise_precificacao', 'criar_mix_receitas', 'criar_analise_ocupacao',
+                                  'criar_serie_temporal_completa', 'criar_otimizacao_precos']
+    
+    # Atributos (além de self.dfs) que cada etapa produz e o cache precisa guardar
+    ATRIBUTOS_ETAPAS = {
+        'calcular_correlacoes': ['correlations'],
+        'criar_fato_setores': ['cubo_setores'],
+        'criar_agregados_kpis': ['agregados_kpis'],
+        'criar_serie_socios': ['serie_socios'],
+    }
+    
+    def __init__(self, caminho_dados='data/data.csv', cache=True, limite_cache_mb=256,
+                 clube='Cruzeiro', capacidade=None, pasta_compartilhada=None, pasta_cache=None):
         """
         Inicializa o exportador
         
         Args:
             caminho_dados: Caminho para a pasta com os CSVs (padrão: 'data/data.csv')
+            cache: Memoiza as etapas criar_* em disco
+            limite_cache_mb: Tamanho máximo do cache de etapas
+            clube: Clube mandante analisado (define adversários e clássicos)
+            capacidade: Capacidade do estádio (padrão: Mineirão)
+            pasta_compartilhada: Pasta com CSVs comuns a vários clubes, usados
+                quando caminho_dados não tem a fonte correspondente
+            pasta_cache: Pasta do cache de etapas (padrão: pasta_cache_etapas,
+                no diretório de cache do usuário)
         """
-        self.dfs = {}
+        self.dfs = DatasetsSobDemanda()
         self.correlations = {}
+        self.cubo_setores = None
+        self.serie_socios = None
+        self.agregados_kpis = AgregadosKPI()
+        self.indice_jogos = IndiceJogos()
+        self._series_temporais = {}
         self.caminho_dados = caminho_dados
-        self._verificar_arquivos()
+        self.clube = clube
+        self.rivais = self.CLUBES.get(clube, {}).get('rivais', [])
+        self.capacidade_estadio = capacidade or self.CAPACIDADE_MINEIRAO
+        self.pasta_compartilhada = pasta_compartilhada
+        self.colunas_particao = None
+        self._etapas_executadas = set()
+        self._impressoes_arquivos = {}
+        self._modificados_em_memoria = set()
+        self.opcoes_exportacao = dict(OPCOES_EXPORTACAO_PADRAO)
+        self.metricas = EmissorMetricas()
+        # Pasta, mapeamento e cache são resolvidos no primeiro uso: __init__ não faz I/O
+        self._arquivos = None
+        self._pasta_dados = None
+        self._cache_etapas = None
+        self._limite_cache = limite_cache_mb * 2**20 if cache else None
+        self.pasta_cache = pasta_cache
     
-    def _verificar_arquivos(self):
-        """Verifica e lista todos os arquivos CSV disponíveis"""
-        print("\n" + "="*60)
-        print("VERIFICANDO ARQUIVOS CSV")
-        print("="*60)
+    @staticmethod
+    def localizar_csvs(caminho_dados):
+        """
+        Pasta de dados efetiva e seus CSVs
+        
+        Tenta caminho_dados e, se ele não tiver CSVs, os locais habituais
+        ('data/data.csv', 'data.csv', '.'). Só lista a pasta: nada é lido.
         
-        # Tentar vários caminhos possíveis
+        Returns:
+            (pasta, lista de CSVs)
+        """
         caminhos_possiveis = [
-            self.caminho_dados,
+            caminho_dados,
             'data/data.csv',
             'data.csv',
             'data\\data.csv',
             '.'
         ]
         
-        csv_files = []
-        caminho_encontrado = None
-        
         for caminho in caminhos_possiveis:
             if os.path.exists(caminho):
                 arquivos = glob.glob(os.path.join(caminho, "*.csv"))
                 if arquivos:
-                    csv_files = arquivos
-                    caminho_encontrado = caminho
-                    break
+                    return caminho, arquivos
+        
+        log.error("❌ ERRO: Nenhum arquivo CSV encontrado!")
+        log.error(f"   Pasta atual: {os.getcwd()}")
+        log.error(f"   Caminhos tentados: {caminhos_possiveis}")
+        log.error("\n💡 SOLUÇÃO:")
+        log.error("   1. Verifique se os arquivos CSV estão em 'data/data.csv/'")
+        log.error("   2. Ou execute: exporter = CruzeiroPowerBIExporter(caminho_dados='SEU_CAMINHO')")
+        raise FileNotFoundError("Nenhum arquivo CSV encontrado")
+    
+    @property
+    def arquivos(self):
+        """Fonte -> caminho do CSV (a pasta é verificada e mapeada no primeiro acesso)"""
+        if self._arquivos is None:
+            self._verificar_arquivos()
+        return self._arquivos
+    
+    @property
+    def pasta_dados(self):
+        """Pasta de onde os CSVs são lidos (ver localizar_csvs)"""
+        if self._pasta_dados is None:
+            self._verificar_arquivos()
+        return self._pasta_dados
+    
+    @property
+    def cache_etapas(self):
+        """CacheEtapas em pasta_cache ou na pasta padrão da pasta de dados (None com cache=False)"""
+        if self._cache_etapas is None and self._limite_cache is not None:
+            pasta = self.pasta_cache or pasta_cache_etapas(self.pasta_dados)
+            self._cache_etapas = CacheEtapas(pasta, self._limite_cache)
+        return self._cache_etapas
+    
+    def _verificar_arquivos(self):
+        """Verifica e lista todos os arquivos CSV disponíveis"""
+        log.debug("\n" + "="*60)
+        log.debug("VERIFICANDO ARQUIVOS CSV")
+        log.debug("="*60)
         
-        if not csv_files:
-            print("❌ ERRO: Nenhum arquivo CSV encontrado!")
-            print(f"   Pasta atual: {os.getcwd()}")
-            print(f"   Caminhos tentados: {caminhos_possiveis}")
-            print("\n💡 SOLUÇÃO:")
-            print("   1. Verifique se os arquivos CSV estão em 'data/data.csv/'")
-            print("   2. Ou execute: exporter = CruzeiroPowerBIExporter(caminho_dados='SEU_CAMINHO')")
-            raise FileNotFoundError("Nenhum arquivo CSV encontrado")
+        caminho_encontrado, csv_files = self.localizar_csvs(self.caminho_dados)
         
-        print(f"✓ Pasta encontrada: {os.path.abspath(caminho_encontrado)}")
+        self._pasta_dados = caminho_encontrado
+        log.info(f"✓ Pasta encontrada: {os.path.abspath(caminho_encontrado)}")
         
-        print(f"✓ Encontrados {len(csv_files)} arquivos CSV:\n")
+        log.debug(f"✓ Encontrados {len(csv_files)} arquivos CSV:\n")
         for i, file in enumerate(csv_files, 1):
             size = os.path.getsize(file) / 1024  # KB
-            print(f"  {i}. {file} ({size:.1f} KB)")
+            log.debug(f"  {i}. {file} ({size:.1f} KB)")
         
-        print("\n" + "="*60)
-        print("MAPEANDO ARQUIVOS...")
-        print("="*60 + "\n")
+        log.debug("\n" + "="*60)
+        log.debug("MAPEANDO ARQUIVOS...")
+        log.debug("="*60 + "\n")
+        
+        self._arquivos = self._mapear_arquivos(csv_files)
+        
+        # Tabelas compartilhadas (ex.: dimensões comuns a todos os clubes) só
+        # preenchem as fontes que a pasta da partição não tem
+        compartilhados = []
+        if self.pasta_compartilhada and os.path.abspath(self.pasta_compartilhada) != os.path.abspath(caminho_encontrado):
+            compartilhados = sorted(glob.glob(os.path.join(self.pasta_compartilhada, "*.csv")))
+            if compartilhados:
+                log.debug(f"\n  Compartilhados ({self.pasta_compartilhada}):")
+                for chave, file in self._mapear_arquivos(compartilhados).items():
+                    self._arquivos.setdefault(chave, file)
+        
+        total = len(csv_files) + len(compartilhados)
+        log.info(f"✓ Total de arquivos mapeados: {len(self._arquivos)}/{total}")
+        
+        if len(self._arquivos) < total:
+            log.info(f"⚠ {total - len(self._arquivos)} arquivo(s) não foram mapeados (podem ser duplicados ou não utilizados)")
+    
+    @staticmethod
+    def _mapear_arquivos(csv_files):
+        """Associa cada CSV à fonte correspondente pelo nome do arquivo"""
         
         # Mapear nomes de arquivos - Mais flexível
-        self.arquivos = {}
+        arquivos = {}
         
         for file in csv_files:
             # Normalizar o nome do arquivo
@@ -80,241 +1651,482 @@ class CruzeiroPowerBIExporter:
             
             # ========== NOVO: Detectar arquivo de receitas detalhadas ==========
             if 'receitas_detalhadas' in nome_limpo or 'receita_detalhada' in nome_limpo:
-                self.arquivos['receitas_detalhadas'] = file
-                print(f"  ✓ receitas_detalhadas (NOVO): {os.path.basename(file)}")
+                arquivos['receitas_detalhadas'] = file
+                log.debug(f"  ✓ receitas_detalhadas (NOVO): {os.path.basename(file)}")
             # ===================================================================
             
+            # Star Schema (new_data): mobilidade/incidentes por setor e dimensão de setores
+            elif 'mobilidade_incidentes' in nome_limpo:
+                arquivos['mobilidade_incidentes'] = file
+                log.debug(f"  ✓ mobilidade_incidentes: {os.path.basename(file)}")
+                
+            elif 'dim_setor' in nome_limpo:
+                arquivos['dim_setor'] = file
+                log.debug(f"  ✓ dim_setor: {os.path.basename(file)}")
+            
+            elif nome_limpo.startswith('fato_jogos'):
+                arquivos['jogos_simulados'] = file
+                log.debug(f"  ✓ jogos_simulados: {os.path.basename(file)}")
+            
+            # Star Schema: vendas por canal em cada jogo, canais e datas
+            elif 'mercado_ingressos' in nome_limpo:
+                arquivos['mercado_ingressos'] = file
+                log.debug(f"  ✓ mercado_ingressos: {os.path.basename(file)}")
+            
+            elif 'dim_canal' in nome_limpo:
+                arquivos['dim_canal'] = file
+                log.debug(f"  ✓ dim_canal: {os.path.basename(file)}")
+            
+            elif 'dim_data' in nome_limpo:
+                arquivos['dim_data'] = file
+                log.debug(f"  ✓ dim_data: {os.path.basename(file)}")
+            
             # Mapear cada tipo de arquivo (código existente)
             elif 'setor_fatos' in nome_limpo or 'setor_fato' in nome_limpo:
-                self.arquivos['setor_fatos'] = file
-                print(f"  ✓ setor_fatos: {os.path.basename(file)}")
+                arquivos['setor_fatos'] = file
+                log.debug(f"  ✓ setor_fatos: {os.path.basename(file)}")
                 
             elif 'setor_por_jogo' in nome_limpo:
-                if 'setor_por_jogo' not in self.arquivos:
-                    self.arquivos['setor_por_jogo'] = file
-                    print(f"  ✓ setor_por_jogo: {os.path.basename(file)}")
+                if 'setor_por_jogo' not in arquivos:
+                    arquivos['setor_por_jogo'] = file
+                    log.debug(f"  ✓ setor_por_jogo: {os.path.basename(file)}")
                     
             elif 'jogo_fatos' in nome_limpo or 'jogo_fato' in nome_limpo:
-                self.arquivos['jogo_fatos'] = file
-                print(f"  ✓ jogo_fatos: {os.path.basename(file)}")
+                arquivos['jogo_fatos'] = file
+                log.debug(f"  ✓ jogo_fatos: {os.path.basename(file)}")
                 
             elif 'informacoes_jogos' in nome_limpo or 'informacao_jogo' in nome_limpo:
-                if 'jogo_fatos' not in self.arquivos:
-                    self.arquivos['jogo_fatos'] = file
-                    print(f"  ✓ jogo_fatos (alt): {os.path.basename(file)}")
+                if 'jogo_fatos' not in arquivos:
+                    arquivos['jogo_fatos'] = file
+                    log.debug(f"  ✓ jogo_fatos (alt): {os.path.basename(file)}")
                     
+            elif 'transacoes' in nome_limpo or 'pdv' in nome_limpo:
+                arquivos['transacoes_consumo'] = file
+                log.debug(f"  ✓ transacoes_consumo: {os.path.basename(file)}")
+                
             elif 'lotacao' in nome_limpo:
-                self.arquivos['lotacao'] = file
-                print(f"  ✓ lotacao: {os.path.basename(file)}")
+                arquivos['lotacao'] = file
+                log.debug(f"  ✓ lotacao: {os.path.basename(file)}")
                 
             elif 'demografico' in nome_limpo or 'perfil' in nome_limpo:
-                self.arquivos['demografico'] = file
-                print(f"  ✓ demografico: {os.path.basename(file)}")
+                arquivos['demografico'] = file
+                log.debug(f"  ✓ demografico: {os.path.basename(file)}")
                 
             elif 'receita_fatos' in nome_limpo or 'receita_fato' in nome_limpo:
-                self.arquivos['receita'] = file
-                print(f"  ✓ receita: {os.path.basename(file)}")
+                arquivos['receita'] = file
+                log.debug(f"  ✓ receita: {os.path.basename(file)}")
                 
             elif 'receitas_mineirao' in nome_limpo or ('mineirao' in nome_limpo and ('2014' in nome_limpo or '2022' in nome_limpo)):
-                self.arquivos['receitas_historicas'] = file
-                print(f"  ✓ receitas_historicas: {os.path.basename(file)}")
+                arquivos['receitas_historicas'] = file
+                log.debug(f"  ✓ receitas_historicas: {os.path.basename(file)}")
                 
             elif 'socio' in nome_limpo and 'torcedor' in nome_limpo:
-                self.arquivos['socio_torcedor'] = file
-                print(f"  ✓ socio_torcedor: {os.path.basename(file)}")
+                arquivos['socio_torcedor'] = file
+                log.debug(f"  ✓ socio_torcedor: {os.path.basename(file)}")
                 
             elif 'ticket_medio_estimativa' in nome_limpo:
-                self.arquivos['ticket_medio_estimativa'] = file
-                print(f"  ✓ ticket_medio_estimativa: {os.path.basename(file)}")
+                arquivos['ticket_medio_estimativa'] = file
+                log.debug(f"  ✓ ticket_medio_estimativa: {os.path.basename(file)}")
                 
             elif 'ticket_medio_torcedor' in nome_limpo:
-                self.arquivos['ticket_medio_torcedor'] = file
-                print(f"  ✓ ticket_medio_torcedor: {os.path.basename(file)}")
+                arquivos['ticket_medio_torcedor'] = file
+                log.debug(f"  ✓ ticket_medio_torcedor: {os.path.basename(file)}")
                 
             elif 'vendas_canal' in nome_limpo:
-                self.arquivos['vendas_canal'] = file
-                print(f"  ✓ vendas_canal: {os.path.basename(file)}")
+                arquivos['vendas_canal'] = file
+                log.debug(f"  ✓ vendas_canal: {os.path.basename(file)}")
                 
             elif 'vendas_competicao' in nome_limpo:
-                self.arquivos['vendas_competicao'] = file
-                print(f"  ✓ vendas_competicao: {os.path.basename(file)}")
+                arquivos['vendas_competicao'] = file
+                log.debug(f"  ✓ vendas_competicao: {os.path.basename(file)}")
                 
             elif 'precos_produtos' in nome_limpo or 'preco_produto' in nome_limpo:
-                self.arquivos['precos_produtos'] = file
-                print(f"  ✓ precos_produtos: {os.path.basename(file)}")
+                arquivos['precos_produtos'] = file
+                log.debug(f"  ✓ precos_produtos: {os.path.basename(file)}")
                 
             elif 'publico_cruzeiro' in nome_limpo:
-                self.arquivos['publico_cruzeiro'] = file
-                print(f"  ✓ publico_cruzeiro: {os.path.basename(file)}")
+                arquivos['publico_cruzeiro'] = file
+                log.debug(f"  ✓ publico_cruzeiro: {os.path.basename(file)}")
         
-        print(f"\n✓ Total de arquivos mapeados: {len(self.arquivos)}/{len(csv_files)}")
-        
-        if len(self.arquivos) < len(csv_files):
-            print(f"⚠ {len(csv_files) - len(self.arquivos)} arquivo(s) não foram mapeados (podem ser duplicados ou não utilizados)")
-        
-        print()
+        return arquivos
     
     def carregar_dados(self):
-        """Carrega todos os CSVs e realiza limpeza inicial"""
+        """
+        Registra os CSVs mapeados para carga sob demanda
         
-        print("CARREGANDO DADOS...")
-        print("="*60 + "\n")
+        Nenhum arquivo é lido aqui: cada fonte é lida e limpa no primeiro
+        acesso a self.dfs[chave] e fica memorizada para os próximos acessos.
+        """
         
-        # ========== NOVO: Carregar receitas detalhadas ==========
-        if 'receitas_detalhadas' in self.arquivos:
-            try:
-                self.dfs['receitas_detalhadas'] = pd.read_csv(self.arquivos['receitas_detalhadas'])
-                
-                # Limpeza e transformações
-                df = self.dfs['receitas_detalhadas']
-                
-                # Converter ano para inteiro
-                df['ano'] = df['ano'].astype(int)
-                
-                # Criar taxa de ocupação decimal
-                df['taxa_ocupacao_decimal'] = df['taxa_ocupacao_percent'] / 100
-                
-                # Calcular gap de otimização
-                df['gap_otimizacao'] = df['receita_bruta_ideal_ingressos'] - df['receita_ingresso']
-                
-                # Calcular percentuais de receita
-                df['perc_receita_produtos'] = (df['receita_produtos_internos'] / df['total_arrecadado'] * 100).round(2)
-                df['perc_receita_camarotes'] = (df['receita_camarotes'] / df['total_arrecadado'] * 100).round(2)
-                df['perc_receita_estacionamento'] = (df['receita_estacionamento'] / df['total_arrecadado'] * 100).round(2)
-                
-                # Classificar tipo de adversário
-                df['tipo_adversario'] = df['times_que_jogaram'].apply(self._classificar_adversario)
-                df['eh_classico'] = df['times_que_jogaram'].str.contains('Atlético-MG', case=False, na=False)
-                
-                # Identificar era (pré/pós pandemia)
-                df['era'] = df['ano'].apply(lambda x: 'Pré-COVID' if x < 2020 else ('Pandemia' if x <= 2021 else 'Pós-COVID'))
-                
-                print(f"  ✓ {os.path.basename(self.arquivos['receitas_detalhadas'])} carregado - {len(df)} jogos")
-                print(f"     Período: {df['ano'].min()} a {df['ano'].max()}")
-                print(f"     Competições: {df['competicao'].nunique()} diferentes")
-                
-            except Exception as e:
-                print(f"  ⚠ Erro ao carregar receitas_detalhadas: {e}")
-                self.dfs['receitas_detalhadas'] = pd.DataFrame()
-        else:
-            print("  ⚠ Arquivo receitas_detalhadas não encontrado")
-            self.dfs['receitas_detalhadas'] = pd.DataFrame()
-        # ========================================================
-        
-        # 1. Setor Fatos (código existente)
-        if 'setor_fatos' in self.arquivos:
-            self.dfs['setor_fatos'] = pd.read_csv(self.arquivos['setor_fatos'], skipinitialspace=True)
-            self.dfs['setor_fatos'].columns = self.dfs['setor_fatos'].columns.str.strip()
-            print(f"  ✓ {os.path.basename(self.arquivos['setor_fatos'])} carregado")
-        else:
-            print("  ⚠ Arquivo setor_fatos não encontrado, usando dados parciais")
-            self.dfs['setor_fatos'] = pd.DataFrame()
+        log.debug("CARREGANDO DADOS...")
+        log.debug("="*60 + "\n")
         
-        # 2. Jogo Fatos (Principal)
-        if 'jogo_fatos' in self.arquivos:
-            self.dfs['jogo_fatos'] = pd.read_csv(self.arquivos['jogo_fatos'])
-            self.dfs['jogo_fatos']['data'] = pd.to_datetime(self.dfs['jogo_fatos']['data'], format='%d/%m/%Y', errors='coerce')
-            
-            # Extrair público total
-            if 'publico total' in self.dfs['jogo_fatos'].columns:
-                self.dfs['jogo_fatos']['publico_total'] = self.dfs['jogo_fatos']['publico total'].astype(str).str.extract('(\d+)', expand=False).astype(float)
-            elif 'publico_total' in self.dfs['jogo_fatos'].columns:
-                self.dfs['jogo_fatos']['publico_total'] = self.dfs['jogo_fatos']['publico_total'].astype(str).str.extract('(\d+)', expand=False).astype(float)
-            
-            # Padronizar coluna jogo_id
-            if 'jogo id' in self.dfs['jogo_fatos'].columns:
-                self.dfs['jogo_fatos']['jogo_id'] = self.dfs['jogo_fatos']['jogo id'].str.strip()
-            elif 'jogo_id' in self.dfs['jogo_fatos'].columns:
-                self.dfs['jogo_fatos']['jogo_id'] = self.dfs['jogo_fatos']['jogo_id'].str.strip()
-            
-            print(f"  ✓ {os.path.basename(self.arquivos['jogo_fatos'])} carregado")
-        else:
+        if 'jogo_fatos' not in self.arquivos:
             raise FileNotFoundError("Arquivo jogo_fatos.csv é obrigatório!")
         
-        # 3-14. Outros arquivos (código existente mantido)
-        if 'lotacao' in self.arquivos:
-            self.dfs['lotacao'] = pd.read_csv(self.arquivos['lotacao'])
-            self.dfs['lotacao']['jogo_id'] = self.dfs['lotacao']['jogo_id'].str.strip()
-            print(f"  ✓ {os.path.basename(self.arquivos['lotacao'])} carregado")
-        else:
-            print("  ⚠ Arquivo lotacao não encontrado")
-            self.dfs['lotacao'] = pd.DataFrame()
+        carregadores = self._carregadores()
+        for nome, carregador in carregadores.items():
+            self.dfs.registrar(nome, carregador)
         
-        if 'demografico' in self.arquivos:
-            self.dfs['demografico'] = pd.read_csv(self.arquivos['demografico'])
-            self.dfs['demografico']['Jogo_ID'] = self.dfs['demografico']['Jogo_ID'].str.strip()
-            print(f"  ✓ {os.path.basename(self.arquivos['demografico'])} carregado")
-        else:
-            print("  ⚠ Arquivo demográfico não encontrado")
-            self.dfs['demografico'] = pd.DataFrame()
-        
-        if 'receita' in self.arquivos:
-            self.dfs['receita'] = pd.read_csv(self.arquivos['receita'])
-            self.dfs['receita']['data'] = pd.to_datetime(self.dfs['receita']['data'], format='%d/%m/%Y', errors='coerce')
-            self.dfs['receita']['jogo_id'] = self.dfs['receita']['jogo_id'].str.strip()
-            print(f"  ✓ {os.path.basename(self.arquivos['receita'])} carregado")
-        else:
-            print("  ⚠ Arquivo receita_fatos não encontrado")
-            self.dfs['receita'] = pd.DataFrame()
-        
-        if 'receitas_historicas' in self.arquivos:
-            self.dfs['receitas_historicas'] = pd.read_csv(self.arquivos['receitas_historicas'])
-            self.dfs['receitas_historicas']['data'] = pd.to_datetime(self.dfs['receitas_historicas']['data'], errors='coerce')
-            self.dfs['receitas_historicas']['Ano'] = self.dfs['receitas_historicas']['Ano'].astype(int)
-            print(f"  ✓ {os.path.basename(self.arquivos['receitas_historicas'])} carregado")
-        else:
-            print("  ⚠ Arquivo receitas_historicas não encontrado")
-            self.dfs['receitas_historicas'] = pd.DataFrame()
-        
-        if 'socio_torcedor' in self.arquivos:
-            self.dfs['socio_torcedor'] = pd.read_csv(self.arquivos['socio_torcedor'])
-            print(f"  ✓ {os.path.basename(self.arquivos['socio_torcedor'])} carregado")
-        else:
-            print("  ⚠ Arquivo socio_torcedor não encontrado")
-            self.dfs['socio_torcedor'] = pd.DataFrame()
+        log.info(f"✓ Processo de carga concluído! Total: {len(carregadores)} datasets registrados (leitura sob demanda)")
+    
+    def _carregadores(self):
+        """Monta o carregador de cada fonte mapeada"""
+        carregadores = {
+            'receitas_detalhadas': self._carregar_receitas_detalhadas,
+            'setor_fatos': self._carregar_setor_fatos,
+            'jogo_fatos': self._carregar_jogo_fatos,
+            'lotacao': self._carregar_lotacao,
+            'demografico': self._carregar_demografico,
+            'receita': self._carregar_receita,
+            'receitas_historicas': self._carregar_receitas_historicas,
+            'socio_torcedor': self._carregar_socio_torcedor,
+        }
         
-        # Arquivos adicionais com tratamento de erro
+        # Arquivos adicionais só são registrados se existirem
         for key in ['ticket_medio_estimativa', 'ticket_medio_torcedor', 'vendas_canal', 
                     'vendas_competicao', 'precos_produtos', 'setor_por_jogo']:
             if key in self.arquivos:
-                try:
-                    self.dfs[key] = pd.read_csv(self.arquivos[key])
-                    print(f"  ✓ {os.path.basename(self.arquivos[key])} carregado")
-                except Exception as e:
-                    print(f"  ⚠ Erro ao carregar {key}: {e}")
+                carregadores[key] = lambda key=key: self._carregar_csv_simples(key)
         
-        # Público Cruzeiro com tratamento especial
         if 'publico_cruzeiro' in self.arquivos:
-            try:
-                self.dfs['publico_cruzeiro'] = pd.read_csv(
-                    self.arquivos['publico_cruzeiro'], 
-                    on_bad_lines='skip',
-                    engine='python'
-                )
-                print(f"  ✓ {os.path.basename(self.arquivos['publico_cruzeiro'])} carregado")
-            except Exception as e:
-                print(f"  ⚠ Erro ao carregar publico_cruzeiro: {e}")
+            carregadores['publico_cruzeiro'] = self._carregar_publico_cruzeiro
+        
+        if 'transacoes_consumo' in self.arquivos:
+            carregadores['transacoes_consumo'] = self._carregar_transacoes_consumo
+        
+        # Tabelas do Star Schema usam ';' e decimal ','
+        for key in ['dim_setor', 'mercado_ingressos', 'dim_canal', 'dim_data', 'jogos_simulados']:
+            if key in self.arquivos:
+                carregadores[key] = lambda key=key: ler_csv_fato(self.arquivos[key])
+        
+        if 'mobilidade_incidentes' in self.arquivos:
+            carregadores['mobilidade_incidentes'] = self._carregar_mobilidade
+        
+        # Fontes por jogo saem da carga com jogo_id normalizado e jogo_sk
+        for key in self.FONTES_POR_JOGO:
+            if key in carregadores:
+                carregadores[key] = lambda key=key, carregador=carregadores[key]: self._indexar_jogos(key, carregador())
+        
+        return {nome: functools.partial(self._medir_carga, nome, carregador)
+                for nome, carregador in carregadores.items()}
+    
+    def encerrar_metricas(self, segundos, **rotulos):
+        """Emite os eventos 'cache' e 'pipeline' de uma execução e fecha o emissor"""
+        if not self.metricas.ativo:
+            return
+        if self._cache_etapas is not None:
+            self.metricas.evento('cache', **self._cache_etapas.estatisticas())
+        self.metricas.evento('pipeline', **rotulos, segundos=round(segundos, 6),
+                             fontes_lidas=len(set(self.dfs.carregados()) & set(self.arquivos)))
+        self.metricas.fechar()
+    
+    def _medir_carga(self, fonte, carregador):
+        """Executa um carregador e, com métricas ativas, emite o evento 'carga'"""
+        if not self.metricas.ativo:
+            return carregador()
+        
+        inicio = time.perf_counter()
+        df = carregador()
+        caminho = self.arquivos.get(fonte)
+        self.metricas.evento('carga', fonte=fonte, linhas=len(df),
+                             bytes=os.path.getsize(caminho) if caminho and os.path.exists(caminho) else 0,
+                             segundos=round(time.perf_counter() - inicio, 6))
+        return df
+    
+    def _indexar_jogos(self, fonte, df):
+        """Normaliza a coluna de jogo de uma fonte e acrescenta jogo_sk (ver IndiceJogos)"""
+        if df.empty:
+            return df
+        
+        col_id = next((c for c in df.columns
+                       if c.strip().lower().replace(' ', '_') in ('jogo_id', 'jogo')), None)
+        if col_id is None:
+            return df
+        
+        if not self.indice_jogos.parecem_ids(df[col_id]):
+            exemplos = ', '.join(df[col_id].dropna().astype(str).unique()[:3])
+            log.warning(f"  ⚠ {fonte}: coluna {col_id.strip()} não contém identificadores de jogo ({exemplos}); "
+                        f"fonte fora do índice de jogos e das regras de integridade")
+            return df
+        
+        referencia = fonte == 'jogo_fatos'
+        if not referencia:
+            # A referência define as primeiras chaves
+            self.dfs['jogo_fatos']
+        
+        df[col_id], df['jogo_sk'] = self.indice_jogos.chaves(fonte, df[col_id], referencia=referencia,
+                                                             unico=self.FONTES_POR_JOGO[fonte])
+        return df
+    
+    def _ler_fato(self, chave):
+        """Lê uma fonte de fatos do armazenamento binário, se atualizado, ou do CSV"""
+        caminho = self.arquivos[chave]
+        if fato_binario_atualizado(caminho):
+            log.info(f"  ✓ {os.path.basename(caminho)}: lendo armazenamento binário (memmap)")
+            return ler_fato_binario(caminho_fato_binario(caminho))
+        return pd.read_csv(caminho)
+    
+    def compilar_fatos(self, caminhos=None):
+        """
+        Grava o armazenamento binário de arquivos de fatos
+        
+        Args:
+            caminhos: CSVs a compilar (padrão: fontes de FONTES_FATOS mapeadas).
+                Aceita também os fato_*.csv do Star Schema (';' e decimal ',').
+        
+        Returns:
+            Lista das pastas gravadas
+        """
+        if caminhos is None:
+            caminhos = [self.arquivos[chave] for chave in self.FONTES_FATOS if chave in self.arquivos]
+        
+        gravados = []
+        for caminho in caminhos:
+            destino = caminho_fato_binario(caminho)
+            df = ler_csv_fato(caminho)
+            gravar_fato_binario(df, destino, origem=caminho)
+            gravados.append(destino)
+            log.info(f"✓ Compilado: {os.path.basename(caminho)} -> {destino} ({len(df)} linhas, {len(df.columns)} colunas)")
+        return gravados
+    
+    def _carregar_receitas_detalhadas(self):
+        """Lê receitas detalhadas e calcula as colunas derivadas"""
+        if 'receitas_detalhadas' not in self.arquivos:
+            log.warning("  ⚠ Arquivo receitas_detalhadas não encontrado")
+            return pd.DataFrame()
+        
+        try:
+            df = self._ler_fato('receitas_detalhadas')
+            
+            # Converter ano para inteiro
+            df['ano'] = df['ano'].astype(int)
+            
+            # Criar taxa de ocupação decimal
+            df['taxa_ocupacao_decimal'] = df['taxa_ocupacao_percent'] / 100
+            
+            # Calcular gap de otimização
+            df['gap_otimizacao'] = df['receita_bruta_ideal_ingressos'] - df['receita_ingresso']
+            
+            # Calcular percentuais de receita
+            df['perc_receita_produtos'] = (df['receita_produtos_internos'] / df['total_arrecadado'] * 100).round(2)
+            df['perc_receita_camarotes'] = (df['receita_camarotes'] / df['total_arrecadado'] * 100).round(2)
+            df['perc_receita_estacionamento'] = (df['receita_estacionamento'] / df['total_arrecadado'] * 100).round(2)
+            
+            # Classificar tipo de adversário
+            df['tipo_adversario'] = df['times_que_jogaram'].apply(self._classificar_adversario)
+            df['eh_classico'] = self._eh_classico(df['times_que_jogaram'])
+            
+            # Identificar era (pré/pós pandemia)
+            df['era'] = df['ano'].apply(lambda x: 'Pré-COVID' if x < 2020 else ('Pandemia' if x <= 2021 else 'Pós-COVID'))
+            
+            log.info(f"  ✓ {os.path.basename(self.arquivos['receitas_detalhadas'])} carregado - {len(df)} jogos")
+            log.info(f"     Período: {df['ano'].min()} a {df['ano'].max()}")
+            log.info(f"     Competições: {df['competicao'].nunique()} diferentes")
+            return df
+        
+        except Exception as e:
+            log.warning(f"  ⚠ Erro ao carregar receitas_detalhadas: {e}")
+            return pd.DataFrame()
+    
+    def _carregar_setor_fatos(self):
+        """Lê a distribuição percentual de público por setor"""
+        if 'setor_fatos' not in self.arquivos:
+            log.warning("  ⚠ Arquivo setor_fatos não encontrado, usando dados parciais")
+            return pd.DataFrame()
+        
+        df = pd.read_csv(self.arquivos['setor_fatos'], skipinitialspace=True)
+        df.columns = df.columns.str.strip()
+        log.info(f"  ✓ {os.path.basename(self.arquivos['setor_fatos'])} carregado")
+        return df
+    
+    def _carregar_jogo_fatos(self):
+        """Lê a tabela principal de jogos"""
+        df = pd.read_csv(self.arquivos['jogo_fatos'])
+        # Algumas datas vêm com espaço no fim ('19/01/2025 ')
+        df['data'] = pd.to_datetime(df['data'].astype(str).str.strip(), format='%d/%m/%Y', errors='coerce')
+        
+        # Extrair público total ('16.492', '48.862 pagantes'; ponto é separador de milhar)
+        col_publico = next((c for c in df.columns if c.strip().lower().replace(' ', '_') == 'publico_total'), None)
+        if col_publico is not None:
+            numeros = df[col_publico].astype(str).str.extract(r'(\d[\d.]*)', expand=False)
+            df[col_publico] = pd.to_numeric(numeros.str.replace('.', '', regex=False), errors='coerce')
+        
+        log.info(f"  ✓ {os.path.basename(self.arquivos['jogo_fatos'])} carregado")
+        return df
+    
+    def _carregar_lotacao(self):
+        """Lê as estimativas de consumo por produto e jogo"""
+        if 'lotacao' not in self.arquivos:
+            log.warning("  ⚠ Arquivo lotacao não encontrado")
+            return pd.DataFrame()
+        
+        df = pd.read_csv(self.arquivos['lotacao'])
+        log.info(f"  ✓ {os.path.basename(self.arquivos['lotacao'])} carregado")
+        return df
+    
+    def _carregar_transacoes_consumo(self):
+        """Lê o log de transações de consumo em blocos, já agregado por jogo × produto × faixa de horário"""
+        agregador = agregar_transacoes_consumo(self.arquivos['transacoes_consumo'])
+        faixas = agregador.por_faixa()
+        log.info(f"  ✓ {os.path.basename(self.arquivos['transacoes_consumo'])} carregado "
+              f"({agregador.transacoes} transações -> {len(faixas)} grupos)")
+        if agregador.sem_id:
+            log.warning(f"  ⚠ transacoes_consumo: {agregador.sem_id} transação(ões) sem jogo_id "
+                        f"(R$ {agregador.receita_sem_id:,.2f}), mantidas com jogo_id vazio")
+        return faixas
+    
+    def _carregar_demografico(self):
+        """Lê o perfil demográfico da torcida"""
+        if 'demografico' not in self.arquivos:
+            log.warning("  ⚠ Arquivo demográfico não encontrado")
+            return pd.DataFrame()
+        
+        df = pd.read_csv(self.arquivos['demografico'])
+        
+        # Arquivo com vários clubes (coluna Clube): fica só o clube analisado
+        # (o índice original fica: é a linha do arquivo em QUALIDADE_Violacoes)
+        if 'Clube' in df.columns:
+            do_clube = df['Clube'].astype(str).str.strip().str.upper() == self.clube.upper()
+            if do_clube.any():
+                df = df[do_clube]
+        
+        log.info(f"  ✓ {os.path.basename(self.arquivos['demografico'])} carregado")
+        return df
+    
+    def _carregar_receita(self):
+        """Lê as receitas recentes por jogo"""
+        if 'receita' not in self.arquivos:
+            log.warning("  ⚠ Arquivo receita_fatos não encontrado")
+            return pd.DataFrame()
+        
+        df = pd.read_csv(self.arquivos['receita'])
+        df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
+        log.info(f"  ✓ {os.path.basename(self.arquivos['receita'])} carregado")
+        return df
+    
+    def _carregar_receitas_historicas(self):
+        """Lê as receitas históricas do Mineirão"""
+        if 'receitas_historicas' not in self.arquivos:
+            log.warning("  ⚠ Arquivo receitas_historicas não encontrado")
+            return pd.DataFrame()
+        
+        df = self._ler_fato('receitas_historicas')
+        df['data'] = pd.to_datetime(df['data'], errors='coerce')
+        df['Ano'] = df['Ano'].astype(int)
+        log.info(f"  ✓ {os.path.basename(self.arquivos['receitas_historicas'])} carregado")
+        return df
+    
+    def _carregar_socio_torcedor(self):
+        """Lê a evolução do número de sócios-torcedores"""
+        if 'socio_torcedor' not in self.arquivos:
+            log.warning("  ⚠ Arquivo socio_torcedor não encontrado")
+            return pd.DataFrame()
+        
+        df = pd.read_csv(self.arquivos['socio_torcedor'])
+        log.info(f"  ✓ {os.path.basename(self.arquivos['socio_torcedor'])} carregado")
+        return df
+    
+    def _carregar_csv_simples(self, key):
+        """Lê um CSV adicional sem transformações"""
+        try:
+            df = pd.read_csv(self.arquivos[key])
+            if not isinstance(df.index, pd.RangeIndex):
+                # Linhas com mais campos que o cabeçalho: o pandas usaria as primeiras
+                # colunas como índice e deslocaria as demais (jogo_id com nomes de times)
+                log.warning(f"  ⚠ {key}: linhas com mais campos que o cabeçalho; campos excedentes descartados")
+                df = pd.read_csv(self.arquivos[key], index_col=False)
+            log.info(f"  ✓ {os.path.basename(self.arquivos[key])} carregado")
+            return df
+        except Exception as e:
+            log.warning(f"  ⚠ Erro ao carregar {key}: {e}")
+            return pd.DataFrame()
+    
+    def _carregar_publico_cruzeiro(self):
+        """Lê o CSV de público com tratamento especial para linhas inválidas"""
+        try:
+            df = pd.read_csv(
+                self.arquivos['publico_cruzeiro'], 
+                on_bad_lines='skip',
+                engine='python'
+            )
+            log.info(f"  ✓ {os.path.basename(self.arquivos['publico_cruzeiro'])} carregado")
+            return df
+        except Exception as e:
+            log.warning(f"  ⚠ Erro ao carregar publico_cruzeiro: {e}")
+            return pd.DataFrame()
+    
+    def _carregar_mobilidade(self):
+        """Lê mobilidade/incidentes do Star Schema com os jogos simulados ligados aos reais pela data"""
+        df = ler_csv_fato(self.arquivos['mobilidade_incidentes'])
+        simulado = pd.to_numeric(df['jogo_id'], errors='coerce').astype('Int64')
+        reais = self._jogos_reais_dos_simulados()
+        
+        jogo_id = simulado.map(reais).astype(object)
+        sem_real = jogo_id.isna() & simulado.notna()
+        jogo_id[sem_real] = self.PREFIXO_JOGO_SIMULADO + simulado[sem_real].astype(str)
+        
+        df['jogo_id_simulado'] = simulado
+        df['jogo_id'] = jogo_id
+        df['jogo_sk'] = self.indice_jogos.buscar(jogo_id.where(~sem_real))
+        
+        n_simulados = simulado.nunique()
+        n_ligados = simulado[~sem_real].nunique()
+        log.info(f"  ✓ {os.path.basename(self.arquivos['mobilidade_incidentes'])} carregado "
+                 f"({n_ligados} de {n_simulados} jogos simulados ligados a jogos reais pela data)")
+        return df
+    
+    def _jogos_reais_dos_simulados(self):
+        """
+        Series jogo_id simulado (Star Schema) -> jogo_id real de jogo_fatos
         
-        print(f"\n✓ Processo de carga concluído! Total: {len(self.dfs)} datasets carregados\n")
+        Liga fato_jogos.data_id -> dim_data.data à data do jogo real; só
+        datas com um único jogo real contam. Vazia sem fato_jogos e dim_data.
+        """
+        simulados = self.dfs.get('jogos_simulados')
+        datas = self.dfs.get('dim_data')
+        reais = self.dfs['jogo_fatos']
+        if (simulados is None or simulados.empty or datas is None or datas.empty
+                or reais.empty or 'data' not in reais.columns):
+            return pd.Series(dtype=object)
+        
+        data_simulada = simulados['data_id'].map(
+            pd.to_datetime(datas.set_index('data_id')['data'], errors='coerce').dt.normalize())
+        col_id = next((c for c in reais.columns if c.strip().lower() == 'jogo_id'), None)
+        if col_id is None:
+            return pd.Series(dtype=object)
+        por_data = reais[[col_id, 'data']].dropna().assign(data=lambda df: df['data'].dt.normalize())
+        por_data = por_data.drop_duplicates('data', keep=False).set_index('data')[col_id]
+        
+        ligados = pd.Series(data_simulada.map(por_data).to_numpy(),
+                            index=pd.to_numeric(simulados['jogo_id'], errors='coerce').astype('Int64'))
+        return ligados.dropna()
     
     def _classificar_adversario(self, times):
-        """Classifica o adversário por importância"""
-        grandes = ['Flamengo', 'Palmeiras', 'São Paulo', 'Corinthians', 'Atlético-MG', 
-                   'Grêmio', 'Internacional', 'Santos', 'Vasco']
-        if any(grande in times for grande in grandes):
+        """Classifica o adversário por importância (o próprio clube não conta)"""
+        adversarios = times.replace(self.clube, '')
+        if any(grande in adversarios for grande in self.CLUBES_GRANDES if grande != self.clube):
             return 'Grande'
         return 'Médio/Pequeno'
     
+    def _eh_classico(self, times):
+        """True nos jogos contra um rival do clube (série de textos 'Clube x Adversário')"""
+        if not self.rivais:
+            return pd.Series(False, index=times.index)
+        padrao = '|'.join(re.escape(rival) for rival in self.rivais)
+        return times.str.contains(padrao, case=False, na=False)
+    
     # ========== NOVO: Funções para análise de receitas detalhadas ==========
     
+    @memoizar_etapa
     def criar_analise_precificacao(self):
         """Cria análise detalhada de precificação de ingressos"""
         
         if self.dfs['receitas_detalhadas'].empty:
-            print("⚠ Dados de receitas detalhadas não disponíveis")
+            log.warning("⚠ Dados de receitas detalhadas não disponíveis")
             return
         
-        print("Criando análise de precificação...")
+        log.info("Criando análise de precificação...")
         
         df = self.dfs['receitas_detalhadas'].copy()
         
@@ -345,16 +2157,165 @@ class CruzeiroPowerBIExporter:
                                 'eficiencia_precificacao_percent']
         
         self.dfs['analise_precificacao'] = precificacao
-        print(f"✓ Análise de Precificação criada com {len(precificacao)} registros!\n")
+        log.info(f"✓ Análise de Precificação criada com {len(precificacao)} registros!\n")
+    
+    def _ajustar_elasticidades(self, jogos, min_jogos=5, elasticidade_referencia=-1.5, peso_referencia=10.0):
+        """
+        Ajusta curvas de demanda log(ocupação) = a + e · log(preço efetivo)
+        
+        Cada grupo (competição, tipo de adversário) tem intercepto próprio;
+        a elasticidade é a do grupo quando ele tem min_jogos, senão a conjunta
+        (dentro dos grupos). O preço efetivo é o preço médio de inteiras e
+        meias com o desconto de sócios.
+        
+        Como os preços praticados sobem justamente nos jogos de maior procura,
+        a inclinação observada tende a sair positiva; por isso a estimativa é
+        encolhida em direção a elasticidade_referencia, com peso_referencia
+        equivalente a essa quantidade de variância de log-preço.
+        
+        Returns:
+            DataFrame indexado por (competicao, tipo_adversario) com
+            'intercepto', 'elasticidade' e 'jogos'
+        """
+        x = np.log(jogos['preco_efetivo'])
+        y = np.log(jogos['ocupacao'])
+        grupos = [jogos['competicao'], jogos['tipo_adversario']]
+        
+        x_d = x - x.groupby(grupos).transform('mean')
+        y_d = y - y.groupby(grupos).transform('mean')
+        sxy = (x_d * y_d).groupby(grupos).sum()
+        sxx = (x_d ** 2).groupby(grupos).sum()
+        n = x.groupby(grupos).size()
+        
+        e0, peso = elasticidade_referencia, peso_referencia
+        conjunta = (sxy.sum() + peso * e0) / (sxx.sum() + peso)
+        elasticidade = ((sxy + peso * e0) / (sxx + peso)).where(n >= min_jogos).fillna(conjunta)
+        # Demanda precisa cair com o preço; limita a valores plausíveis
+        elasticidade = elasticidade.clip(-3.0, -0.1)
+        intercepto = y.groupby(grupos).mean() - elasticidade * x.groupby(grupos).mean()
+        
+        return pd.DataFrame({'intercepto': intercepto, 'elasticidade': elasticidade, 'jogos': n})
+    
+    @memoizar_etapa
+    def criar_otimizacao_precos(self, jogos=None, multiplicadores_inteira=None, proporcoes_meia=None):
+        """
+        Busca os preços de inteira e meia que maximizam a receita de cada jogo
+        
+        Usa as curvas de demanda ajustadas por competição e tipo de adversário
+        (_ajustar_elasticidades) e avalia, de forma vetorizada, toda a grade
+        jogos × preço da inteira × proporção da meia. A receita considerada é
+        ingresso + produtos internos por torcedor, com o público limitado à
+        capacidade do estádio.
+        
+        Args:
+            jogos: Jogos a otimizar, no formato de receitas_detalhadas
+                (padrão: jogos da última temporada disponível)
+            multiplicadores_inteira: Grade de multiplicadores sobre o preço atual da inteira
+            proporcoes_meia: Grade de preço da meia como fração da inteira
+                (padrão: só 0,5, a meia-entrada legal)
+        """
+        
+        if self.dfs['receitas_detalhadas'].empty:
+            log.warning("⚠ Dados de receitas detalhadas não disponíveis")
+            return
+        
+        log.info("Criando otimização de preços...")
+        
+        historico = self._preparar_base_precos(self.dfs['receitas_detalhadas'])
+        if len(historico) < 3:
+            log.warning("⚠ Jogos insuficientes para ajustar elasticidades, pulando")
+            self.dfs['otimizacao_precos'] = pd.DataFrame()
+            return
+        
+        curvas = self._ajustar_elasticidades(historico)
+        
+        if jogos is None:
+            jogos = historico[historico['ano'] == historico['ano'].max()]
+        else:
+            jogos = self._preparar_base_precos(jogos)
+        jogos = jogos.reset_index(drop=True)
+        
+        if multiplicadores_inteira is None:
+            multiplicadores_inteira = np.linspace(0.5, 2.0, 61)
+        if proporcoes_meia is None:
+            proporcoes_meia = np.array([0.5])
+        
+        # Curva de cada jogo (grupos sem histórico usam a elasticidade média)
+        chaves = pd.MultiIndex.from_frame(jogos[['competicao', 'tipo_adversario']])
+        curva = curvas.reindex(chaves)
+        elasticidade = curva['elasticidade'].fillna(curvas['elasticidade'].mean()).to_numpy()
+        intercepto = curva['intercepto'].fillna(curvas['intercepto'].mean()).to_numpy()
+        
+        capacidade = jogos['capacidade_estadio'].to_numpy(dtype=float)
+        fracao_inteira = jogos['fracao_inteira'].to_numpy()
+        fator_socios = 1 - jogos['fator_desconto_socios_percent'].to_numpy() / 100
+        produtos_por_torcedor = jogos['produtos_por_torcedor'].to_numpy()
+        
+        # Grade: jogos × inteira × meia
+        inteira = jogos['preco_medio_inteira'].to_numpy()[:, None, None] * np.asarray(multiplicadores_inteira)[None, :, None]
+        meia = inteira * np.asarray(proporcoes_meia)[None, None, :]
+        ticket = fracao_inteira[:, None, None] * inteira + (1 - fracao_inteira[:, None, None]) * meia
+        preco_efetivo = ticket * fator_socios[:, None, None]
+        
+        ocupacao = np.minimum(np.exp(intercepto[:, None, None] + elasticidade[:, None, None] * np.log(preco_efetivo)), 1.0)
+        publico = ocupacao * capacidade[:, None, None]
+        receita = publico * (preco_efetivo + produtos_por_torcedor[:, None, None])
+        
+        melhor = receita.reshape(len(jogos), -1).argmax(axis=1)
+        i_int, i_meia = np.unravel_index(melhor, receita.shape[1:])
+        linhas = np.arange(len(jogos))
+        
+        # Ponto atual avaliado pelo mesmo modelo, para comparação justa
+        ocupacao_atual = np.minimum(np.exp(intercepto + elasticidade * np.log(jogos['preco_efetivo'].to_numpy())), 1.0)
+        receita_atual = ocupacao_atual * capacidade * (jogos['preco_efetivo'].to_numpy() + produtos_por_torcedor)
+        receita_otima = receita[linhas, i_int, i_meia]
+        
+        otimizacao = pd.DataFrame({
+            'ano': jogos['ano'],
+            'competicao': jogos['competicao'],
+            'times_que_jogaram': jogos['times_que_jogaram'],
+            'tipo_adversario': jogos['tipo_adversario'],
+            'elasticidade': elasticidade.round(3),
+            'preco_atual_inteira': jogos['preco_medio_inteira'],
+            'preco_atual_meia': jogos['preco_medio_meia'],
+            'preco_otimo_inteira': inteira[linhas, i_int, 0].round(2),
+            'preco_otimo_meia': meia[linhas, i_int, i_meia].round(2),
+            'ocupacao_modelo_atual_percent': (ocupacao_atual * 100).round(2),
+            'ocupacao_otima_percent': (ocupacao[linhas, i_int, i_meia] * 100).round(2),
+            'publico_otimo': publico[linhas, i_int, i_meia].round(0),
+            'receita_modelo_atual': receita_atual.round(2),
+            'receita_otima': receita_otima.round(2),
+        })
+        otimizacao['ganho_percent'] = ((receita_otima / receita_atual - 1) * 100).round(2)
+        
+        self.dfs['otimizacao_precos'] = otimizacao
+        log.info(f"✓ Otimização de Preços criada para {len(otimizacao)} jogos "
+              f"({len(curvas)} curvas de demanda, grade de {receita[0].size} preços por jogo)!\n")
     
+    def _preparar_base_precos(self, jogos):
+        """Filtra jogos com público e calcula preço efetivo, ocupação e mix de inteiras"""
+        jogos = jogos[(jogos['publico_presente'] > 0) & (jogos['taxa_ocupacao_percent'] > 0)].copy()
+        
+        vendidos = jogos['inteiras_vendidas'] + jogos['meias_vendidas']
+        jogos['fracao_inteira'] = (jogos['inteiras_vendidas'] / vendidos.where(vendidos > 0)).fillna(0.5)
+        ticket = jogos['fracao_inteira'] * jogos['preco_medio_inteira'] + (1 - jogos['fracao_inteira']) * jogos['preco_medio_meia']
+        jogos['preco_efetivo'] = ticket * (1 - jogos['fator_desconto_socios_percent'] / 100)
+        jogos['ocupacao'] = jogos['taxa_ocupacao_percent'] / 100
+        jogos['produtos_por_torcedor'] = jogos['receita_produtos_internos'] / jogos['publico_presente']
+        if 'capacidade_estadio' not in jogos.columns:
+            jogos['capacidade_estadio'] = self.capacidade_estadio
+        
+        return jogos[jogos['preco_efetivo'] > 0]
+    
+    @memoizar_etapa
     def criar_mix_receitas(self):
         """Cria análise do mix de receitas (ingressos, produtos, camarotes, estacionamento)"""
         
         if self.dfs['receitas_detalhadas'].empty:
-            print("⚠ Dados de receitas detalhadas não disponíveis")
+            log.warning("⚠ Dados de receitas detalhadas não disponíveis")
             return
         
-        print("Criando análise de mix de receitas...")
+        log.info("Criando análise de mix de receitas...")
         
         df = self.dfs['receitas_detalhadas'].copy()
         df = df[df['publico_presente'] > 0]
@@ -380,16 +2341,17 @@ class CruzeiroPowerBIExporter:
         mix['receita_per_capita_produtos'] = (mix['receita_produtos_internos'] / mix['publico_presente']).round(2)
         
         self.dfs['mix_receitas'] = mix
-        print(f"✓ Mix de Receitas criado com {len(mix)} registros!\n")
+        log.info(f"✓ Mix de Receitas criado com {len(mix)} registros!\n")
     
+    @memoizar_etapa
     def criar_analise_ocupacao(self):
         """Cria análise de taxa de ocupação do estádio"""
         
         if self.dfs['receitas_detalhadas'].empty:
-            print("⚠ Dados de receitas detalhadas não disponíveis")
+            log.warning("⚠ Dados de receitas detalhadas não disponíveis")
             return
         
-        print("Criando análise de ocupação...")
+        log.info("Criando análise de ocupação...")
         
         df = self.dfs['receitas_detalhadas'].copy()
         df = df[df['publico_presente'] > 0]
@@ -417,16 +2379,17 @@ class CruzeiroPowerBIExporter:
         ).round(2)
         
         self.dfs['analise_ocupacao'] = ocupacao
-        print(f"✓ Análise de Ocupação criada com {len(ocupacao)} registros!\n")
+        log.info(f"✓ Análise de Ocupação criada com {len(ocupacao)} registros!\n")
     
+    @memoizar_etapa
     def criar_serie_temporal_completa(self):
         """Cria série temporal completa 2019-2025"""
         
         if self.dfs['receitas_detalhadas'].empty:
-            print("⚠ Dados de receitas detalhadas não disponíveis")
+            log.warning("⚠ Dados de receitas detalhadas não disponíveis")
             return
         
-        print("Criando série temporal completa...")
+        log.info("Criando série temporal completa...")
         
         df = self.dfs['receitas_detalhadas'].copy()
         df = df[df['publico_presente'] > 0]
@@ -444,6 +2407,7 @@ class CruzeiroPowerBIExporter:
         temporal.columns = ['ano', 'competicao', 'publico_total', 'publico_medio',
                            'receita_total', 'receita_media', 'taxa_ocupacao_media',
                            'ticket_medio', 'gap_otimizacao_total', 'quantidade_jogos']
+        temporal = temporal.sort_values(['ano', 'competicao'], kind='stable', ignore_index=True)
         
         # Identificar tendências
         temporal['era'] = temporal['ano'].apply(
@@ -451,17 +2415,18 @@ class CruzeiroPowerBIExporter:
         )
         
         self.dfs['serie_temporal_completa'] = temporal
-        print(f"✓ Série Temporal Completa criada com {len(temporal)} registros!\n")
+        log.info(f"✓ Série Temporal Completa criada com {len(temporal)} registros!\n")
     
     # ========================================================================
     
+    @memoizar_etapa
     def criar_fato_consolidado(self):
         """Cria tabela fato principal consolidando todas as informações"""
         
-        print("Criando tabela fato consolidada...")
+        log.info("Criando tabela fato consolidada...")
         
         # Verificar colunas disponíveis
-        print(f"\nColunas disponíveis em jogo_fatos: {list(self.dfs['jogo_fatos'].columns)}")
+        log.debug(f"\nColunas disponíveis em jogo_fatos: {list(self.dfs['jogo_fatos'].columns)}")
         
         df = self.dfs['jogo_fatos'].copy()
         
@@ -489,13 +2454,13 @@ class CruzeiroPowerBIExporter:
         missing_cols = [col for col in required_cols if col not in df.columns]
         
         if missing_cols:
-            print(f"⚠ Colunas obrigatórias ausentes: {missing_cols}")
-            print("Não foi possível criar tabela fato consolidada")
+            log.warning(f"⚠ Colunas obrigatórias ausentes: {missing_cols}")
+            log.info("Não foi possível criar tabela fato consolidada")
             self.dfs['fato_consolidado'] = pd.DataFrame()
             return
         
         # Selecionar colunas disponíveis
-        cols_to_use = ['jogo_id', 'times_jogados', 'data']
+        cols_to_use = ['jogo_id', 'jogo_sk', 'times_jogados', 'data']
         optional_cols = ['publico_total', 'setor_mais_visitado', 'horario']
         
         for col in optional_cols:
@@ -504,14 +2469,15 @@ class CruzeiroPowerBIExporter:
         
         fato = df[cols_to_use].copy()
         
-        # Merge com Receitas
-        if not self.dfs['receita'].empty and 'jogo_id' in self.dfs['receita'].columns:
-            receita_cols = ['jogo_id', 'receita_ingresso', 'receita_produtos_internos', 
+        # Merge com Receitas (chave inteira jogo_sk)
+        if not self.dfs['receita'].empty and 'jogo_sk' in self.dfs['receita'].columns:
+            receita_cols = ['jogo_sk', 'receita_ingresso', 'receita_produtos_internos', 
                            'total_arrecadado', 'classificacao_para_competicao']
             receita_cols_available = [col for col in receita_cols if col in self.dfs['receita'].columns]
             
             if len(receita_cols_available) > 1:
-                fato = fato.merge(self.dfs['receita'][receita_cols_available], on='jogo_id', how='left')
+                receita = self.dfs['receita'].dropna(subset=['jogo_sk'])
+                fato = fato.merge(receita[receita_cols_available], on='jogo_sk', how='left')
                 
                 # CORREÇÃO: Garantir que as colunas são numéricas antes de calcular
                 if 'receita_ingresso' in fato.columns and 'publico_total' in fato.columns:
@@ -528,18 +2494,16 @@ class CruzeiroPowerBIExporter:
                     )
         
         # Adicionar informações de setores
-        if not self.dfs['setor_fatos'].empty and 'jogo_id' in self.dfs['setor_fatos'].columns:
-            setor_df = self.dfs['setor_fatos'].copy()
+        if not self.dfs['setor_fatos'].empty and 'jogo_sk' in self.dfs['setor_fatos'].columns:
+            setor_df = self.dfs['setor_fatos'].dropna(subset=['jogo_sk']).copy()
             
             for col in setor_df.columns:
                 if 'jogo' in col.lower() and 'id' in col.lower():
-                    setor_df.rename(columns={col: 'jogo_id'}, inplace=True)
+                    setor_df.drop(columns=col, inplace=True)
                     break
             
-            if 'jogo_id' in setor_df.columns:
-                setor_df['jogo_id'] = setor_df['jogo_id'].str.strip()
-                setor_pivot = setor_df.set_index('jogo_id')
-                fato = fato.merge(setor_pivot, on='jogo_id', how='left')
+            setor_pivot = setor_df.set_index('jogo_sk')
+            fato = fato.merge(setor_pivot, left_on='jogo_sk', right_index=True, how='left')
         
         # Adicionar KPIs calculados
         if 'total_arrecadado' in fato.columns and 'publico_total' in fato.columns:
@@ -574,27 +2538,130 @@ class CruzeiroPowerBIExporter:
         # Classificar tipo de jogo
         if 'times_jogados' in fato.columns:
             fato['tipo_adversario'] = fato['times_jogados'].apply(self._classificar_adversario)
-            fato['eh_classico'] = fato['times_jogados'].str.contains('Atlético-MG', case=False, na=False)
+            fato['eh_classico'] = self._eh_classico(fato['times_jogados'])
         
         self.dfs['fato_consolidado'] = fato
-        print(f"✓ Tabela Fato Consolidada criada com {len(fato)} registros e {len(fato.columns)} colunas!\n")
+        log.info(f"✓ Tabela Fato Consolidada criada com {len(fato)} registros e {len(fato.columns)} colunas!\n")
     
+    @memoizar_etapa
+    def criar_fato_setores(self):
+        """
+        Cria o fato de setores em formato longo e o cubo jogo × setor × métrica
+        
+        Junta a distribuição de público por setor (setor_fatos), o mapa de
+        calor (setor_por_jogo) e, se presentes, mobilidade e incidentes do
+        Star Schema (jogo real da mesma data ou SIM_<n>, ver
+        _carregar_mobilidade). O cubo guarda apenas as células observadas (esparso) e
+        responde a consultar_mapa_calor sem refazer merges de tabelas largas.
+        """
+        
+        log.info("Criando fato de setores...")
+        
+        partes = []
+        
+        # Tabelas largas: uma coluna percentual por setor
+        for chave, metrica in [('setor_fatos', 'participacao_publico_percent'),
+                               ('setor_por_jogo', 'participacao_mapa_calor_percent')]:
+            df = self.dfs.get(chave)
+            if df is None or df.empty:
+                continue
+            df = df.rename(columns=lambda c: c.strip())
+            col_id = next((c for c in df.columns if 'jogo' in c.lower() and c != 'jogo_sk'), None)
+            if col_id is None:
+                continue
+            longo = df.melt(id_vars=[col_id, 'jogo_sk'], var_name='setor', value_name='valor')
+            longo['jogo_id'] = longo[col_id]
+            longo['valor'] = self._percentual_para_decimal(longo['valor']) * 100
+            longo['metrica'] = metrica
+            partes.append(longo[['jogo_id', 'jogo_sk', 'setor', 'metrica', 'valor']])
+        
+        # Star Schema: mobilidade (entrada/saída) e incidentes por setor
+        mobilidade = self.dfs.get('mobilidade_incidentes')
+        if mobilidade is not None and not mobilidade.empty:
+            dim_setor = self.dfs.get('dim_setor')
+            if dim_setor is not None and not dim_setor.empty:
+                mobilidade = mobilidade.merge(dim_setor[['setor_id', 'nome_setor']], on='setor_id', how='left')
+            else:
+                mobilidade = mobilidade.assign(nome_setor='Setor ' + mobilidade['setor_id'].astype(str))
+            metricas = [c for c in ['publico_setor', 'tempo_entrada_medio_min', 'tempo_saida_medio_min',
+                                    'incidente_contagem', 'tempo_resposta_min'] if c in mobilidade.columns]
+            longo = mobilidade.melt(id_vars=['jogo_id', 'jogo_sk', 'nome_setor'], value_vars=metricas,
+                                    var_name='metrica', value_name='valor')
+            longo = longo.rename(columns={'nome_setor': 'setor'})
+            partes.append(longo[['jogo_id', 'jogo_sk', 'setor', 'metrica', 'valor']])
+        
+        if not partes:
+            log.warning("⚠ Dados de setores não disponíveis, pulando")
+            self.dfs['fato_setores'] = pd.DataFrame()
+            self.cubo_setores = pd.Series(dtype=float)
+            return
+        
+        fato = pd.concat(partes, ignore_index=True)
+        fato['setor'] = fato['setor'].str.strip().str.capitalize()
+        fato['valor'] = pd.to_numeric(fato['valor'], errors='coerce')
+        fato = fato.dropna(subset=['valor']).sort_values(['jogo_id', 'setor', 'metrica'], ignore_index=True)
+        
+        # Cubo esparso: só as combinações existentes, índice ordenado para fatiamento rápido
+        self.cubo_setores = fato.set_index(['jogo_id', 'setor', 'metrica'])['valor']
+        
+        self.dfs['fato_setores'] = fato
+        log.info(f"✓ Fato de Setores criado com {len(fato)} registros "
+              f"({fato['jogo_id'].nunique()} jogos × {fato['setor'].nunique()} setores × {fato['metrica'].nunique()} métricas)!\n")
+    
+    def consultar_mapa_calor(self, jogos=None, metrica='participacao_publico_percent', agregacao=None):
+        """
+        Consulta o cubo de setores para um subconjunto de jogos
+        
+        Args:
+            jogos: Lista de jogo_id (padrão: todos)
+            metrica: Métrica do cubo (ex.: 'participacao_publico_percent', 'incidente_contagem')
+            agregacao: None para a matriz jogo × setor; 'mean', 'sum', 'max'... para
+                agregar os jogos selecionados por setor
+        
+        Returns:
+            DataFrame jogo × setor, ou Series por setor quando agregacao é informada
+        """
+        if 'fato_setores' not in self.dfs:
+            self.garantir_tabelas(['FATO_Setores'])
+        
+        if self.cubo_setores is None or self.cubo_setores.empty:
+            return pd.DataFrame()
+        
+        fatia = self.cubo_setores.xs(metrica, level='metrica')
+        if jogos is not None:
+            fatia = fatia[fatia.index.get_level_values('jogo_id').isin(jogos)]
+        
+        if agregacao is not None:
+            return fatia.groupby(level='setor').agg(agregacao)
+        return fatia.unstack('setor')
+    
+    @memoizar_etapa
     def criar_dimensao_produtos(self):
         """Cria dimensão de produtos com análise detalhada"""
         
-        if self.dfs['lotacao'].empty:
-            print("⚠ Dados de lotação não disponíveis, pulando dimensão de produtos")
+        transacoes = self.dfs['transacoes_consumo'] if 'transacoes_consumo' in self.dfs else pd.DataFrame()
+        
+        if self.dfs['lotacao'].empty and transacoes.empty:
+            log.warning("⚠ Dados de lotação não disponíveis, pulando dimensão de produtos")
             self.dfs['dim_produtos'] = pd.DataFrame()
             return
         
-        print("Criando dimensão de produtos...")
+        log.info("Criando dimensão de produtos...")
         
         produtos = self.dfs['lotacao'].copy()
         
+        # Jogos com log de transações usam os valores medidos no lugar das estimativas
+        if not transacoes.empty:
+            medidos = AgregadorConsumo.por_produto(transacoes, self._publico_por_jogo())
+            medidos['jogo_sk'] = self.indice_jogos.buscar(medidos['jogo_id'])
+            if not produtos.empty:
+                produtos = produtos[~produtos['jogo_id'].isin(medidos['jogo_id'].dropna())]
+            produtos = pd.concat([produtos, medidos], ignore_index=True)
+        
         # Verificar colunas disponíveis
         required_cols = ['jogo_id']
         if not all(col in produtos.columns or any(col.lower() in c.lower() for c in produtos.columns) for col in required_cols):
-            print("⚠ Colunas necessárias não encontradas em lotacao")
+            log.warning("⚠ Colunas necessárias não encontradas em lotacao")
             self.dfs['dim_produtos'] = pd.DataFrame()
             return
         
@@ -613,8 +2680,8 @@ class CruzeiroPowerBIExporter:
         
         produtos.rename(columns=col_map, inplace=True)
         
-        # Agregar por jogo e produto
-        group_cols = ['jogo_id']
+        # Agregar por jogo (chave inteira jogo_sk) e produto
+        group_cols = ['jogo_sk', 'jogo_id']
         if 'Produto_Tipico' in produtos.columns:
             group_cols.append('Produto_Tipico')
         
@@ -627,15 +2694,13 @@ class CruzeiroPowerBIExporter:
             agg_dict['Receita_Total_Produto'] = 'sum'
         
         if agg_dict:
-            dim_produtos = produtos.groupby(group_cols).agg(agg_dict).reset_index()
+            dim_produtos = produtos.groupby(group_cols, dropna=False).agg(agg_dict).reset_index()
+            dim_produtos.insert(0, 'jogo_id', dim_produtos.pop('jogo_id'))
             
             # Adicionar participação percentual
             if 'Receita_Total_Produto' in dim_produtos.columns:
-                total_por_jogo = dim_produtos.groupby('jogo_id')['Receita_Total_Produto'].sum()
-                dim_produtos = dim_produtos.merge(
-                    total_por_jogo.rename('receita_total_jogo'),
-                    left_on='jogo_id',
-                    right_index=True
+                dim_produtos['receita_total_jogo'] = (
+                    dim_produtos.groupby(['jogo_sk', 'jogo_id'], dropna=False)['Receita_Total_Produto'].transform('sum')
                 )
                 dim_produtos['participacao_percentual'] = (
                     dim_produtos['Receita_Total_Produto'] / 
@@ -643,69 +2708,85 @@ class CruzeiroPowerBIExporter:
                 ).round(2)
             
             self.dfs['dim_produtos'] = dim_produtos
-            print(f"✓ Dimensão Produtos criada com {len(dim_produtos)} registros!\n")
+            log.info(f"✓ Dimensão Produtos criada com {len(dim_produtos)} registros!\n")
         else:
-            print("⚠ Colunas de agregação não encontradas")
+            log.warning("⚠ Colunas de agregação não encontradas")
             self.dfs['dim_produtos'] = pd.DataFrame()
     
+    def _publico_por_jogo(self):
+        """Público total por jogo_id a partir de jogo_fatos"""
+        jogos = self.dfs['jogo_fatos']
+        colunas = {c.strip().lower().replace(' ', '_'): c for c in jogos.columns}
+        if 'publico_total' not in colunas or 'jogo_id' not in colunas:
+            return pd.Series(dtype=float)
+        publico = pd.to_numeric(jogos[colunas['publico_total']], errors='coerce')
+        return pd.Series(publico.to_numpy(), index=jogos[colunas['jogo_id']]).groupby(level=0).first()
+    
+    @memoizar_etapa
     def criar_dimensao_demografica(self):
         """Cria dimensões demográficas agregadas"""
         
         if self.dfs['demografico'].empty:
-            print("⚠ Dados demográficos não disponíveis, pulando")
+            log.warning("⚠ Dados demográficos não disponíveis, pulando")
             self.dfs['dim_demografica'] = pd.DataFrame()
             return
         
-        print("Criando dimensão demográfica...")
+        log.info("Criando dimensão demográfica...")
         
-        demo = self.dfs['demografico'].copy()
+        demo = self.dfs['demografico']
         
         # Verificar colunas necessárias
         required_cols = ['Jogo_ID', 'Tipo_Metrica', 'Categoria', 'Valor_Percentual']
         missing = [col for col in required_cols if col not in demo.columns]
         
         if missing:
-            print(f"⚠ Colunas ausentes em demografico: {missing}")
+            log.warning(f"⚠ Colunas ausentes em demografico: {missing}")
             self.dfs['dim_demografica'] = pd.DataFrame()
             return
         
         try:
-            # Limpar percentuais
-            if demo['Valor_Percentual'].dtype == 'object':
-                demo['Valor_Percentual'] = demo['Valor_Percentual'].str.rstrip('%').astype(float) / 100
+            # Apenas as métricas conhecidas, na ordem em que viram colunas
+            demo = demo[demo['Tipo_Metrica'].isin(self.METRICAS_DEMOGRAFICAS)]
             
-            # Pivot por tipo de métrica
-            genero = demo[demo['Tipo_Metrica'] == 'Gênero'].pivot_table(
-                index='Jogo_ID',
-                columns='Categoria',
-                values='Valor_Percentual',
-                aggfunc='first'
-            ).add_prefix('perc_')
+            # Códigos inteiros para jogo (linhas) e (métrica, categoria) (colunas)
+            jogo_cod, jogos = pd.factorize(demo['Jogo_ID'], sort=True)
+            metrica_cod = pd.Categorical(demo['Tipo_Metrica'], categories=self.METRICAS_DEMOGRAFICAS).codes
+            pares = pd.MultiIndex.from_arrays([metrica_cod, demo['Categoria'].to_numpy()])
+            colunas = pares.unique().sort_values()
+            coluna_cod = colunas.get_indexer(pares)
             
-            faixa_etaria = demo[demo['Tipo_Metrica'] == 'Faixa Etária'].pivot_table(
-                index='Jogo_ID',
-                columns='Categoria',
-                values='Valor_Percentual',
-                aggfunc='first'
-            ).add_prefix('perc_')
+            valores = {'perc_': self._percentual_para_decimal(demo['Valor_Percentual'])}
+            if 'Valor_Nominal' in demo.columns:
+                valores['nominal_'] = pd.to_numeric(demo['Valor_Nominal'], errors='coerce').to_numpy(dtype=float)
             
-            regiao = demo[demo['Tipo_Metrica'] == 'Região'].pivot_table(
-                index='Jogo_ID',
-                columns='Categoria',
-                values='Valor_Percentual',
-                aggfunc='first'
-            ).add_prefix('perc_')
+            # Preenche as matrizes jogo x categoria de uma vez; a ordem invertida faz
+            # a primeira ocorrência prevalecer em duplicatas (como aggfunc='first')
+            blocos = {'Jogo_ID': jogos}
+            for prefixo, serie in valores.items():
+                matriz = np.full((len(jogos), len(colunas)), np.nan)
+                matriz[jogo_cod[::-1], coluna_cod[::-1]] = serie[::-1]
+                for i, categoria in enumerate(colunas.get_level_values(1)):
+                    blocos[f'{prefixo}{categoria}'] = matriz[:, i]
             
-            # Consolidar
-            dim_demografica = genero.join(faixa_etaria, how='outer').join(regiao, how='outer').reset_index()
+            dim_demografica = pd.DataFrame(blocos)
             dim_demografica.columns = dim_demografica.columns.str.replace(' ', '_')
             
             self.dfs['dim_demografica'] = dim_demografica
-            print(f"✓ Dimensão Demográfica criada com {len(dim_demografica)} registros!\n")
+            log.info(f"✓ Dimensão Demográfica criada com {len(dim_demografica)} registros!\n")
         except Exception as e:
-            print(f"⚠ Erro ao criar dimensão demográfica: {e}")
+            log.warning(f"⚠ Erro ao criar dimensão demográfica: {e}")
             self.dfs['dim_demografica'] = pd.DataFrame()
     
+    @staticmethod
+    def _percentual_para_decimal(serie):
+        """Converte '70%' (ou 70) em 0.7; cada texto distinto é convertido uma única vez"""
+        if pd.api.types.is_numeric_dtype(serie):
+            return serie.to_numpy(dtype=float) / 100
+        codigos, unicos = pd.factorize(serie)
+        convertidos = pd.to_numeric(pd.Index(unicos).astype(str).str.rstrip('%').str.strip(), errors='coerce')
+        return np.append(np.asarray(convertidos, dtype=float) / 100, np.nan)[codigos]
+    
+    @memoizar_etapa
     def criar_analise_temporal(self):
         """Cria análise de séries temporais"""
         
@@ -723,6 +2804,11 @@ class CruzeiroPowerBIExporter:
         analise_temporal['mes'] = analise_temporal['data'].dt.month
         analise_temporal['trimestre'] = analise_temporal['data'].dt.quarter
         
+        # Ordenada por data, com tendência de receita (últimos 5 jogos e últimos 30 dias)
+        serie = SerieTemporal(analise_temporal)
+        moveis = serie.metricas_moveis(['total_arrecadado'], n=5, dias=30)
+        analise_temporal = pd.concat([moveis.reset_index(drop=True), serie.sem_data], ignore_index=True)
+        
         # Métricas agregadas por ano
         metricas_anuais = analise_temporal.groupby('ano').agg({
             'receita_ingresso': ['sum', 'mean', 'std'],
@@ -733,10 +2819,34 @@ class CruzeiroPowerBIExporter:
         metricas_anuais.columns = ['_'.join(col).strip() for col in metricas_anuais.columns.values]
         metricas_anuais = metricas_anuais.reset_index()
         
-        self.dfs['analise_temporal'] = analise_temporal
-        self.dfs['metricas_anuais'] = metricas_anuais
-        print("✓ Análise Temporal criada!\n")
+        self.dfs['analise_temporal'] = analise_temporal
+        self.dfs['metricas_anuais'] = metricas_anuais
+        log.info("✓ Análise Temporal criada!\n")
+    
+    def serie_temporal(self, dataset='analise_temporal'):
+        """
+        SerieTemporal (ordenada e indexada por data) de um dataset com coluna data
+        
+        Fica em cache enquanto o dataset em self.dfs for o mesmo objeto.
+        """
+        df = self.dfs[dataset]
+        em_cache = self._series_temporais.get(dataset)
+        if em_cache is None or em_cache[0] is not df:
+            em_cache = (df, SerieTemporal(df))
+            self._series_temporais[dataset] = em_cache
+        return em_cache[1]
+    
+    def consultar_periodo(self, inicio=None, fim=None, dataset='analise_temporal'):
+        """
+        Jogos de um dataset entre duas datas (inclusivas), via busca binária
+        
+        Args:
+            inicio, fim: Datas (str, datetime ou Timestamp); None deixa o lado aberto
+            dataset: Dataset com coluna data (ex.: 'analise_temporal', 'fato_consolidado')
+        """
+        return self.serie_temporal(dataset).intervalo(inicio, fim).reset_index(drop=True)
     
+    @memoizar_etapa
     def calcular_correlacoes(self):
         """Calcula correlações entre variáveis principais"""
         
@@ -758,7 +2868,7 @@ class CruzeiroPowerBIExporter:
         colunas_disponiveis = [col for col in colunas_numericas if col in fato.columns]
         
         if len(colunas_disponiveis) < 2:
-            print("⚠ Colunas insuficientes para calcular correlações")
+            log.warning("⚠ Colunas insuficientes para calcular correlações")
             return
         
         correlacao = fato[colunas_disponiveis].corr().round(3)
@@ -773,94 +2883,603 @@ class CruzeiroPowerBIExporter:
             insights.append(f"Correlação Ticket Médio x Receita: {correlacao.loc['ticket_medio_ingresso', 'receita_ingresso']:.3f}")
         
         self.correlations['insights'] = insights
-        print("✓ Correlações calculadas!\n")
+        log.info("✓ Correlações calculadas!\n")
     
-    def criar_kpis_dashboard(self):
-        """Cria tabela de KPIs para dashboard"""
+    @staticmethod
+    def _classificar_era(anos):
+        """Era (Pré-COVID, Pandemia, Pós-COVID) para uma série de anos"""
+        return pd.Series(
+            np.select([anos < 2020, anos <= 2021], ['Pré-COVID', 'Pandemia'], 'Pós-COVID'),
+            index=anos.index
+        ).where(anos.notna())
+    
+    @memoizar_etapa
+    def criar_agregados_kpis(self):
+        """
+        Materializa os KPIs em vários grãos (geral, ano, competição, adversário, era)
+        
+        Bases: os jogos de fato_consolidado e, se disponíveis, os jogos de
+        receitas_detalhadas (que trazem a competição). Os agregados ficam em
+        self.agregados_kpis e podem ser atualizados com atualizar_agregados.
+        """
+        
+        log.info("Criando agregados de KPIs...")
+        
+        self.agregados_kpis = AgregadosKPI()
         
         fato = self.dfs['fato_consolidado']
+        if not fato.empty:
+            self.agregados_kpis.adicionar(self._preparar_base_kpis(fato), 'fato_consolidado')
+        
+        detalhadas = self.dfs['receitas_detalhadas']
+        if not detalhadas.empty:
+            self.agregados_kpis.adicionar(self._preparar_base_kpis(detalhadas), 'receitas_detalhadas')
+        
+        self.dfs['agregados_kpis'] = self.agregados_kpis.tabela()
+        log.info(f"✓ Agregados de KPIs criados com {len(self.dfs['agregados_kpis'])} registros!\n")
+    
+    def _preparar_base_kpis(self, jogos):
+        """Padroniza nomes de colunas e adiciona a era para o cálculo dos agregados"""
+        jogos = jogos.rename(columns={
+            'publico_presente': 'publico_total',
+            'ticket_medio_real_ingresso': 'ticket_medio_ingresso',
+        })
+        if 'receita_per_capita' not in jogos.columns and {'total_arrecadado', 'publico_total'} <= set(jogos.columns):
+            jogos['receita_per_capita'] = jogos['total_arrecadado'] / jogos['publico_total'].where(jogos['publico_total'] > 0)
+        if 'era' not in jogos.columns and 'ano' in jogos.columns:
+            jogos['era'] = self._classificar_era(jogos['ano'])
+        return jogos
+    
+    def atualizar_agregados(self, novos_jogos, base='fato_consolidado'):
+        """
+        Incorpora novos jogos aos agregados sem recalcular o fato inteiro
+        
+        Args:
+            novos_jogos: DataFrame no formato de fato_consolidado (ou receitas_detalhadas)
+            base: Base a atualizar
+        """
+        if 'agregados_kpis' not in self.dfs:
+            self.garantir_tabelas(['AGG_KPIs'])
+        self.agregados_kpis.adicionar(self._preparar_base_kpis(novos_jogos), base)
+        self.dfs['agregados_kpis'] = self.agregados_kpis.tabela()
+        self._modificados_em_memoria.add('agregados_kpis')
+        self.criar_kpis_dashboard()
+    
+    @memoizar_etapa
+    def criar_kpis_dashboard(self):
+        """Cria tabela de KPIs para dashboard a partir dos agregados materializados"""
+        
+        agregados = self.agregados_kpis
+        metricas = agregados.metricas('fato_consolidado')
+        
+        def valor(metrica, estatistica='media'):
+            return agregados.valor('fato_consolidado', metrica, estatistica)
         
         kpis_data = {
             'Métrica': [],
             'Valor': []
         }
         
-        if 'publico_total' in fato.columns:
+        if 'publico_total' in metricas:
             kpis_data['Métrica'].append('Público Médio')
-            kpis_data['Valor'].append(f"{fato['publico_total'].mean():,.0f}")
+            kpis_data['Valor'].append(f"{valor('publico_total'):,.0f}")
         
-        if 'total_arrecadado' in fato.columns:
+        if 'total_arrecadado' in metricas:
             kpis_data['Métrica'].append('Receita Média Total')
-            kpis_data['Valor'].append(f"R$ {fato['total_arrecadado'].mean():,.2f}")
+            kpis_data['Valor'].append(f"R$ {valor('total_arrecadado'):,.2f}")
         
-        if 'ticket_medio_ingresso' in fato.columns:
+        if 'ticket_medio_ingresso' in metricas:
             kpis_data['Métrica'].append('Ticket Médio Ingresso')
-            kpis_data['Valor'].append(f"R$ {fato['ticket_medio_ingresso'].mean():.2f}")
+            kpis_data['Valor'].append(f"R$ {valor('ticket_medio_ingresso'):.2f}")
         
-        if 'receita_per_capita' in fato.columns:
+        if 'receita_per_capita' in metricas:
             kpis_data['Métrica'].append('Receita Per Capita')
-            kpis_data['Valor'].append(f"R$ {fato['receita_per_capita'].mean():.2f}")
+            kpis_data['Valor'].append(f"R$ {valor('receita_per_capita'):.2f}")
         
-        if 'publico_total' in fato.columns:
+        if 'publico_total' in metricas:
             kpis_data['Métrica'].extend(['Maior Público', 'Menor Público', 'Total de Jogos'])
             kpis_data['Valor'].extend([
-                f"{fato['publico_total'].max():,.0f}",
-                f"{fato['publico_total'].min():,.0f}",
-                f"{len(fato)}"
+                f"{valor('publico_total', 'maximo'):,.0f}",
+                f"{valor('publico_total', 'minimo'):,.0f}",
+                f"{valor('publico_total', 'jogos')}"
             ])
         
         kpis = pd.DataFrame(kpis_data)
         
         self.dfs['kpis_dashboard'] = kpis
-        print("✓ KPIs para Dashboard criados!\n")
+        log.info("✓ KPIs para Dashboard criados!\n")
+    
+    @staticmethod
+    def _faixa_horario(horarios):
+        """Classifica o horário de início ('16:00h', '20', '19:30') em Tarde/Noite"""
+        hora = pd.to_numeric(horarios.astype(str).str.extract(r'(\d{1,2})', expand=False), errors='coerce')
+        return pd.Series(np.where(hora < 18, 'Tarde', 'Noite'), index=horarios.index).where(hora.notna())
     
-    def exportar_para_powerbi(self, pasta_saida='exports_powerbi'):
-        """Exporta todos os datasets para Power BI"""
+    def _base_projecao(self):
+        """Jogos históricos com público e receita para ajuste dos fatores de projeção"""
+        partes = []
+        
+        detalhadas = self.dfs['receitas_detalhadas']
+        if not detalhadas.empty:
+            partes.append(pd.DataFrame({
+                'publico': detalhadas['publico_presente'],
+                'receita': detalhadas['total_arrecadado'],
+                'tipo_adversario': detalhadas['tipo_adversario'],
+                'competicao': detalhadas['competicao'],
+            }))
         
-        import os
-        os.makedirs(pasta_saida, exist_ok=True)
+        fato = self.dfs['fato_consolidado']
+        if not fato.empty and {'publico_total', 'total_arrecadado'} <= set(fato.columns):
+            partes.append(pd.DataFrame({
+                'publico': fato['publico_total'],
+                'receita': fato['total_arrecadado'],
+                'tipo_adversario': fato.get('tipo_adversario'),
+                'dia_semana': fato.get('dia_semana'),
+                'faixa_horario': self._faixa_horario(fato['horario']) if 'horario' in fato.columns else None,
+            }))
+        
+        if not partes:
+            return pd.DataFrame()
+        
+        base = pd.concat(partes, ignore_index=True)
+        base['publico'] = pd.to_numeric(base['publico'], errors='coerce')
+        base['receita'] = pd.to_numeric(base['receita'], errors='coerce')
+        return base[(base['publico'] > 0) & (base['receita'] > 0)].reset_index(drop=True)
+    
+    @memoizar_etapa
+    def criar_projecao_publico(self, jogos=None, n_cenarios=100_000, semente=42, tamanho_lote=16):
+        """
+        Projeta público e receita por jogo com simulação de Monte Carlo
         
-        # Lista de tabelas para exportar
-        tabelas = {
-            'FATO_Jogos': 'fato_consolidado',
-            'DIM_Produtos': 'dim_produtos',
-            'DIM_Demografica': 'dim_demografica',
-            'FATO_Temporal': 'analise_temporal',
-            'AGG_Metricas_Anuais': 'metricas_anuais',
-            'KPI_Dashboard': 'kpis_dashboard',
-            # ========== NOVO: Tabelas de receitas detalhadas ==========
-            'FATO_Receitas_Detalhadas': 'receitas_detalhadas',
-            'ANALISE_Precificacao': 'analise_precificacao',
-            'ANALISE_Mix_Receitas': 'mix_receitas',
-            'ANALISE_Ocupacao': 'analise_ocupacao',
-            'SERIE_Temporal_Completa': 'serie_temporal_completa'
-            # ==========================================================
-        }
+        Ajusta fatores multiplicativos (adversário, competição, dia da semana e
+        faixa de horário) para o público e para a receita por torcedor a partir
+        dos jogos históricos e simula n_cenarios por jogo, em lotes de jogos,
+        com NumPy. O público é limitado à capacidade do Mineirão.
+        
+        Args:
+            jogos: DataFrame com jogo_id e qualquer subconjunto das colunas de
+                fatores (padrão: os jogos de fato_consolidado)
+            n_cenarios: Cenários simulados por jogo
+            semente: Semente do gerador aleatório
+            tamanho_lote: Jogos simulados por vez (limita a memória)
+        """
+        
+        log.info("Criando projeção de público (Monte Carlo)...")
+        
+        base = self._base_projecao()
+        if len(base) < 3:
+            log.warning("⚠ Jogos insuficientes para ajustar a projeção, pulando")
+            self.dfs['projecao_publico'] = pd.DataFrame()
+            return
+        
+        fatores = [f for f in self.FATORES_PROJECAO if f in base.columns and base[f].notna().any()]
+        base_pub, efeitos_pub, sigma_pub = ajustar_fatores_log(np.log(base['publico']), base[fatores])
+        base_rpc, efeitos_rpc, sigma_rpc = ajustar_fatores_log(np.log(base['receita'] / base['publico']), base[fatores])
+        
+        if jogos is None:
+            fato = self.dfs['fato_consolidado']
+            jogos = pd.DataFrame({
+                'jogo_id': fato['jogo_id'],
+                'tipo_adversario': fato.get('tipo_adversario'),
+                'dia_semana': fato.get('dia_semana'),
+                'faixa_horario': self._faixa_horario(fato['horario']) if 'horario' in fato.columns else None,
+            })
+        jogos = jogos.reset_index(drop=True)
+        
+        # Média do log de público e de receita por torcedor de cada jogo
+        mu_pub = np.full(len(jogos), base_pub)
+        mu_rpc = np.full(len(jogos), base_rpc)
+        for fator in fatores:
+            if fator in jogos.columns:
+                mu_pub += jogos[fator].map(efeitos_pub[fator]).fillna(0.0).to_numpy(dtype=float)
+                mu_rpc += jogos[fator].map(efeitos_rpc[fator]).fillna(0.0).to_numpy(dtype=float)
+        
+        rng = np.random.default_rng(semente)
+        percentis = [5, 25, 50, 75, 95]
+        limite_lotado = 0.95 * self.capacidade_estadio
+        resultados = []
+        
+        for inicio in range(0, len(jogos), tamanho_lote):
+            fim = min(inicio + tamanho_lote, len(jogos))
+            n = fim - inicio
+            
+            publico = np.exp(mu_pub[inicio:fim, None] + sigma_pub * rng.standard_normal((n, n_cenarios)))
+            np.minimum(publico, self.capacidade_estadio, out=publico)
+            receita = publico * np.exp(mu_rpc[inicio:fim, None] + sigma_rpc * rng.standard_normal((n, n_cenarios)))
+            
+            bloco = {'publico_medio': publico.mean(axis=1), 'receita_media': receita.mean(axis=1)}
+            for p, valores in zip(percentis, np.percentile(publico, percentis, axis=1)):
+                bloco[f'publico_p{p:02d}'] = valores
+            for p, valores in zip(percentis, np.percentile(receita, percentis, axis=1)):
+                bloco[f'receita_p{p:02d}'] = valores
+            bloco['prob_lotacao_95'] = (publico >= limite_lotado).mean(axis=1)
+            resultados.append(pd.DataFrame(bloco))
+        
+        projecao = pd.concat([jogos, pd.concat(resultados, ignore_index=True).round(2)], axis=1)
+        projecao['n_cenarios'] = n_cenarios
+        
+        self.dfs['projecao_publico'] = projecao
+        log.info(f"✓ Projeção de Público criada para {len(projecao)} jogos "
+              f"({n_cenarios:,} cenários cada, base de {len(base)} jogos históricos)!\n")
+    
+    @memoizar_etapa
+    def criar_serie_socios(self):
+        """
+        Cria a série diária de sócios-torcedores (ver SerieSocios)
+        
+        Períodos ('Agosto de 2024', 'Fim de 2024') e faixas ('78,9 mil a
+        81 mil') de socio_torcedor viram pontos datados; os dias entre eles
+        são interpolados no tempo. origem_socios indica se o dia foi
+        observado, interpolado ou mantido na borda de um período.
+        """
+        
+        log.info("Criando série diária de sócios-torcedores...")
+        
+        if self.dfs['socio_torcedor'].empty:
+            log.warning("⚠ Dados de sócios-torcedores não disponíveis, pulando")
+            self.serie_socios = None
+            self.dfs['socios_diario'] = pd.DataFrame()
+            return
+        
+        self.serie_socios = SerieSocios(self.dfs['socio_torcedor'])
+        for periodo in self.serie_socios.ignoradas['periodo']:
+            log.warning(f"  ⚠ Observação de sócios não interpretada: {periodo!r}")
+        
+        diaria = self.serie_socios.diaria().reset_index()
+        self.dfs['socios_diario'] = diaria
+        if not diaria.empty:
+            log.info(f"✓ Série de Sócios criada: {len(diaria)} dias de {diaria['data'].min():%d/%m/%Y} "
+                     f"a {diaria['data'].max():%d/%m/%Y} ({len(self.serie_socios.observacoes)} observações)!\n")
+    
+    @memoizar_etapa
+    def criar_socios_jogos(self):
+        """
+        Junta a série de sócios a cada jogo de fato_consolidado pela data
+        
+        Uma linha por jogo com os sócios ativos no dia (médio, mínimo e
+        máximo) e publico_por_socio (público / sócios ativos), base para a
+        participação de sócios no público. Jogos fora dos períodos informados
+        ficam sem valor.
+        """
+        
+        log.info("Juntando sócios-torcedores aos jogos...")
+        
+        fato = self.dfs['fato_consolidado']
+        if self.serie_socios is None or fato.empty or 'data' not in fato.columns:
+            log.warning("⚠ Série de sócios ou datas dos jogos não disponíveis, pulando")
+            self.dfs['socios_jogos'] = pd.DataFrame()
+            return
+        
+        colunas = [c for c in ['jogo_id', 'jogo_sk', 'data', 'publico_total'] if c in fato.columns]
+        jogos = fato[colunas].copy()
+        socios = self.serie_socios.no_dia(jogos['data'])
+        jogos = pd.concat([jogos, socios], axis=1)
+        
+        if 'publico_total' in jogos.columns:
+            publico = pd.to_numeric(jogos['publico_total'], errors='coerce')
+            ativos = jogos['socios_ativos'].astype(float)
+            jogos['publico_por_socio'] = (publico / ativos.where(ativos > 0)).round(4)
+        
+        self.dfs['socios_jogos'] = jogos
+        com_socios = jogos['socios_ativos'].notna().sum()
+        log.info(f"✓ Sócios por Jogo criado: {com_socios} de {len(jogos)} jogos dentro dos períodos informados!\n")
+    
+    @memoizar_etapa
+    def criar_vendas_canal(self):
+        """
+        Cria o fato numérico de vendas anuais por canal (vendas_canal)
+        
+        As células '252.000 – 308.000 (40%)' viram quantidade_min/max/media
+        e participacao_percent num único passe (interpretar_faixas_tabela).
+        Se o Star Schema estiver mapeado, cada ano × canal é conciliado com
+        as vendas por jogo de FATO_MERCADO_INGRESSOS: participação simulada
+        e diferença em pontos percentuais para a informada.
+        """
         
-        arquivos_criados = []
+        log.info("Criando fato de vendas por canal...")
         
-        for nome_arquivo, nome_df in tabelas.items():
-            if nome_df in self.dfs and not self.dfs[nome_df].empty:
-                caminho = f"{pasta_saida}/{nome_arquivo}.csv"
-                self.dfs[nome_df].to_csv(caminho, index=False, encoding='utf-8-sig')
-                arquivos_criados.append(nome_arquivo)
-                print(f"✓ Exportado: {nome_arquivo}.csv ({len(self.dfs[nome_df])} registros)")
+        df = self.dfs.get('vendas_canal')
+        if df is None or df.empty:
+            log.warning("⚠ Dados de vendas por canal não disponíveis, pulando")
+            self.dfs['vendas_canal_faixas'] = pd.DataFrame()
+            return
+        
+        df = df.rename(columns=lambda c: c.strip())
+        col_ano = next((c for c in df.columns if c.lower() == 'ano'), df.columns[0])
+        col_total = next((c for c in df.columns if 'total' in c.lower()), None)
+        
+        # '2025*' = ano ainda em andamento
+        ano = df[col_ano].astype(str).str.strip()
+        df = df.drop(columns=col_ano).assign(
+            ano=pd.to_numeric(ano.str.extract(r'(\d{4})', expand=False), errors='coerce').astype('Int64'),
+            ano_parcial=ano.str.contains('*', regex=False),
+        )
+        longo = interpretar_faixas_tabela(df, ['ano', 'ano_parcial'])
+        
+        canais = longo[longo['coluna'] != col_total]
+        fato = pd.DataFrame({
+            'ano': canais['ano'],
+            'ano_parcial': canais['ano_parcial'],
+            'canal': canais['coluna'].str.replace(r'\s*\(.*\)\s*$', '', regex=True).str.strip(),
+            'quantidade_min': canais['minimo'],
+            'quantidade_max': canais['maximo'],
+            'quantidade_media': canais['medio'],
+            'participacao_percent': canais['participacao_percent'],
+        })
+        if col_total is not None:
+            total = longo[longo['coluna'] == col_total].set_index('ano')['medio']
+            fato['total_ano_medio'] = fato['ano'].map(total)
+            fato['participacao_calculada_percent'] = (fato['quantidade_media'] / fato['total_ano_medio'] * 100).round(2)
+        
+        # Conciliação com as vendas por jogo do Star Schema
+        simulado = self._vendas_mercado_por_ano_canal()
+        fato['chave_canal'] = _sem_acentos(fato['canal']).str.split().str[0]
+        if simulado is not None:
+            fato = fato.merge(simulado, on=['ano', 'chave_canal'], how='left')
+            fato['participacao_simulada_percent'] = (fato['vendas_simuladas'] / fato['ano'].map(
+                simulado.groupby('ano')['vendas_simuladas'].sum()) * 100).round(2)
+        else:
+            fato['jogos_simulados'] = pd.NA
+            fato['vendas_simuladas'] = np.nan
+            fato['participacao_simulada_percent'] = np.nan
+        fato['jogos_simulados'] = fato['jogos_simulados'].astype('Int64')
+        
+        diferenca = (fato['participacao_simulada_percent'] - fato['participacao_percent']).round(2)
+        fato['diferenca_participacao_pp'] = diferenca
+        fato['dentro_tolerancia'] = (diferenca.abs() <= self.TOLERANCIA_CANAL_PP).astype('boolean').mask(diferenca.isna())
+        fato = fato.drop(columns='chave_canal').sort_values('ano', kind='stable').reset_index(drop=True)
+        
+        self.dfs['vendas_canal_faixas'] = fato
+        conciliados = fato['dentro_tolerancia'].notna().sum()
+        log.info(f"✓ Vendas por Canal criado com {len(fato)} registros ({conciliados} conciliados com o Star Schema)!\n")
+    
+    def _vendas_mercado_por_ano_canal(self):
+        """Vendas de FATO_MERCADO_INGRESSOS somadas por ano × canal, ou None sem Star Schema"""
+        mercado = self.dfs.get('mercado_ingressos')
+        datas = self.dfs.get('dim_data')
+        if mercado is None or mercado.empty or datas is None or datas.empty:
+            return None
+        
+        ano = pd.to_numeric(mercado['data_id'].map(datas.set_index('data_id')['ano']), errors='coerce')
+        canais = self.dfs.get('dim_canal')
+        nomes = (canais.set_index('canal_id')['nome_canal'] if canais is not None and not canais.empty
+                 else pd.Series(self.CANAIS_MERCADO))
+        
+        vendas = pd.DataFrame({
+            'ano': ano.astype('Int64'),
+            'chave_canal': _sem_acentos(mercado['canal_id'].map(nomes)).str.split().str[0],
+            'vendas_canal': pd.to_numeric(mercado['vendas_canal'], errors='coerce'),
+        })
+        return (vendas.groupby(['ano', 'chave_canal'])['vendas_canal']
+                .agg(jogos_simulados='count', vendas_simuladas='sum')
+                .reset_index())
+    
+    @memoizar_etapa
+    def criar_vendas_competicao(self):
+        """
+        Cria o fato numérico de vendas por competição (vendas_competicao)
+        
+        Todas as faixas ('35.000-42.000', '70%-75%', '2-5') são interpretadas
+        num único passe e viram <medida>_min/_max/_medio. vendas_calculadas_medio
+        (jogos × público médio) e participacao_calculada_percent conferem as
+        estimativas informadas.
+        """
+        
+        log.info("Criando fato de vendas por competição...")
+        
+        df = self.dfs.get('vendas_competicao')
+        if df is None or df.empty:
+            log.warning("⚠ Dados de vendas por competição não disponíveis, pulando")
+            self.dfs['vendas_competicao_faixas'] = pd.DataFrame()
+            return
+        
+        df = df.rename(columns=lambda c: c.strip())
+        col_competicao = df.columns[0]
+        df = df.rename(columns={col_competicao: 'competicao'})
+        longo = interpretar_faixas_tabela(df, ['competicao'])
+        
+        chaves = _sem_acentos(longo['coluna'])
+        longo['medida'] = np.select([chaves.str.contains(chave, regex=False).fillna(False).to_numpy(dtype=bool)
+                                     for chave in self.COLUNAS_VENDAS_COMPETICAO],
+                                    list(self.COLUNAS_VENDAS_COMPETICAO.values()), default='')
+        longo = longo[longo['medida'] != '']
+        
+        fato = longo.pivot(index='competicao', columns='medida', values=['minimo', 'maximo', 'medio'])
+        fato.columns = [f"{medida}_{sufixo}" for estatistica, medida in fato.columns
+                        for sufixo in [{'minimo': 'min', 'maximo': 'max', 'medio': 'medio'}[estatistica]]]
+        ordem = [f"{medida}_{sufixo}" for medida in self.COLUNAS_VENDAS_COMPETICAO.values()
+                 for sufixo in ('min', 'max', 'medio')]
+        fato = fato[[c for c in ordem if c in fato.columns]].reindex(df['competicao'].unique()).reset_index()
+        
+        if {'jogos_ano_medio', 'publico_medio_medio'} <= set(fato.columns):
+            fato['vendas_calculadas_medio'] = (fato['jogos_ano_medio'] * fato['publico_medio_medio']).round()
+        if 'vendas_medio' in fato.columns:
+            fato['participacao_calculada_percent'] = (fato['vendas_medio'] / fato['vendas_medio'].sum() * 100).round(2)
+        
+        self.dfs['vendas_competicao_faixas'] = fato
+        log.info(f"✓ Vendas por Competição criado com {len(fato)} registros e {len(fato.columns)} colunas!\n")
+    
+    def _regras_qualidade(self):
+        """Monta o ValidadorQualidade com as regras de cada fonte"""
+        # transacoes_consumo chega agregada por jogo × produto × faixa de horário
+        validador = ValidadorQualidade(agregadas=['transacoes_consumo'])
+        capacidade = self.capacidade_estadio
+        atol, rtol = self.TOLERANCIA_SOMA
+        
+        def soma(*colunas):
+            return lambda df: df[list(colunas)].sum(axis=1, min_count=len(colunas))
+        
+        def difere(total, *partes):
+            return lambda df: ~np.isclose(df[total], soma(*partes)(df), rtol=rtol, atol=atol) & df[total].notna()
+        
+        def regra_soma(tabela, regra, total, *partes):
+            validador.adicionar(tabela, regra, 'erro', total, difere(total, *partes), esperado=soma(*partes),
+                                colunas=partes, descricao=f"{total} diferente de {' + '.join(partes)}")
+        
+        def regra_ausente(tabela, coluna, descricao):
+            validador.adicionar(tabela, f'{coluna}_ausente', 'aviso', coluna, lambda df: df[coluna].isna(),
+                                descricao=descricao)
+        
+        # receitas_detalhadas: ocupação, capacidade e composição das receitas
+        validador.adicionar('receitas_detalhadas', 'taxa_ocupacao_fora_da_faixa', 'erro', 'taxa_ocupacao_percent',
+                            lambda df: (df['taxa_ocupacao_percent'] < 0) | (df['taxa_ocupacao_percent'] > 100),
+                            descricao='Taxa de ocupação fora de 0-100%')
+        validador.adicionar('receitas_detalhadas', 'publico_acima_capacidade', 'erro', 'publico_presente',
+                            lambda df: df['publico_presente'] > capacidade, esperado=lambda df: np.full(len(df), capacidade),
+                            descricao=f'Público presente acima da capacidade do estádio ({capacidade:,} lugares)')
+        validador.adicionar('receitas_detalhadas', 'taxa_ocupacao_inconsistente', 'aviso', 'taxa_ocupacao_percent',
+                            lambda df: (df['publico_presente'] / capacidade * 100 - df['taxa_ocupacao_percent']).abs()
+                            > self.TOLERANCIA_TAXA_PP,
+                            esperado=lambda df: (df['publico_presente'] / capacidade * 100).round(2),
+                            colunas=['publico_presente'],
+                            descricao='Taxa de ocupação diferente de público presente / capacidade')
+        validador.adicionar('receitas_detalhadas', 'publico_pagante_acima_presente', 'erro', 'publico_pagante',
+                            lambda df: df['publico_pagante'] > df['publico_presente'],
+                            esperado=lambda df: df['publico_presente'], colunas=['publico_presente'],
+                            descricao='Público pagante maior que o presente')
+        validador.adicionar('receitas_detalhadas', 'jogo_sem_publico', 'aviso', 'publico_presente',
+                            lambda df: df['publico_presente'] == 0,
+                            descricao='Jogo sem público: métricas por torcedor ficam vazias')
+        regra_soma('receitas_detalhadas', 'total_diferente_soma_partes', 'total_arrecadado', 'receita_ingresso',
+                   'receita_produtos_internos', 'receita_camarotes', 'receita_estacionamento')
+        regra_soma('receitas_detalhadas', 'ingresso_diferente_soma_inteiras_meias', 'receita_ingresso',
+                   'receita_ingresso_inteiras', 'receita_ingresso_meias')
+        for coluna in ['publico_presente', 'taxa_ocupacao_percent', 'total_arrecadado', 'receita_ingresso']:
+            regra_ausente('receitas_detalhadas', coluna, 'Valor ausente ou não numérico')
+        
+        # Receitas por jogo (recentes e históricas)
+        regra_soma('receita', 'total_diferente_soma_partes', 'total_arrecadado',
+                   'receita_ingresso', 'receita_produtos_internos')
+        regra_soma('receitas_historicas', 'total_diferente_soma_partes', 'total_arrecadado',
+                   'receita_ingresso', 'receita_produtos_internos')
+        for tabela in ['receita', 'receitas_historicas', 'jogo_fatos']:
+            regra_ausente(tabela, 'data', 'Data ausente ou fora do formato esperado')
+        
+        # jogo_fatos: público lido do texto ('16.492', '48.862 pagantes')
+        validador.adicionar('jogo_fatos', 'publico_acima_capacidade', 'erro', 'publico_total',
+                            lambda df: df['publico_total'] > capacidade, esperado=lambda df: np.full(len(df), capacidade),
+                            descricao=f'Público acima da capacidade do estádio ({capacidade:,} lugares)')
+        regra_ausente('jogo_fatos', 'publico_total', 'Público ausente ou não numérico')
+        
+        # setor_fatos: participação dos setores soma 100%
+        setores = lambda df: df.drop(columns=['jogo_id', 'jogo_sk'], errors='ignore').apply(pd.to_numeric, errors='coerce')
+        validador.adicionar('setor_fatos', 'setores_nao_somam_100', 'erro', 'jogo_id',
+                            lambda df: (setores(df).sum(axis=1) - 100).abs() > 0.5,
+                            esperado=lambda df: setores(df).sum(axis=1),
+                            descricao='Participação dos setores não soma 100% (esperado = soma encontrada)')
+        
+        # Integridade referencial: jogo_id das fontes por jogo existe em jogo_fatos.
+        # Só vale para colunas com forma de identificador: uma coluna deslocada
+        # na leitura já é avisada na carga e não vira violação aqui
+        def integridade(mascara):
+            return lambda df: mascara(df) & IndiceJogos.parecem_ids(df['jogo_id'])
+        
+        for fonte, unico in self.FONTES_POR_JOGO.items():
+            if unico:
+                validador.adicionar(fonte, 'jogo_id_duplicado', 'aviso' if fonte != 'jogo_fatos' else 'erro', 'jogo_id',
+                                    integridade(lambda df: df['jogo_id'].duplicated(keep=False) & df['jogo_id'].notna()),
+                                    descricao='jogo_id repetido numa fonte com uma linha por jogo')
+            if fonte == 'jogo_fatos':
+                continue
+            validador.adicionar(fonte, 'jogo_id_sem_referencia', 'erro', 'jogo_id',
+                                integridade(lambda df: df['jogo_id'].notna()
+                                            & ~df['jogo_id'].isin(self.indice_jogos.referencia())),
+                                descricao='jogo_id ausente de jogo_fatos')
+            validador.adicionar(fonte, 'jogo_id_ausente', 'aviso', 'jogo_id',
+                                integridade(lambda df: df['jogo_id'].isna()),
+                                descricao='Linha sem jogo_id')
+        
+        # mobilidade_incidentes: jogos simulados do star schema só se ligam a
+        # jogo_fatos pela data (ver _carregar_mobilidade); os demais não são órfãos
+        validador.adicionar('mobilidade_incidentes', 'jogo_simulado_sem_jogo_real', 'aviso', 'jogo_id_simulado',
+                            lambda df: df['jogo_sk'].isna() & df['jogo_id'].str.startswith(self.PREFIXO_JOGO_SIMULADO),
+                            colunas=['jogo_id', 'jogo_sk'],
+                            descricao='Jogo simulado sem jogo real na mesma data (fora de FATO_Jogos)')
+        
+        return validador
+    
+    @memoizar_etapa
+    def validar_qualidade(self):
+        """
+        Avalia as regras de qualidade sobre as fontes e monta violacoes_qualidade
+        
+        Faixa da taxa de ocupação, capacidade do estádio, totais iguais à
+        soma das partes, valores que a carga converteu em nulo e integridade
+        referencial de jogo_id. Não altera as fontes: as violações viram uma
+        tabela para o Power BI (QUALIDADE_Violacoes).
+        """
+        validador = self._regras_qualidade()
+        violacoes = validador.validar(self.dfs)
+        self.dfs['violacoes_qualidade'] = violacoes
+        
+        if violacoes.empty:
+            log.info("✓ Qualidade dos dados: nenhuma violação encontrada\n")
+            return
+        
+        erros = int((violacoes['severidade'] == 'erro').sum())
+        log.warning(f"⚠ Qualidade dos dados: {len(violacoes)} violação(ões) ({erros} erro(s), "
+              f"{len(violacoes) - erros} aviso(s))")
+        contagem = violacoes.groupby(['tabela', 'regra'], sort=False).size()
+        for (tabela, regra), n in contagem.items():
+            log.info(f"     {tabela}.{regra}: {n}")
+        for tabela, regra, faltando in validador.ignoradas:
+            log.info(f"     {tabela}.{regra}: ignorada (sem {', '.join(faltando)})")
+        log.info("")
+    
+    def exportar_para_powerbi(self, pasta_saida='exports_powerbi', tabelas=None):
+        """
+        Exporta os datasets para Power BI
         
-        # Exportar matriz de correlação
-        if 'matriz_correlacao' in self.correlations:
-            caminho_corr = f"{pasta_saida}/CORR_Matriz.csv"
-            self.correlations['matriz_correlacao'].to_csv(caminho_corr, encoding='utf-8-sig')
-            arquivos_criados.append('CORR_Matriz')
-            print(f"✓ Exportado: CORR_Matriz.csv")
+        Args:
+            pasta_saida: Pasta de destino dos CSVs
+            tabelas: Nomes das tabelas a exportar (padrão: todas as disponíveis)
+        """
+        
+        os.makedirs(pasta_saida, exist_ok=True)
+        
+        selecionadas = set(tabelas) if tabelas is not None else set(self.TABELAS_POWERBI) | {'CORR_Matriz'}
+        
+        arquivos_criados = [
+            nome_arquivo for nome_arquivo in self.tabelas_disponiveis()
+            if nome_arquivo in selecionadas and self._exportar_tabela(nome_arquivo, pasta_saida)
+        ]
         
         # Criar arquivo de documentação
         self._criar_documentacao(pasta_saida, arquivos_criados)
         
-        print(f"\n{'='*60}")
-        print(f"EXPORTAÇÃO CONCLUÍDA!")
-        print(f"{'='*60}")
-        print(f"Total de arquivos: {len(arquivos_criados)}")
-        print(f"Localização: ./{pasta_saida}/")
+        log.info(f"\n{'='*60}")
+        log.info(f"EXPORTAÇÃO CONCLUÍDA!")
+        log.info(f"{'='*60}")
+        log.info(f"Total de arquivos: {len(arquivos_criados)}")
+        log.info(f"Localização: ./{pasta_saida}/")
+    
+    def _exportar_tabela(self, nome_arquivo, pasta_saida):
+        """Grava uma tabela do Power BI; devolve False se ela não estiver disponível"""
+        inicio = time.perf_counter()
+        
+        # Matriz de correlação mantém o índice com os nomes das variáveis
+        if nome_arquivo == 'CORR_Matriz':
+            if 'matriz_correlacao' not in self.correlations:
+                return False
+            df = self.correlations['matriz_correlacao']
+            caminho = gravar_csv_em_blocos(df, f"{pasta_saida}/CORR_Matriz.csv", index=True,
+                                           colunas_fixas=self.colunas_particao, **self.opcoes_exportacao)
+            log.info(f"✓ Exportado: {os.path.basename(caminho)}")
+        else:
+            nome_df = self.TABELAS_POWERBI[nome_arquivo]
+            if nome_df not in self.dfs or self.dfs[nome_df].empty:
+                return False
+            
+            df = self.dfs[nome_df]
+            caminho = gravar_csv_em_blocos(df, f"{pasta_saida}/{nome_arquivo}.csv",
+                                           colunas_fixas=self.colunas_particao, **self.opcoes_exportacao)
+            log.info(f"✓ Exportado: {os.path.basename(caminho)} ({len(df)} registros)")
+        
+        if self.metricas.ativo:
+            self.metricas.evento('exportacao', tabela=nome_arquivo, linhas=len(df),
+                                 bytes=os.path.getsize(caminho),
+                                 segundos=round(time.perf_counter() - inicio, 6))
+        return True
     
     def _criar_documentacao(self, pasta, arquivos):
         """Cria documentação dos arquivos exportados"""
@@ -886,7 +3505,8 @@ ARQUIVOS GERADOS:
 
 1. FATO_Jogos.csv
    - Tabela fato principal com informações consolidadas
-   - Chave: jogo_id
+   - Chave: jogo_id (jogo_sk: chave inteira equivalente, preferível
+     nos relacionamentos)
    - Métricas: Público, Receitas, Setores, KPIs
 
 2. DIM_Produtos.csv
@@ -898,8 +3518,9 @@ ARQUIVOS GERADOS:
    - Chave: Jogo_ID
 
 4. FATO_Temporal.csv
-   - Série temporal de receitas
+   - Série temporal de receitas, ordenada por data
    - Dados: 2014-2025
+   - Tendência: total_arrecadado_media_5_jogos e _media_30_dias
 
 5. AGG_Metricas_Anuais.csv
    - Agregações anuais
@@ -944,12 +3565,74 @@ ARQUIVOS GERADOS:
     - Tendências de público e receita
     - Quantidade de jogos por período
 
+** TABELAS ADICIONAIS **
+
+13. FATO_Setores.csv
+    - Formato longo: jogo_id, setor, metrica, valor
+    - Participação de público por setor, mapa de calor e, se houver
+      dados do Star Schema, tempos de entrada/saída e incidentes
+    - Use metrica como filtro/legenda para o mapa de calor
+
+14. AGG_KPIs.csv
+    - KPIs pré-agregados: base, grao, chave, metrica
+    - Grãos: geral, ano, competicao, tipo_adversario, era
+    - Valores numéricos (jogos, contagem, soma, media, minimo, maximo);
+      a formatação fica a cargo do Power BI
+
+15. PROJ_Publico.csv
+    - Projeção de público e receita por jogo (Monte Carlo, 100 mil cenários)
+    - Faixas de percentis p05, p25, p50, p75, p95 e média
+    - prob_lotacao_95: probabilidade de ocupar 95% ou mais do estádio
+    - Fatores: tipo de adversário, competição, dia da semana, horário
+
+16. ANALISE_Otimizacao_Precos.csv
+    - Preços de inteira e meia que maximizam a receita de cada jogo
+    - Curvas de demanda (elasticidade) por competição e tipo de adversário
+    - Receita = ingressos (com desconto de sócios) + produtos por torcedor
+    - Compare receita_modelo_atual x receita_otima (ganho_percent)
+
+17. FATO_Consumo_Faixas.csv (se houver log de transações de consumo)
+    - Transações de ponto de venda agregadas por jogo_id, Produto_Tipico
+      e faixa_horario (15 minutos)
+    - transacoes, quantidade e receita; DIM_Produtos usa esses valores
+      medidos no lugar das estimativas de lotacao_por_jogo
+
+18. QUALIDADE_Violacoes.csv
+    - Uma linha por violação das regras de qualidade dos dados de entrada
+    - tabela, regra, severidade (erro/aviso), linha_arquivo (vazia em
+      fontes agregadas na carga), jogo_id/jogo_sk
+    - coluna, valor encontrado e esperado (ex.: total x soma das partes)
+    - Regras: taxa de ocupação 0-100%, capacidade de 61.927 lugares,
+      totais = soma das partes, valores ausentes e jogo_id sem referência
+
+19. FATO_Socios_Diario.csv
+    - Sócios-torcedores ativos por dia (médio, mínimo e máximo da faixa)
+    - Interpolado entre os períodos informados ('Agosto de 2024', 'Fim de 2024')
+    - origem_socios: observado, interpolado ou mantido (borda de período)
+
+20. FATO_Socios_Jogos.csv
+    - Sócios ativos na data de cada jogo de FATO_Jogos
+    - publico_por_socio: público do jogo / sócios ativos
+    - Jogos fora dos períodos informados ficam sem valor
+
+21. FATO_Vendas_Canal.csv
+    - Vendas anuais por canal (Site, Aplicativo, Bilheteria), 2021-2025
+    - quantidade_min/max/media e participacao_percent já numéricos
+      (ano_parcial = True para o ano em andamento, '2025*')
+    - Com o Star Schema: participação simulada nas vendas por jogo e
+      diferença em pontos percentuais (dentro_tolerancia: até 5 p.p.)
+
+22. FATO_Vendas_Competicao.csv
+    - Jogos por ano, público médio, vendas e participação por competição
+    - Cada faixa vira <medida>_min, <medida>_max e <medida>_medio
+    - vendas_calculadas_medio = jogos × público médio (conferência)
+
 {'='*70}
 RELACIONAMENTOS NO POWER BI:
 {'='*70}
 
 ** Relacionamentos Originais **
-FATO_Jogos[jogo_id] --> DIM_Produtos[jogo_id]
+FATO_Jogos[jogo_sk] --> DIM_Produtos[jogo_sk]
 FATO_Jogos[jogo_id] --> DIM_Demografica[Jogo_ID]
 FATO_Jogos[data] --> FATO_Temporal[data]
 
@@ -958,6 +3641,16 @@ FATO_Receitas_Detalhadas[ano] --> ANALISE_Precificacao[ano]
 FATO_Receitas_Detalhadas[ano] --> ANALISE_Mix_Receitas[ano]
 FATO_Receitas_Detalhadas[ano] --> ANALISE_Ocupacao[ano]
 FATO_Receitas_Detalhadas[ano] --> SERIE_Temporal_Completa[ano]
+FATO_Receitas_Detalhadas[ano] --> ANALISE_Otimizacao_Precos[ano]
+
+FATO_Jogos[jogo_id] --> FATO_Setores[jogo_id]
+FATO_Jogos[jogo_id] --> FATO_Consumo_Faixas[jogo_id]
+FATO_Jogos[ano] --> AGG_KPIs[chave] (filtrar grao = "ano")
+FATO_Jogos[jogo_id] --> PROJ_Publico[jogo_id]
+FATO_Jogos[jogo_sk] --> QUALIDADE_Violacoes[jogo_sk]
+FATO_Jogos[jogo_sk] --> FATO_Socios_Jogos[jogo_sk]
+FATO_Socios_Diario[data] --> FATO_Jogos[data]
+FATO_Jogos[ano] --> FATO_Vendas_Canal[ano]
 
 ** Relacionamento Cruzado **
 FATO_Jogos[ano] --> FATO_Receitas_Detalhadas[ano] (para análises combinadas)
@@ -1091,68 +3784,818 @@ DICAS DE USO:
         with open(caminho_doc, 'w', encoding='utf-8') as f:
             f.write(doc)
         
-        print(f"✓ Documentação criada: README_POWERBI_V2.txt")
+        log.info(f"✓ Documentação criada: README_POWERBI_V2.txt")
     
-    def executar_pipeline_completo(self):
+    def executar_pipeline_completo(self, pasta_saida='exports_powerbi'):
         """Executa todo o pipeline de processamento e exportação"""
         
-        print("\n" + "="*60)
-        print("INICIANDO PROCESSAMENTO DE DADOS - CRUZEIRO EC v2.0")
-        print("="*60 + "\n")
+        log.info("\n" + "="*60)
+        log.info("INICIANDO PROCESSAMENTO DE DADOS - CRUZEIRO EC v2.0")
+        log.info("="*60 + "\n")
         
         self.carregar_dados()
+        
+        # Regras de qualidade rodam numa thread, em paralelo com as transformações
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            validacao = executor.submit(self.validar_qualidade)
+            self._executar_transformacoes()
+            validacao.result()
+        
+        log.info("\n" + "="*60)
+        log.info("EXPORTANDO PARA POWER BI")
+        log.info("="*60 + "\n")
+        
+        self.exportar_para_powerbi(pasta_saida)
+        
+        # Mostrar insights de correlação
+        if self.correlations.get('insights'):
+            log.info("\n" + "="*60)
+            log.info("INSIGHTS DE CORRELAÇÃO")
+            log.info("="*60)
+            for insight in self.correlations['insights']:
+                log.info(f"  • {insight}")
+            log.info("")
+        
+        # ========== NOVO: Mostrar resumo das novas análises ==========
+        if not self.dfs['receitas_detalhadas'].empty:
+            log.info("\n" + "="*60)
+            log.info("RESUMO DAS NOVAS ANÁLISES")
+            log.info("="*60)
+            
+            df = self.dfs['receitas_detalhadas']
+            df_validos = df[df['publico_presente'] > 0]
+            
+            log.info(f"  • Total de jogos analisados: {len(df_validos)}")
+            log.info(f"  • Período: {df_validos['ano'].min()} a {df_validos['ano'].max()}")
+            log.info(f"  • Público total acumulado: {df_validos['publico_presente'].sum():,.0f}")
+            log.info(f"  • Receita total acumulada: R$ {df_validos['total_arrecadado'].sum():,.2f}")
+            log.info(f"  • Taxa de ocupação média: {df_validos['taxa_ocupacao_percent'].mean():.1f}%")
+            log.info(f"  • Gap de otimização total: R$ {df_validos['gap_otimizacao'].sum():,.2f}")
+            log.info(f"  • Competições analisadas: {df_validos['competicao'].nunique()}")
+            log.info("")
+        # =============================================================
+    
+    def _executar_transformacoes(self):
+        """Etapas criar_* do pipeline completo, na ordem habitual"""
         self.criar_fato_consolidado()
         self.criar_dimensao_produtos()
         self.criar_dimensao_demografica()
         self.criar_analise_temporal()
+        self.criar_fato_setores()
         
         # ========== NOVO: Análises de receitas detalhadas ==========
         if not self.dfs['receitas_detalhadas'].empty:
-            self.criar_analise_precificacao()
-            self.criar_mix_receitas()
-            self.criar_analise_ocupacao()
-            self.criar_serie_temporal_completa()
+            for etapa in self.ETAPAS_RECEITAS_DETALHADAS:
+                getattr(self, etapa)()
         # ===========================================================
         
         self.calcular_correlacoes()
+        self.criar_agregados_kpis()
         self.criar_kpis_dashboard()
+        self.criar_projecao_publico()
+        self.criar_serie_socios()
+        self.criar_socios_jogos()
+        self.criar_vendas_canal()
+        self.criar_vendas_competicao()
+    
+    @classmethod
+    def tabelas_disponiveis(cls):
+        """Mapeamento de todas as tabelas exportáveis para o dataset correspondente"""
+        return {**cls.TABELAS_POWERBI, 'CORR_Matriz': 'matriz_correlacao'}
+    
+    @classmethod
+    def resolver_dependencias(cls, tabelas):
+        """
+        Calcula o conjunto mínimo de fontes e etapas para gerar as tabelas pedidas
         
-        print("\n" + "="*60)
-        print("EXPORTANDO PARA POWER BI")
-        print("="*60 + "\n")
+        Args:
+            tabelas: Nomes de tabelas do Power BI (ex.: 'FATO_Jogos')
         
-        self.exportar_para_powerbi()
+        Returns:
+            (fontes, etapas): fontes CSV necessárias e métodos criar_* na ordem de execução
+        """
+        disponiveis = cls.tabelas_disponiveis()
+        desconhecidas = [t for t in tabelas if t not in disponiveis]
+        if desconhecidas:
+            raise ValueError(f"Tabelas desconhecidas: {desconhecidas}. Disponíveis: {list(disponiveis)}")
+        
+        fontes = []
+        etapas = []
+        visitados = set()
+        
+        def visitar(dataset):
+            if dataset in visitados:
+                return
+            visitados.add(dataset)
+            if dataset not in cls.ETAPAS:
+                fontes.append(dataset)
+                return
+            metodo, dependencias = cls.ETAPAS[dataset]
+            for dependencia in dependencias:
+                visitar(dependencia)
+            if metodo not in etapas:
+                etapas.append(metodo)
+        
+        for tabela in tabelas:
+            visitar(disponiveis[tabela])
+        
+        return fontes, etapas
+    
+    def executar_pipeline_seletivo(self, tabelas, pasta_saida='exports_powerbi'):
+        """
+        Gera e exporta apenas as tabelas pedidas
         
-        # Mostrar insights de correlação
-        if self.correlations.get('insights'):
-            print("\n" + "="*60)
-            print("INSIGHTS DE CORRELAÇÃO")
-            print("="*60)
-            for insight in self.correlations['insights']:
-                print(f"  • {insight}")
-            print()
+        Só as fontes e etapas criar_* de que essas tabelas dependem são
+        executadas; as demais não são lidas nem calculadas.
+        """
+        fontes, etapas = self.resolver_dependencias(tabelas)
         
-        # ========== NOVO: Mostrar resumo das novas análises ==========
-        if not self.dfs['receitas_detalhadas'].empty:
-            print("\n" + "="*60)
-            print("RESUMO DAS NOVAS ANÁLISES")
-            print("="*60)
+        log.info("\n" + "="*60)
+        log.info(f"PROCESSAMENTO SELETIVO: {', '.join(tabelas)}")
+        log.info("="*60)
+        log.info(f"  Fontes: {', '.join(fontes) or '-'}")
+        log.info(f"  Etapas: {', '.join(etapas) or '-'}\n")
+        
+        self.garantir_tabelas(tabelas)
+        self.exportar_para_powerbi(pasta_saida, tabelas=tabelas)
+    
+    def _impressao_dataset(self, dataset):
+        """
+        Impressão de um dataset de entrada para a chave do cache
+        
+        Fontes: hash do conteúdo do CSV (memorizado por caminho, mtime e
+        tamanho). Datasets derivados: a chave da etapa que os produz, sem
+        executá-la, exceto se foram alterados em memória (atualizar_agregados),
+        quando vale o hash do conteúdo.
+        """
+        if dataset in self._modificados_em_memoria and dataset in self.dfs:
+            return impressao_dataframe(self.dfs[dataset])
+        if dataset in self.ETAPAS:
+            return self._chave_etapa(self.ETAPAS[dataset][0], (), {})
+        
+        caminho = self.arquivos.get(dataset)
+        if caminho is None or not os.path.exists(caminho):
+            return 'ausente'
+        stat = os.stat(caminho)
+        assinatura = (caminho, stat.st_mtime_ns, stat.st_size)
+        if self._impressoes_arquivos.get(caminho, (None,))[0] != assinatura:
+            self._impressoes_arquivos[caminho] = (assinatura, impressao_arquivo(caminho))
+        return self._impressoes_arquivos[caminho][1]
+    
+    def _chave_etapa(self, metodo, args, kwargs):
+        """Chave do cache: etapa, código, argumentos e impressões dos datasets de entrada"""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{metodo}|{versao_codigo()}|{self.clube}|{self.capacidade_estadio}".encode('utf-8'))
+        for nome, valor in list(enumerate(args)) + sorted(kwargs.items()):
+            h.update(f"|{nome}=".encode('utf-8'))
+            if isinstance(valor, (pd.DataFrame, pd.Series)):
+                h.update(impressao_dataframe(valor.to_frame() if isinstance(valor, pd.Series) else valor).encode('utf-8'))
+            elif isinstance(valor, np.ndarray):
+                h.update(f"{valor.dtype}{valor.shape}".encode('utf-8') + np.ascontiguousarray(valor).tobytes())
+            else:
+                h.update(repr(valor).encode('utf-8'))
+        entradas = sorted({dep for m, deps in self.ETAPAS.values() if m == metodo for dep in deps})
+        for dataset in entradas:
+            h.update(f"{dataset}={self._impressao_dataset(dataset)}".encode('utf-8'))
+        return h.hexdigest()
+    
+    def garantir_tabelas(self, tabelas):
+        """
+        Garante que as tabelas pedidas estejam calculadas em memória
+        
+        Executa apenas as etapas de que as tabelas dependem e que ainda não
+        rodaram desde a última invalidação.
+        """
+        _, etapas = self.resolver_dependencias(tabelas)
+        
+        if not self.dfs:
+            self.carregar_dados()
+        
+        for etapa in etapas:
+            if etapa not in self._etapas_executadas:
+                getattr(self, etapa)()
+                self._etapas_executadas.add(etapa)
+    
+    def executar_pipeline_assincrono(self, pasta_saida='exports_powerbi', tabelas=None,
+                                     max_leituras=4, tamanho_fila=4):
+        """
+        Executa o pipeline com leitura, transformação e exportação sobrepostas
+        
+        Todas as fontes necessárias começam a ser lidas de imediato (no máximo
+        max_leituras ao mesmo tempo); cada etapa criar_* roda assim que as suas
+        dependências ficam prontas e cada tabela entra numa fila limitada de
+        exportação assim que a etapa que a produz termina. Leituras, etapas e
+        gravações rodam em threads, então disco e CPU trabalham em paralelo.
+        
+        Args:
+            pasta_saida: Pasta de destino dos CSVs
+            tabelas: Tabelas a gerar (padrão: todas)
+            max_leituras: Leituras de CSV simultâneas
+            tamanho_fila: Capacidade da fila entre etapas e exportação
+        """
+        tabelas = list(tabelas) if tabelas else list(self.tabelas_disponiveis())
+        self.resolver_dependencias(tabelas)
+        
+        log.info("\n" + "="*60)
+        log.info("INICIANDO PROCESSAMENTO ASSÍNCRONO - CRUZEIRO EC v2.0")
+        log.info("="*60 + "\n")
+        
+        if not self.dfs:
+            self.carregar_dados()
+        os.makedirs(pasta_saida, exist_ok=True)
+        
+        import asyncio
+        arquivos_criados = asyncio.run(
+            self._pipeline_assincrono(tabelas, pasta_saida, max_leituras, tamanho_fila)
+        )
+        
+        self._criar_documentacao(pasta_saida, arquivos_criados)
+        
+        log.info(f"\n{'='*60}")
+        log.info(f"EXPORTAÇÃO CONCLUÍDA!")
+        log.info(f"{'='*60}")
+        log.info(f"Total de arquivos: {len(arquivos_criados)}")
+        log.info(f"Localização: ./{pasta_saida}/")
+    
+    async def _pipeline_assincrono(self, tabelas, pasta_saida, max_leituras, tamanho_fila):
+        """Orquestra leituras, etapas e exportações como tarefas asyncio"""
+        import asyncio
+        disponiveis = self.tabelas_disponiveis()
+        fontes, _ = self.resolver_dependencias(tabelas)
+        leituras = asyncio.Semaphore(max_leituras)
+        fila = asyncio.Queue(maxsize=tamanho_fila)
+        tarefas = {}
+        
+        async def ler(fonte):
+            if fonte in self.dfs:
+                async with leituras:
+                    await asyncio.to_thread(self.dfs.__getitem__, fonte)
+        
+        async def executar(metodo):
+            dependencias = {dependencia for metodo_etapa, deps in self.ETAPAS.values()
+                            if metodo_etapa == metodo for dependencia in deps}
+            await asyncio.gather(*(no(dependencia) for dependencia in dependencias))
+            # Como no pipeline completo: sem receitas detalhadas essas etapas não rodam
+            if metodo in self.ETAPAS_RECEITAS_DETALHADAS and self.dfs['receitas_detalhadas'].empty:
+                return
+            if metodo not in self._etapas_executadas:
+                await asyncio.to_thread(getattr(self, metodo))
+                self._etapas_executadas.add(metodo)
+        
+        def no(dataset):
+            # Uma única tarefa por fonte e por método, compartilhada entre dependentes
+            chave = ('etapa', self.ETAPAS[dataset][0]) if dataset in self.ETAPAS else ('fonte', dataset)
+            if chave not in tarefas:
+                coro = executar(chave[1]) if chave[0] == 'etapa' else ler(chave[1])
+                tarefas[chave] = asyncio.ensure_future(coro)
+            return tarefas[chave]
+        
+        async def produzir(tabela):
+            await no(disponiveis[tabela])
+            await fila.put(tabela)
+        
+        async def exportar():
+            criados = []
+            while True:
+                tabela = await fila.get()
+                if tabela is None:
+                    return criados
+                if await asyncio.to_thread(self._exportar_tabela, tabela, pasta_saida):
+                    criados.append(tabela)
+        
+        # Leitura antecipada de todas as fontes, antes de qualquer etapa pedir por elas
+        for fonte in fontes:
+            no(fonte)
+        
+        exportador = asyncio.ensure_future(exportar())
+        try:
+            await asyncio.gather(*(produzir(tabela) for tabela in tabelas))
+        finally:
+            await fila.put(None)
+        criados = await exportador
+        
+        # Mantém a ordem habitual dos arquivos na documentação
+        return [tabela for tabela in disponiveis if tabela in criados]
+    
+    def obter_tabela(self, tabela):
+        """Devolve o DataFrame de uma tabela do Power BI, calculando-o se necessário"""
+        self.garantir_tabelas([tabela])
+        dataset = self.tabelas_disponiveis()[tabela]
+        if dataset == 'matriz_correlacao':
+            return self.correlations.get('matriz_correlacao', pd.DataFrame())
+        if dataset not in self.dfs:
+            return pd.DataFrame()
+        return self.dfs[dataset]
+    
+    @classmethod
+    def _fontes_de(cls, dataset):
+        """Conjunto de fontes CSV das quais um dataset depende (transitivamente)"""
+        if dataset not in cls.ETAPAS:
+            return {dataset}
+        fontes = set()
+        for dependencia in cls.ETAPAS[dataset][1]:
+            fontes |= cls._fontes_de(dependencia)
+        return fontes
+    
+    def invalidar_fontes(self, fontes):
+        """
+        Descarta fontes alteradas e todos os datasets derivados delas
+        
+        As fontes voltam a ser lidas no próximo acesso e as etapas afetadas
+        são recalculadas na próxima chamada a garantir_tabelas.
+        
+        Returns:
+            Lista dos datasets derivados descartados
+        """
+        fontes = set(fontes)
+        carregadores = self._carregadores()
+        for fonte in fontes:
+            if fonte in carregadores:
+                self.dfs.registrar(fonte, carregadores[fonte])
+        
+        descartados = []
+        for dataset, (metodo, _) in self.ETAPAS.items():
+            if self._fontes_de(dataset) & fontes:
+                self._etapas_executadas.discard(metodo)
+                if dataset == 'matriz_correlacao':
+                    self.correlations.clear()
+                elif dataset in self.dfs:
+                    del self.dfs[dataset]
+                descartados.append(dataset)
+        return descartados
+    
+    def remapear_arquivos(self):
+        """Refaz o mapeamento de arquivos e descarta tudo que estava em memória"""
+        self._verificar_arquivos()
+        self.dfs = DatasetsSobDemanda()
+        self.correlations = {}
+        self._etapas_executadas = set()
+        self.carregar_dados()
+
+
+class ServicoExportador:
+    """
+    Modo serviço: mantém o exportador residente e serve as tabelas por HTTP
+    
+    Os datasets ficam em memória entre as requisições. Uma thread observa a
+    pasta de dados (por data de modificação) e, quando um CSV muda, descarta
+    só a fonte alterada e as tabelas derivadas dela; elas são recalculadas
+    na próxima requisição.
+    
+    Endpoints:
+        GET /tabelas                     -> lista de tabelas (JSON)
+        GET /tabelas/<NOME>              -> tabela em CSV
+        GET /tabelas/<NOME>?formato=json -> tabela em JSON (registros)
+        GET /tabelas/<NOME>?formato=arrow -> stream Arrow IPC (requer pyarrow)
+    """
+    
+    def __init__(self, exporter, host='127.0.0.1', porta=8765, intervalo=1.0):
+        self.exporter = exporter
+        self.host = host
+        self.porta = porta
+        self.intervalo = intervalo
+        self._lock = threading.RLock()
+        self._parar = threading.Event()
+        self._assinatura = self._assinatura_arquivos()
+        self._servidor = None
+    
+    def _assinatura_arquivos(self):
+        """(mtime, tamanho) de cada CSV da pasta de dados"""
+        assinatura = {}
+        for arquivo in glob.glob(os.path.join(self.exporter.pasta_dados, "*.csv")):
+            try:
+                stat = os.stat(arquivo)
+            except OSError:
+                continue
+            assinatura[os.path.normpath(arquivo)] = (stat.st_mtime_ns, stat.st_size)
+        return assinatura
+    
+    def verificar_alteracoes(self):
+        """
+        Compara a pasta de dados com a última verificação e invalida o que mudou
+        
+        Returns:
+            Lista das fontes alteradas (vazia se nada mudou)
+        """
+        atual = self._assinatura_arquivos()
+        if atual == self._assinatura:
+            return []
+        
+        anterior, self._assinatura = self._assinatura, atual
+        
+        with self._lock:
+            if set(atual) != set(anterior):
+                # Arquivos criados ou removidos podem mudar o mapeamento inteiro
+                self.exporter.remapear_arquivos()
+                log.info("↻ Arquivos adicionados/removidos: mapeamento refeito")
+                return list(self.exporter.arquivos)
             
-            df = self.dfs['receitas_detalhadas']
-            df_validos = df[df['publico_presente'] > 0]
+            fonte_por_arquivo = {os.path.normpath(caminho): fonte
+                                 for fonte, caminho in self.exporter.arquivos.items()}
+            fontes = [fonte_por_arquivo[arquivo] for arquivo in atual
+                      if atual[arquivo] != anterior[arquivo] and arquivo in fonte_por_arquivo]
+            descartados = self.exporter.invalidar_fontes(fontes)
+        
+        if fontes:
+            log.info(f"↻ Fontes alteradas: {', '.join(fontes)} -> recalcular: {', '.join(descartados) or '-'}")
+        return fontes
+    
+    def _observar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar_alteracoes()
+            except Exception as e:
+                log.warning(f"⚠ Erro ao verificar alterações: {e}")
+    
+    def obter_tabela(self, tabela):
+        """Devolve a tabela pedida, recalculando apenas o que foi invalidado"""
+        with self._lock:
+            return self.exporter.obter_tabela(tabela)
+    
+    def _criar_handler(self):
+        from http.server import BaseHTTPRequestHandler
+        from urllib.parse import urlparse, parse_qs
+        servico = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                partes = [p for p in url.path.split('/') if p]
+                
+                if partes == ['tabelas']:
+                    corpo = json.dumps(list(servico.exporter.tabelas_disponiveis())).encode('utf-8')
+                    return self._responder(200, 'application/json', corpo)
+                
+                if len(partes) != 2 or partes[0] != 'tabelas':
+                    return self._responder(404, 'text/plain', b'Rota desconhecida')
+                
+                tabela = partes[1]
+                if tabela not in servico.exporter.tabelas_disponiveis():
+                    return self._responder(404, 'text/plain', f'Tabela desconhecida: {tabela}'.encode('utf-8'))
+                
+                parametros = parse_qs(url.query)
+                formato = parametros.get('formato', ['csv'])[0]
+                df = servico.obter_tabela(tabela)
+                com_indice = tabela == 'CORR_Matriz'
+                
+                # ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD filtra tabelas com coluna data
+                inicio = parametros.get('inicio', [None])[0]
+                fim = parametros.get('fim', [None])[0]
+                if (inicio or fim) and 'data' in df.columns:
+                    try:
+                        df = SerieTemporal(df).intervalo(inicio, fim).reset_index(drop=True)
+                    except ValueError as e:
+                        return self._responder(400, 'text/plain', f'Data inválida: {e}'.encode('utf-8'))
+                
+                if formato == 'csv':
+                    corpo = df.to_csv(index=com_indice).encode('utf-8')
+                    return self._responder(200, 'text/csv; charset=utf-8', corpo)
+                if formato == 'json':
+                    corpo = df.to_json(orient='records', date_format='iso', force_ascii=False).encode('utf-8')
+                    return self._responder(200, 'application/json', corpo)
+                if formato == 'arrow':
+                    try:
+                        import pyarrow as pa
+                    except ImportError:
+                        return self._responder(501, 'text/plain', b'pyarrow nao instalado')
+                    tabela_arrow = pa.Table.from_pandas(df, preserve_index=com_indice)
+                    sink = pa.BufferOutputStream()
+                    with pa.ipc.new_stream(sink, tabela_arrow.schema) as writer:
+                        writer.write_table(tabela_arrow)
+                    return self._responder(200, 'application/vnd.apache.arrow.stream', sink.getvalue().to_pybytes())
+                return self._responder(400, 'text/plain', f'Formato desconhecido: {formato}'.encode('utf-8'))
             
-            print(f"  • Total de jogos analisados: {len(df_validos)}")
-            print(f"  • Período: {df_validos['ano'].min()} a {df_validos['ano'].max()}")
-            print(f"  • Público total acumulado: {df_validos['publico_presente'].sum():,.0f}")
-            print(f"  • Receita total acumulada: R$ {df_validos['total_arrecadado'].sum():,.2f}")
-            print(f"  • Taxa de ocupação média: {df_validos['taxa_ocupacao_percent'].mean():.1f}%")
-            print(f"  • Gap de otimização total: R$ {df_validos['gap_otimizacao'].sum():,.2f}")
-            print(f"  • Competições analisadas: {df_validos['competicao'].nunique()}")
-            print()
-        # =============================================================
+            def _responder(self, status, tipo, corpo):
+                self.send_response(status)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+            
+            def log_message(self, *args):
+                pass
+        
+        return Handler
+    
+    def iniciar(self):
+        """Sobe o servidor HTTP e a observação da pasta em threads de fundo"""
+        from http.server import ThreadingHTTPServer
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), self._criar_handler())
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        threading.Thread(target=self._observar, daemon=True).start()
+        log.info(f"✓ Serviço disponível em http://{self.host}:{self.porta}/tabelas")
+        log.info(f"✓ Observando {os.path.abspath(self.exporter.pasta_dados)} a cada {self.intervalo}s")
+    
+    def parar(self):
+        """Encerra o servidor e a observação da pasta"""
+        self._parar.set()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+    
+    def servir_para_sempre(self):
+        """Inicia o serviço e bloqueia até Ctrl+C"""
+        self.iniciar()
+        try:
+            while not self._parar.wait(3600):
+                pass
+        except KeyboardInterrupt:
+            log.info("\nEncerrando serviço...")
+        finally:
+            self.parar()
+
+
+# ==============================================================================
+# Processamento particionado (vários clubes / estádios)
+# ==============================================================================
+
+ARQUIVO_PARTICAO = 'particao.json'
+
+
+def _slug(nome):
+    """'Atlético-MG' -> 'atletico-mg' (compara nomes de pasta com nomes de clube)"""
+    sem_acento = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', sem_acento.lower()).strip('-')
+
+
+def descobrir_particoes(pasta):
+    """
+    Partições de uma árvore de entrada: cada subpasta com CSVs é um clube/estádio
+
+    Um particao.json opcional na subpasta define clube e capacidade; sem ele,
+    o clube é o de CruzeiroPowerBIExporter.CLUBES com o mesmo nome da pasta
+    (sem acentos/maiúsculas) ou o próprio nome da pasta. CSVs soltos na raiz são compartilhados por
+    todas as partições (ex.: dim_setor, precos_produtos).
+
+    Returns:
+        Lista de dicts {particao, pasta, clube, capacidade}
+    """
+    particoes = []
+    for nome in sorted(os.listdir(pasta)):
+        subpasta = os.path.join(pasta, nome)
+        if nome.startswith(('_', '.')) or not os.path.isdir(subpasta) or not glob.glob(os.path.join(subpasta, '*.csv')):
+            continue
+        config = {}
+        caminho_config = os.path.join(subpasta, ARQUIVO_PARTICAO)
+        if os.path.exists(caminho_config):
+            with open(caminho_config, encoding='utf-8') as f:
+                config = json.load(f)
+        particoes.append({
+            'particao': nome,
+            'pasta': subpasta,
+            'clube': config.get('clube') or next(
+                (clube for clube in CruzeiroPowerBIExporter.CLUBES if _slug(clube) == _slug(nome)), nome),
+            'capacidade': config.get('capacidade'),
+        })
+    return particoes
+
+
+def _processar_particao(particao, pasta_compartilhada, pasta_saida, tabelas, cache, limite_cache_mb, opcoes_exportacao,
+                        arquivo_metricas=None, formato_metricas=None, pasta_cache=None):
+    """Executa o pipeline de uma partição; a saída de texto vai para processamento.log"""
+    destino = os.path.join(pasta_saida, f"particao={particao['particao']}")
+    os.makedirs(destino, exist_ok=True)
+    inicio = time.perf_counter()
+    
+    with open(os.path.join(destino, 'processamento.log'), 'w', encoding='utf-8') as arquivo_log, \
+            contextlib.redirect_stdout(arquivo_log):
+        # O manipulador do logger aponta para o stdout original: na partição ele vai para o log
+        manipuladores, log.handlers = log.handlers, [logging.StreamHandler(arquivo_log)]
+        try:
+            exporter = CruzeiroPowerBIExporter(caminho_dados=particao['pasta'], cache=cache,
+                                               limite_cache_mb=limite_cache_mb, clube=particao['clube'],
+                                               capacidade=particao['capacidade'],
+                                               pasta_compartilhada=pasta_compartilhada,
+                                               pasta_cache=pasta_cache and os.path.join(pasta_cache, particao['particao']))
+            exporter.colunas_particao = {'particao': particao['particao'], 'clube': exporter.clube}
+            exporter.opcoes_exportacao.update(opcoes_exportacao)
+            if arquivo_metricas:
+                exporter.metricas = EmissorMetricas(os.path.join(destino, arquivo_metricas), formato_metricas,
+                                                    rotulos={'particao': particao['particao']})
+            if tabelas:
+                exporter.executar_pipeline_seletivo(tabelas, pasta_saida=destino)
+            else:
+                exporter.executar_pipeline_completo(pasta_saida=destino)
+            exporter.encerrar_metricas(time.perf_counter() - inicio, modo='seletivo' if tabelas else 'completo')
+            erro = None
+        except Exception as e:
+            log.warning(f"⚠ Erro: {e!r}")
+            erro = repr(e)
+        finally:
+            log.handlers = manipuladores
+    
+    arquivos = [f for f in os.listdir(destino) if '.csv' in f]
+    return {**particao, 'destino': destino, 'arquivos': len(arquivos),
+            'segundos': round(time.perf_counter() - inicio, 2), 'erro': erro}
+
+
+def processar_particoes(pasta, pasta_saida='exports_powerbi', tabelas=None, processos=None,
+                        cache=True, limite_cache_mb=256, opcoes_exportacao=None,
+                        arquivo_metricas=None, formato_metricas=None, pasta_cache=None):
+    """
+    Processa cada partição (clube/estádio) de uma árvore de entrada num processo próprio
+    
+    As exportações vão para pasta_saida/particao=<nome>/, com as colunas
+    particao e clube acrescentadas a cada tabela para combinar as pastas no
+    Power BI. Cada partição tem o seu cache de etapas e o seu log.
+    
+    Args:
+        pasta: Raiz com uma subpasta por partição e CSVs compartilhados
+        pasta_saida: Raiz das exportações particionadas
+        tabelas: Tabelas a gerar (padrão: pipeline completo)
+        processos: Processos simultâneos (padrão: um por núcleo; 1 = sem pool)
+        cache, limite_cache_mb: Repassados a cada CruzeiroPowerBIExporter
+        pasta_cache: Raiz dos caches de etapas, com uma subpasta por partição
+            (padrão: a pasta padrão de cada partição, ver pasta_cache_etapas)
+        opcoes_exportacao: Opções de gravar_csv_em_blocos (compressão etc.)
+        arquivo_metricas, formato_metricas: Nome do arquivo de métricas gravado
+            em cada pasta de partição (rótulo particao) e o seu formato
+    
+    Returns:
+        Lista com o resumo de cada partição (arquivos, segundos, erro)
+    """
+    particoes = descobrir_particoes(pasta)
+    if not particoes:
+        raise FileNotFoundError(f"Nenhuma partição (subpasta com CSVs) em {pasta}")
+    
+    processos = min(processos or os.cpu_count() or 1, len(particoes))
+    os.makedirs(pasta_saida, exist_ok=True)
+    argumentos = [(particao, pasta, pasta_saida, tabelas, cache, limite_cache_mb, opcoes_exportacao or {},
+                   arquivo_metricas, formato_metricas, pasta_cache)
+                  for particao in particoes]
+    
+    log.info(f"\nProcessando {len(particoes)} partição(ões) em {processos} processo(s)...")
+    if processos == 1:
+        resumos = [_processar_particao(*args) for args in argumentos]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resumos = list(pool.map(_processar_particao, *zip(*argumentos)))
+    
+    for resumo in resumos:
+        if resumo['erro']:
+            log.warning(f"  ⚠ {resumo['particao']} ({resumo['clube']}): {resumo['erro']} - ver {resumo['destino']}/processamento.log")
+        else:
+            log.info(f"  ✓ {resumo['particao']} ({resumo['clube']}): {resumo['arquivos']} arquivo(s) "
+                  f"em {resumo['segundos']:.1f}s -> {resumo['destino']}")
+    return resumos
+
+
+def configurar_log(nivel=logging.INFO):
+    """Envia as mensagens do logger do exportador para a saída padrão, sem prefixos"""
+    if not log.handlers:
+        manipulador = logging.StreamHandler(sys.stdout)
+        manipulador.setFormatter(logging.Formatter('%(message)s'))
+        log.addHandler(manipulador)
+        log.propagate = False
+    log.setLevel(nivel)
+
+
+def main(argv=None):
+    """Interface de linha de comando do exportador"""
+    parser = argparse.ArgumentParser(
+        description='Exporta os dados do Cruzeiro no Mineirão para o Power BI.'
+    )
+    parser.add_argument('tabelas', nargs='*',
+                        help='Tabelas a gerar (ex.: FATO_Jogos ANALISE_Ocupacao). Padrão: pipeline completo')
+    parser.add_argument('--dados', default='data/data.csv',
+                        help="Pasta com os CSVs de entrada (padrão: 'data/data.csv')")
+    parser.add_argument('--saida', default='exports_powerbi',
+                        help="Pasta de saída dos exports (padrão: 'exports_powerbi')")
+    parser.add_argument('--listar', action='store_true',
+                        help='Lista as tabelas disponíveis com as fontes e etapas de cada uma')
+    parser.add_argument('--fontes', action='store_true',
+                        help='Mostra o arquivo mapeado para cada fonte, sem ler os dados')
+    parser.add_argument('--estado-cache', action='store_true',
+                        help='Mostra entradas e tamanho do cache de etapas, sem ler os dados')
+    parser.add_argument('-v', '--verboso', action='store_true',
+                        help='Mostra também a listagem da pasta e o mapeamento arquivo a arquivo')
+    parser.add_argument('-q', '--silencioso', action='store_true',
+                        help='Mostra só avisos e erros do mapeamento e da carga')
+    parser.add_argument('--assincrono', action='store_true',
+                        help='Sobrepõe leitura, transformação e exportação (útil em pastas de rede)')
+    parser.add_argument('--compilar-fatos', nargs='*', metavar='CSV',
+                        help='Grava o armazenamento binário (memmap) das fontes de fatos '
+                             'ou dos CSVs informados e sai')
+    parser.add_argument('--servir', action='store_true',
+                        help='Modo serviço: mantém as tabelas em memória e as serve por HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço do modo serviço (padrão: 127.0.0.1)')
+    parser.add_argument('--porta', type=int, default=8765, help='Porta do modo serviço (padrão: 8765)')
+    parser.add_argument('--intervalo', type=float, default=1.0,
+                        help='Intervalo em segundos entre verificações da pasta de dados (padrão: 1.0)')
+    parser.add_argument('--sem-cache', action='store_true',
+                        help='Executa todas as etapas sem consultar nem gravar o cache de etapas')
+    parser.add_argument('--limpar-cache', action='store_true',
+                        help='Esvazia o cache de etapas antes de executar')
+    parser.add_argument('--limite-cache-mb', type=float, default=256,
+                        help='Tamanho máximo do cache de etapas em MB (padrão: 256)')
+    parser.add_argument('--pasta-cache', metavar='PASTA',
+                        help='Pasta do cache de etapas (padrão: uma subpasta por pasta de dados em '
+                             '$XDG_CACHE_HOME ou ~/.cache/cruzeiro_powerbi/etapas)')
+    parser.add_argument('--particoes', action='store_true',
+                        help='--dados é uma árvore com uma subpasta por clube/estádio: cada uma é '
+                             'processada num processo e exportada em <saida>/particao=<nome>/')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='Processos simultâneos no modo --particoes (padrão: um por núcleo)')
+    parser.add_argument('--clube', default='Cruzeiro',
+                        help="Clube mandante analisado (padrão: 'Cruzeiro')")
+    parser.add_argument('--compressao', choices=['gzip', 'zstd'],
+                        help='Comprime os CSVs exportados (.csv.gz ou .csv.zst)')
+    parser.add_argument('--float-format', metavar='FORMATO',
+                        help="Formato dos números decimais nos CSVs (ex.: '%%.2f')")
+    parser.add_argument('--linhas-por-bloco', type=int, default=OPCOES_EXPORTACAO_PADRAO['linhas_por_bloco'],
+                        help='Linhas formatadas e gravadas por vez na exportação (padrão: 100000)')
+    parser.add_argument('--metricas', metavar='ARQUIVO',
+                        help='Grava métricas de carga, etapas, exportação e cache (JSON lines; '
+                             'texto Prometheus se terminar em .prom). Com --particoes, um arquivo '
+                             'com este nome em cada pasta de partição')
+    parser.add_argument('--formato-metricas', choices=EmissorMetricas.FORMATOS,
+                        help='Força o formato do arquivo de --metricas')
+    args = parser.parse_args(argv)
+    configurar_log(logging.DEBUG if args.verboso else logging.WARNING if args.silencioso else logging.INFO)
+    
+    if args.compressao == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            parser.error("--compressao zstd requer o pacote 'zstandard' (pip install zstandard)")
+    
+    if args.listar:
+        for tabela in CruzeiroPowerBIExporter.tabelas_disponiveis():
+            fontes, etapas = CruzeiroPowerBIExporter.resolver_dependencias([tabela])
+            print(f"{tabela}")
+            print(f"    fontes: {', '.join(fontes)}")
+            print(f"    etapas: {', '.join(etapas) or '-'}")
+        return 0
+    
+    if args.fontes or args.estado_cache:
+        # Comandos leves: só listam a pasta, sem importar pandas nem ler CSVs
+        exporter = CruzeiroPowerBIExporter(caminho_dados=args.dados, limite_cache_mb=args.limite_cache_mb,
+                                           clube=args.clube, pasta_cache=args.pasta_cache)
+        if args.fontes:
+            for fonte, caminho in sorted(exporter.arquivos.items()):
+                print(f"{fonte:<26} {caminho} ({os.path.getsize(caminho) / 1024:.1f} KB)")
+        if args.estado_cache:
+            print(exporter.cache_etapas.resumo())
+        return 0
+    
+    if args.compilar_fatos:
+        # CSVs informados explicitamente não precisam da pasta de dados
+        for caminho in args.compilar_fatos:
+            destino = caminho_fato_binario(caminho)
+            gravar_fato_binario(ler_csv_fato(caminho), destino, origem=caminho)
+            log.info(f"✓ Compilado: {caminho} -> {destino}")
+        return 0
+    
+    try:
+        CruzeiroPowerBIExporter.resolver_dependencias(args.tabelas)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    opcoes_exportacao = dict(compressao=args.compressao, float_format=args.float_format,
+                             linhas_por_bloco=args.linhas_por_bloco)
+    
+    if args.particoes:
+        resumos = processar_particoes(args.dados, pasta_saida=args.saida, tabelas=args.tabelas or None,
+                                      processos=args.processos, cache=not args.sem_cache,
+                                      limite_cache_mb=args.limite_cache_mb, opcoes_exportacao=opcoes_exportacao,
+                                      arquivo_metricas=args.metricas and os.path.basename(args.metricas),
+                                      formato_metricas=args.formato_metricas, pasta_cache=args.pasta_cache)
+        return 1 if any(resumo['erro'] for resumo in resumos) else 0
+    
+    exporter = CruzeiroPowerBIExporter(caminho_dados=args.dados, cache=not args.sem_cache,
+                                       limite_cache_mb=args.limite_cache_mb, clube=args.clube,
+                                       pasta_cache=args.pasta_cache)
+    exporter.opcoes_exportacao.update(opcoes_exportacao)
+    if args.metricas:
+        exporter.metricas = EmissorMetricas(args.metricas, args.formato_metricas)
+    inicio = time.perf_counter()
+    if args.limpar_cache and exporter.cache_etapas is not None:
+        exporter.cache_etapas.limpar()
+        log.info("✓ Cache de etapas esvaziado\n")
+    
+    if args.compilar_fatos is not None:
+        exporter.compilar_fatos()
+    elif args.servir:
+        exporter.garantir_tabelas(args.tabelas or list(exporter.tabelas_disponiveis()))
+        ServicoExportador(exporter, host=args.host, porta=args.porta,
+                          intervalo=args.intervalo).servir_para_sempre()
+    elif args.assincrono:
+        exporter.executar_pipeline_assincrono(pasta_saida=args.saida, tabelas=args.tabelas)
+    elif args.tabelas:
+        exporter.executar_pipeline_seletivo(args.tabelas, pasta_saida=args.saida)
+    else:
+        exporter.executar_pipeline_completo(pasta_saida=args.saida)
+    
+    if exporter.cache_etapas is not None:
+        log.info(exporter.cache_etapas.resumo())
+    modo = ('compilar' if args.compilar_fatos is not None else 'servico' if args.servir else
+            'assincrono' if args.assincrono else 'seletivo' if args.tabelas else 'completo')
+    exporter.encerrar_metricas(time.perf_counter() - inicio, modo=modo)
+    return 0
 
 
 # EXECUÇÃO
 if __name__ == "__main__":
-    exporter = CruzeiroPowerBIExporter(caminho_dados='data/data.csv')
-    exporter.executar_pipeline_completo()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
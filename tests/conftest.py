@@ -0,0 +1,31 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PASTA_DADOS = os.path.join(RAIZ, 'data.csv')
+
+
+@pytest.fixture
+def pasta_dados(tmp_path):
+    """Cópia de data.csv que o teste pode alterar"""
+    destino = tmp_path / 'dados'
+    shutil.copytree(PASTA_DADOS, destino)
+    return destino
+
+
+@pytest.fixture
+def novo_exporter(tmp_path):
+    """Fábrica de CruzeiroPowerBIExporter com dados registrados e cache de etapas numa pasta temporária"""
+    from script import CruzeiroPowerBIExporter
+
+    def criar(pasta, pasta_cache=None, **kwargs):
+        exporter = CruzeiroPowerBIExporter(caminho_dados=str(pasta), pasta_cache=str(pasta_cache or tmp_path / 'cache'),
+                                           **kwargs)
+        exporter.carregar_dados()
+        return exporter
+    return criar
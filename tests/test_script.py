@@ -0,0 +1,146 @@
+import pandas as pd
+import pytest
+
+from script import CruzeiroPowerBIExporter, IndiceJogos, ValidadorQualidade, interpretar_faixas, \
+    interpretar_faixas_tabela
+
+
+# ==============================================================================
+# Faixas em texto (formato brasileiro)
+# ==============================================================================
+
+@pytest.mark.parametrize('texto, minimo, maximo', [
+    ('75 mil', 75000, 75000),
+    ('78,9 mil a 81 mil', 78900, 81000),
+    ('78,9 a 81 mil', 78900, 81000),          # 'mil' só no máximo vale para os dois
+    ('35.000-42.000', 35000, 42000),          # ponto é separador de milhar
+    ('252.000 – 308.000', 252000, 308000),    # travessão
+    ('1.250', 1250, 1250),
+])
+def test_interpretar_faixas_formato_brasileiro(texto, minimo, maximo):
+    faixa = interpretar_faixas(pd.Series([texto])).iloc[0]
+    assert (faixa['minimo'], faixa['maximo'], faixa['medio']) == (minimo, maximo, (minimo + maximo) / 2)
+
+
+def test_interpretar_faixas_texto_invalido_vira_nulo():
+    assert interpretar_faixas(pd.Series(['n/d'])).isna().all(axis=None)
+
+
+def test_interpretar_faixas_tabela_separa_percentual():
+    df = pd.DataFrame({'ano': [2024], 'site': ['252.000 – 308.000 (40%)'], 'app': ['12,5 mil (12,5%)']})
+    longo = interpretar_faixas_tabela(df, ['ano']).set_index('coluna')
+    assert longo.loc['site', ['minimo', 'maximo', 'participacao_percent']].tolist() == [252000, 308000, 40.0]
+    assert longo.loc['app', ['minimo', 'maximo', 'participacao_percent']].tolist() == [12500, 12500, 12.5]
+
+
+# ==============================================================================
+# Regras de qualidade
+# ==============================================================================
+
+def test_regra_informa_linha_do_arquivo_apos_filtro(tmp_path):
+    caminho = tmp_path / 'receitas.csv'
+    caminho.write_text('jogo_id,clube,total,parte\n'
+                       'JOGO_1,ATLETICO,10,10\n'
+                       'JOGO_1,CRUZEIRO,10,10\n'
+                       'JOGO_2,CRUZEIRO,99,10\n', encoding='utf-8')
+    df = pd.read_csv(caminho)
+    df = df[df['clube'] == 'CRUZEIRO']
+
+    validador = ValidadorQualidade()
+    validador.adicionar('receitas', 'total_diferente', 'erro', 'total', lambda d: d['total'] != d['parte'])
+    violacoes = validador.validar({'receitas': df})
+
+    assert violacoes[['jogo_id', 'linha_arquivo', 'valor']].values.tolist() == [['JOGO_2', 4, 99.0]]
+
+
+def test_regra_em_tabela_agregada_sem_linha_do_arquivo():
+    validador = ValidadorQualidade(agregadas=['consumo'])
+    validador.adicionar('consumo', 'negativo', 'erro', 'receita', lambda d: d['receita'] < 0)
+    violacoes = validador.validar({'consumo': pd.DataFrame({'receita': [1.0, -1.0]})})
+    assert violacoes['linha_arquivo'].isna().all()
+
+
+def test_jogo_sem_referencia_na_linha_do_arquivo(pasta_dados, novo_exporter):
+    # Perfil demográfico com outro clube antes: o filtro por clube não muda a linha
+    caminho = pasta_dados / 'perfil_demografico_torcida.csv'
+    linhas = caminho.read_text(encoding='utf-8').splitlines()
+    outro_clube = [linha.replace('CRUZEIRO', 'ATLETICO') for linha in linhas[1:6]]
+    linhas = [linhas[0]] + outro_clube + linhas[1:] + ['JOGO_99,CRUZEIRO,Gênero,MASCULINO,70%,1']
+    caminho.write_text('\n'.join(linhas) + '\n', encoding='utf-8')
+
+    exporter = novo_exporter(pasta_dados, cache=False)
+    exporter.validar_qualidade()
+    violacoes = exporter.dfs['violacoes_qualidade']
+    orfaos = violacoes[(violacoes['tabela'] == 'demografico') & (violacoes['regra'] == 'jogo_id_sem_referencia')]
+
+    assert orfaos[['jogo_id', 'linha_arquivo']].values.tolist() == [['JOGO_99', len(linhas)]]
+
+
+def test_cabecalho_deslocado_nao_gera_violacoes_de_integridade(pasta_dados, novo_exporter):
+    # Uma coluna a menos no cabeçalho: o pandas usaria jogo_id como índice
+    caminho = pasta_dados / 'ticket_medio_estimativa.csv'
+    linhas = caminho.read_text(encoding='utf-8').splitlines()
+    linhas[0] = linhas[0].replace('total_arrecadado,', '')
+    caminho.write_text('\n'.join(linhas) + '\n', encoding='utf-8')
+
+    exporter = novo_exporter(pasta_dados, cache=False)
+    assert exporter.dfs['ticket_medio_estimativa']['jogo_id'].str.fullmatch(r'JOGO_\d+').all()
+
+    exporter.validar_qualidade()
+    violacoes = exporter.dfs['violacoes_qualidade']
+    assert not (violacoes['tabela'] == 'ticket_medio_estimativa').any()
+
+
+def test_parecem_ids():
+    assert IndiceJogos.parecem_ids(pd.Series([' JOGO_1 ', 2, None]))
+    assert not IndiceJogos.parecem_ids(pd.Series(['Cruzeiro e Tombense', 'Cruzeiro vs Flamengo']))
+
+
+def test_dados_do_repositorio_sem_violacoes_de_integridade(novo_exporter):
+    from conftest import PASTA_DADOS
+    exporter = novo_exporter(PASTA_DADOS, cache=False)
+    exporter.validar_qualidade()
+    regras = exporter.dfs['violacoes_qualidade']['regra']
+    assert not regras.str.startswith('jogo_id_').any()
+
+
+# ==============================================================================
+# Cache de etapas
+# ==============================================================================
+
+def test_dependencias_da_validacao_cobrem_as_regras(pasta_dados, novo_exporter):
+    exporter = novo_exporter(pasta_dados)
+    dependencias = set(CruzeiroPowerBIExporter.ETAPAS['violacoes_qualidade'][1])
+    assert set(exporter._regras_qualidade().regras) <= dependencias
+    assert set(CruzeiroPowerBIExporter.FONTES_POR_JOGO) <= dependencias
+
+
+def test_cache_invalida_quando_uma_entrada_muda(pasta_dados, novo_exporter):
+    def validar():
+        exporter = novo_exporter(pasta_dados)
+        exporter.validar_qualidade()
+        return exporter.cache_etapas
+
+    assert validar().falhas == 1
+    assert validar().acertos == 1
+
+    # Fonte lida pela validação: nova chave
+    with open(pasta_dados / 'ticket_medio_torcedor.csv', 'a', encoding='utf-8') as f:
+        f.write('JOGO_1,R$ 1,R$ 1,R$ 1,R$ 1,R$ 1,R$ 1,R$ 1\n')
+    cache = validar()
+    assert (cache.acertos, cache.falhas) == (0, 1)
+
+    # Fonte que a validação não lê: a chave continua valendo
+    with open(pasta_dados / 'socio_torcedor_fatos.csv', 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert validar().acertos == 1
+
+
+def test_cache_com_pasta_sem_escrita_segue_sem_cache(pasta_dados, novo_exporter, tmp_path):
+    bloqueio = tmp_path / 'arquivo'
+    bloqueio.write_text('')
+    exporter = novo_exporter(pasta_dados, pasta_cache=bloqueio / 'cache')
+    exporter.validar_qualidade()
+    assert exporter.cache_etapas.erros_gravacao == 1
+    assert not exporter.dfs['violacoes_qualidade'].empty
+    assert exporter.cache_etapas.tamanho() == (0, 0)